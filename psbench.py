@@ -0,0 +1,1732 @@
+#!/usr/bin/env python3
+
+import os, sys, io, socket, threading, queue, struct
+import re, random
+import argparse
+import tempfile, gzip, shutil, heapq, csv, json
+from datetime import datetime
+import time as tm
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import psearch
+
+#
+# Variables/Constants
+#
+
+# Argument Parser
+parser = None
+
+# Pattern counts for the matcher benchmark
+MatcherPatternCounts = [ 1, 10, 100, 1000 ]
+
+#
+# Functions
+#
+
+# Generate Syslog Style Lines
+def SyntheticLines(count,iocs=0,hitrate=0.001):
+	"""Generate Synthetic Syslog Lines, A Fraction Of Which Contain An IOC User"""
+
+	months = [ "Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec" ]
+
+	lines = []
+
+	for index in range(count):
+		if iocs > 0 and random.random() < hitrate:
+			user = f"ioc{random.randint(0,iocs - 1)}"
+		else:
+			user = f"user{random.randint(0,50000)}"
+
+		stamp = "{} {:2} {:02}:{:02}:{:02}".format(months[index % 12],random.randint(1,28),random.randint(0,23),random.randint(0,59),random.randint(0,59))
+
+		lines.append(f"{stamp} ctrl{random.randint(1,40)} authmgr[{random.randint(100,9999)}]: <522008> <INFO> Selected server radius for method=802.1x; user={user}, essid=WolfieNet-Secure, domain=campus\n")
+
+	return lines
+
+# Time A Callable Over Lines
+def Rate(lines,func):
+	"""Run func Over All Lines, Return (lines/sec, matches)"""
+
+	matches = 0
+
+	started = tm.perf_counter()
+
+	for line in lines:
+		if func(line):
+			matches += 1
+
+	elapsed = tm.perf_counter() - started
+
+	return (len(lines) / elapsed if elapsed > 0 else 0.0), matches
+
+# Matcher Benchmark : per pattern loop vs QueryMatcher
+def BenchMatcher(args):
+	"""Compare Lines/Sec Of The Per Pattern Loop Against QueryMatcher"""
+
+	counts = MatcherPatternCounts
+
+	if args.patterns:
+		counts = [ int(count) for count in args.patterns.split(",") ]
+
+	print("{:>9} {:>14} {:>14} {:>8} {:>8}".format("patterns","loop lines/s","multi lines/s","speedup","matches"))
+
+	for count in counts:
+		lines = SyntheticLines(args.lines,iocs=count)
+
+		queries = [ psearch.Query(rf".*user=ioc{index}," ) for index in range(count) ]
+
+		def loop(line):
+			for query in queries:
+				if query.Match(line):
+					return True
+
+			return False
+
+		matcher = psearch.QueryMatcher(queries)
+
+		def multi(line):
+			query, matches = matcher.Match(line)
+
+			return matches is not None
+
+		loopRate, loopMatches = Rate(lines,loop)
+		multiRate, multiMatches = Rate(lines,multi)
+
+		if loopMatches != multiMatches:
+			print(f"*** match counts differ for {count} patterns : {loopMatches} vs {multiMatches}")
+
+		print("{:>9} {:>14.0f} {:>14.0f} {:>7.1f}x {:>8}".format(count,loopRate,multiRate,multiRate / loopRate if loopRate > 0 else 0,multiMatches))
+
+# Write A Synthetic Log File Of Roughly 'megabytes' MiB
+def SyntheticLog(folder,megabytes,iocs=100,compress=False,name="test.log.20210401"):
+	"""Write Synthetic Log, Return (filename, line count)"""
+
+	filename = os.path.join(folder,name + (".gz" if compress else ""))
+
+	target = int(megabytes * 1024 * 1024)
+	written = 0
+	count = 0
+
+	opener = gzip.open if compress else open
+
+	with opener(filename,"wb") as f_out:
+		while written < target:
+			data = "".join(SyntheticLines(10000,iocs=iocs)).encode("utf-8")
+
+			f_out.write(data)
+
+			written += len(data)
+			count += 10000
+
+	return filename, count
+
+# Synthetic Log Meta Matching SyntheticLog Names
+def SyntheticMeta():
+	"""Create A LogMeta For Synthetic Logs"""
+
+	meta = psearch.LogMeta()
+
+	meta.Name = meta.Nickname = "test"
+	meta.LogGroup = "test"
+	meta.LogGroups = [ "test" ]
+	meta.Status = "good"
+	meta.Streamers = []
+	meta.ParseInfo.append(r"^test\.log\.(?P<date>[0-9]{8})(\.gz){0,1}$")
+
+	return meta
+
+# Time One SearchLog Run
+def TimeSearch(filename,meta,queries,indexfile=None,**kwargs):
+	"""Run SearchLog Once, Return (seconds, matches, output bytes)"""
+
+	log = psearch.Log(filename,meta)
+	log.Output = filename + ".out"
+	log.TokenIndexFile = indexfile
+
+	started = tm.perf_counter()
+
+	matches = psearch.SearchLog(log,queries,[],-1,"/nonexistent/psearch.terminate",**kwargs)
+
+	elapsed = tm.perf_counter() - started
+
+	size = os.path.getsize(log.Output)
+
+	os.remove(log.Output)
+
+	return elapsed, matches, size
+
+# Index Benchmark : token index build cost, size and search speed-up
+def BenchIndex(args):
+	"""Build A TokenIndex For Plain And Gzip Synthetic Logs, Then Search With And Without It"""
+
+	folder = tempfile.mkdtemp(dir=args.tmp)
+
+	meta = SyntheticMeta()
+
+	queries = [
+		( "absent user", ".*user=nosuchuser," ),
+		( "rare user", f".*user=ioc{args.iocs // 2}," ),
+		( "every line", ".*essid=WolfieNet-Secure," )
+	]
+
+	try:
+		random.seed(1)
+
+		for compress in [ False, True ]:
+			filename, count = SyntheticLog(folder,args.size,iocs=args.iocs,compress=compress)
+
+			size = os.path.getsize(filename)
+			indexfile = filename + ".idx"
+
+			log = psearch.Log(filename,meta)
+			index = psearch.TokenIndex(filename,indexfile)
+
+			started = tm.perf_counter()
+			index.Build(log)
+			elapsed = tm.perf_counter() - started
+
+			indexSize = os.path.getsize(indexfile)
+			uncompressed = index.Blocks[-1][1]
+
+			print(f"{os.path.basename(filename)} : {size / 1048576:.0f} MiB on disk, {uncompressed / 1048576:.0f} MiB of lines, {len(index.Blocks)} blocks")
+			print("{:>24} {:>10.2f}s {:>8.1f} MiB/s".format("index build",elapsed,uncompressed / 1048576 / elapsed))
+			print("{:>24} {:>10.1f} MiB {:>7.2f}% of the log ({:.2f}% of its lines)".format("index size",indexSize / 1048576,indexSize * 100 / size,indexSize * 100 / uncompressed))
+
+			for name, pattern in queries:
+				plain, plainMatches, plainBytes = TimeSearch(filename,meta,[ psearch.Query(pattern) ],engine=args.engine)
+				indexed, indexedMatches, indexedBytes = TimeSearch(filename,meta,[ psearch.Query(pattern) ],indexfile=indexfile,engine=args.engine)
+
+				ok = plainMatches == indexedMatches and plainBytes == indexedBytes
+
+				print("{:>24} {:>9.3f}s unindexed {:>8.3f}s indexed {:>7.1f}x {:>8} matches {}".format(name,plain,indexed,plain / indexed if indexed > 0 else 0,indexedMatches,("" if ok else "MISMATCH")))
+
+			os.remove(filename)
+			os.remove(indexfile)
+	finally:
+		shutil.rmtree(folder,ignore_errors=True)
+
+# Load Search Output As Records, The Way A Downstream Tool Would
+def LoadRecords(filename,name,logdate):
+	"""Rows As Dicts With The Timestamp Converted, Text Is Re-parsed With A Regex Like dhcp.py Does"""
+
+	if name == "text":
+		stamper = psearch.LineTimestamp(logdate)
+		expression = re.compile(rb"^(?P<timestamp>\w+\s+\d{1,2}\s+[\d:]{8}) (?P<controller>\S+) (?P<user>\S+) (?P<essid>\S+)$")
+
+		rows = []
+
+		with open(filename,"rb") as f_in:
+			for line in f_in:
+				match = expression.match(line)
+
+				if match:
+					row = { key : value.decode("utf-8") for key, value in match.groupdict().items() }
+					row["timestamp"] = stamper(match.group("timestamp"))
+					rows.append(row)
+
+		return rows
+	elif name == "csv":
+		with open(filename,"r",newline="") as f_in:
+			rows = list(csv.DictReader(f_in))
+	elif name == "jsonl":
+		with open(filename,"r") as f_in:
+			rows = [ json.loads(line) for line in f_in ]
+	else:
+		return psearch.pyarrow.parquet.read_table(filename).to_pylist()
+
+	for row in rows:
+		row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+
+	return rows
+
+# Format Benchmark : named query results as text vs csv, jsonl and parquet
+def BenchFormat(args):
+	"""Search Throughput Writing Each Format, Then The Time A Downstream Tool Takes To Load The Results"""
+
+	meta = SyntheticMeta()
+
+	query = psearch.Query(r"^(?P<timestamp>\w+\s+\d{1,2}\s+[\d\:]{8})\s+(?P<controller>\S+)\s+(\S+\s+){2}(<[^>]+>)\s+Selected\s+server\s+[^\=]+[^\;]+;\s+user\=(?P<user>[^,]+),\s+essid\=(?P<essid>[^,]+),.+")
+
+	names = [ name for name in psearch.ResultFormat.Formats if name != "parquet" or psearch.pyarrow is not None ]
+
+	if len(names) < len(psearch.ResultFormat.Formats):
+		print("pyarrow not installed, parquet skipped")
+
+	with tempfile.TemporaryDirectory(dir=args.tmp) as folder:
+		random.seed(1)
+
+		filename, count = SyntheticLog(folder,args.size)
+
+		print(f"{os.path.basename(filename)} : {count} lines, {os.path.getsize(filename) / 1048576:.0f} MiB, every line matches")
+		print("{:>8} {:>10} {:>10} {:>10} {:>10} {:>10} {:>8}".format("format","search s","MiB/s","out MiB","load s","rows/s","rows"))
+
+		for name in names:
+			resultformat = psearch.ResultFormat(name,[ query ])
+			output = os.path.join(folder,f"out.{name}")
+
+			log = psearch.Log(filename,meta)
+
+			started = tm.perf_counter()
+
+			# As the search manager does, the header first, then the records
+			with open(resultformat.RecordsFile(output),"wb") as f_out:
+				f_out.write(resultformat.Header())
+
+				log.Output = f_out
+
+				psearch.SearchLog(log,[ query ],[],-1,"/nonexistent/psearch.terminate",engine=args.engine,resultformat=resultformat)
+
+			resultformat.Finish(output)
+
+			searched = tm.perf_counter() - started
+
+			started = tm.perf_counter()
+
+			rows = LoadRecords(output,name,log.EncodedDate)
+
+			loaded = tm.perf_counter() - started
+
+			print("{:>8} {:>10.2f} {:>10.1f} {:>10.1f} {:>10.2f} {:>10.0f} {:>8}".format(name,searched,log.Size / 1048576 / searched,os.path.getsize(output) / 1048576,loaded,len(rows) / loaded if loaded > 0 else 0,len(rows)))
+
+			os.remove(output)
+
+# Aggregate Benchmark : counting downstream of text output vs counting in the worker
+def BenchAggregate(args):
+	"""--count-by user,essid Against Writing Every Match And Counting The Output, Bytes Crossing From The Worker And Total Time"""
+
+	meta = SyntheticMeta()
+
+	query = psearch.Query(r"^(?P<timestamp>\w+\s+\d{1,2}\s+[\d\:]{8})\s+(?P<controller>\S+)\s+(\S+\s+){2}(<[^>]+>)\s+Selected\s+server\s+[^\=]+[^\;]+;\s+user\=(?P<user>[^,]+),\s+essid\=(?P<essid>[^,]+),.+")
+	columns = [ "user", "essid" ]
+
+	with tempfile.TemporaryDirectory(dir=args.tmp) as folder:
+		random.seed(1)
+
+		filename, count = SyntheticLog(folder,args.size,iocs=args.iocs)
+		output = os.path.join(folder,"out")
+
+		print(f"{os.path.basename(filename)} : {count} lines, {os.path.getsize(filename) / 1048576:.0f} MiB, every line matches")
+		print("{:>12} {:>10} {:>10} {:>12} {:>10} {:>8}".format("","search s","merge s","out bytes","total s","keys"))
+
+		results = {}
+
+		for name in [ "text", "aggregate" ]:
+			log = psearch.Log(filename,meta)
+			log.Output = output
+
+			aggregate = psearch.Aggregate("count",columns)
+
+			started = tm.perf_counter()
+
+			psearch.SearchLog(log,[ query ],[],-1,"/nonexistent/psearch.terminate",engine=args.engine,aggregate=(aggregate if name == "aggregate" else None))
+
+			searched = tm.perf_counter() - started
+
+			size = os.path.getsize(output)
+
+			started = tm.perf_counter()
+
+			# What the manager (or a downstream 'sort | uniq -c') does with what the worker wrote
+			with open(output,"rb") as f_in:
+				if name == "aggregate":
+					shutil.copyfileobj(f_in,aggregate)
+				else:
+					for line in f_in:
+						# timestamp controller user essid, the timestamp has spaces in it
+						fields = line.split()
+						aggregate.Counts[( fields[-2].decode("utf-8"), fields[-1].decode("utf-8") )] += 1
+
+			merged = tm.perf_counter() - started
+
+			results[name] = aggregate.Counts
+
+			print("{:>12} {:>10.2f} {:>10.3f} {:>12} {:>10.2f} {:>8}".format(name,searched,merged,size,searched + merged,len(aggregate.Counts)))
+
+			os.remove(output)
+
+		print("counts {}".format("match" if results["text"] == results["aggregate"] else "DIFFER"))
+
+# Cache Benchmark : a repeated search over rotated logs, cold, replayed and uncached
+def BenchCache(args):
+	"""SearchManager.LocalSearch Three Times Over The Same Logs, The Second Run Is Replayed From The Result Cache"""
+
+	folder = tempfile.mkdtemp(dir=args.tmp)
+	psearch.TempSpace = folder
+
+	# No keyboard polling, stdin may not be a terminal
+	psearch.CmdLineMode(False)
+
+	meta = SyntheticMeta()
+
+	# Patterns are comma separated on the command line, this one has none
+	pattern = r".*user=(?P<user>ioc\d+)\W+essid=(?P<essid>[\w-]+)"
+
+	# The same search as a named query (--query iocs)
+	query = psearch.NamedQuery()
+	query.Set("iocs",pattern)
+	meta.Queries.append(query)
+
+	try:
+		random.seed(1)
+
+		logs = os.path.join(folder,"logs")
+		os.makedirs(logs)
+
+		# Rotated a day ago, the cache leaves logs alone while they may still be written to
+		rotated = tm.time() - 86400
+
+		for index in range(args.logs):
+			filename, count = SyntheticLog(logs,args.size / args.logs,iocs=args.iocs,compress=(index % 2 == 1),name=f"test.log.202104{index + 1:02}")
+			os.utime(filename,( rotated, rotated ))
+
+		output = os.path.join(folder,"out")
+
+		print(f"{args.logs} logs, {args.size:.0f} MiB of lines, half gzipped, hunting {args.iocs} IOC users")
+		print("{:>10} {:>10} {:>10} {:>8} {:>12} {:>12}".format("search","run","seconds","hits","not read","out bytes"))
+
+		for search in [ "pattern", "--query" ]:
+			for name, extra in [ ( "cold", [] ), ( "replayed", [] ), ( "uncached", [ "--nocache" ] ) ]:
+				searchArgs = psearch.BuildParser().parse_args([ "--threads", str(args.threads), "search", "--out", output, "--range", "20210401,20210430" ] + extra + [ "test" ] + ([ pattern ] if search == "pattern" else [ "--query", "iocs" ]))
+
+				manager = psearch.SearchManager([ logs ],[ meta ])
+				manager.Patterns.clear()
+				manager.NamedQueries.clear()
+				manager.SetMaxThreads(args.threads,reserve=False)
+				manager.InitExecutor(args.threads)
+
+				if search == "pattern":
+					manager.ParsePatterns(pattern)
+				else:
+					manager.ParseNamedQueries("iocs")
+
+				started = tm.perf_counter()
+
+				manager.LocalSearch(searchArgs)
+
+				elapsed = tm.perf_counter() - started
+
+				cache = manager.Cache
+
+				print("{:>10} {:>10} {:>10.2f} {:>8} {:>8.0f} MiB {:>12}".format(search,name,elapsed,(cache.Hits if cache else "-"),(cache.Saved / 1048576 if cache else 0),os.path.getsize(output)))
+
+				manager.Executor.shutdown()
+	finally:
+		shutil.rmtree(folder,ignore_errors=True)
+
+# Block Benchmark : line iterator vs block scanner
+def BenchBlock(args):
+	"""Compare The Line Engine Against The Block Engine"""
+
+	querySets = [
+		( "1 literal", [ psearch.Query(r".*user=ioc1,") ] ),
+		( "100 iocs", [ psearch.Query(rf".*user=ioc{index},") for index in range(100) ] ),
+		( "named query", [ psearch.Query(r"^(?P<timestamp>\w+\s+\d{1,2}\s+[\d\:]{8})\s+(?P<controller>\S+)\s+(\S+\s+){2}(<[^>]+>)\s+Selected\s+server\s+[^\=]+[^\;]+;\s+user\=(?P<user>ioc[^,]+),\s+essid\=(?P<essid>[^,]+),.+") ] ),
+	]
+
+	meta = SyntheticMeta()
+
+	differs = False
+
+	with tempfile.TemporaryDirectory(dir=args.tmp) as folder:
+		for compress in [ False, True ]:
+			filename, lineCount = SyntheticLog(folder,args.size,compress=compress)
+
+			mb = args.size
+
+			print(f"\n{os.path.basename(filename)} : {lineCount} lines, {os.path.getsize(filename)} bytes on disk")
+			print("{:>12} {:>8} {:>10} {:>12} {:>8} {:>8}".format("patterns","engine","MiB/s","lines/s","speedup","matches"))
+
+			for title, queries in querySets:
+				baseline = None
+
+				for engine in [ "line", "block" ]:
+					# Read sizes must be whole bytes, as SearchManager.BlockSize makes them
+					elapsed, matches, size = TimeSearch(filename,meta,queries,engine=engine,blocksize=int(args.blocksize * 1024 * 1024))
+
+					if baseline is None:
+						baseline = ( elapsed, matches, size )
+					elif ( matches, size ) != baseline[1:]:
+						print(f"*** {title} : block engine output differs from line engine")
+						differs = True
+
+					print("{:>12} {:>8} {:>10.1f} {:>12.0f} {:>7.1f}x {:>8}".format(title,engine,mb / elapsed,lineCount / elapsed,baseline[0] / elapsed,matches))
+
+	# A speed up over different output means nothing, make fails
+	return differs
+
+# Write A Multi-member Gzip Log Of Roughly 'megabytes' MiB, One Member Per 'member' MiB
+def SyntheticMembers(folder,megabytes,member=4,name="test.log.20210401"):
+	"""Write Multi-member Gzip Log, Return (filename, line count, uncompressed bytes)"""
+
+	filename = os.path.join(folder,name + ".gz")
+
+	target = int(megabytes * 1024 * 1024)
+	written = 0
+	count = 0
+
+	with open(filename,"wb") as f_out:
+		while written < target:
+			lines = []
+
+			while len(lines) * 150 < member * 1024 * 1024:
+				lines.extend(SyntheticLines(10000,iocs=100))
+
+			data = "".join(lines).encode("utf-8")
+
+			f_out.write(gzip.compress(data,compresslevel=6))
+
+			written += len(data)
+			count += len(lines)
+
+	return filename, count, written
+
+# Search One Shard In A Worker
+def SearchShard(shard,queries,engine):
+	"""Worker Entry For Searching A Shard"""
+
+	return psearch.SearchLog(shard,queries,[],-1,"/nonexistent/psearch.terminate",engine=engine)
+
+# Gzip Benchmark : decompressor choices, then index + member split across workers
+def BenchGzip(args):
+	"""Compare Gzip Decompressors And Split Member Searching"""
+
+	queries = [ psearch.Query(rf".*user=ioc{index},") for index in range(10) ]
+
+	meta = SyntheticMeta()
+
+	with tempfile.TemporaryDirectory(dir=args.tmp) as folder:
+		psearch.TempSpace = folder
+
+		filename, lineCount, size = SyntheticMembers(folder,args.size,args.member)
+
+		mb = size / (1024 * 1024)
+
+		print(f"{os.path.basename(filename)} : {lineCount} lines, {mb:.1f} MiB uncompressed, {os.path.getsize(filename)} bytes on disk")
+		print("{:>22} {:>10} {:>10} {:>8}".format("decompressor","seconds","MiB/s","matches"))
+
+		baseline = None
+
+		for decompressor in [ "python", "zcat", "pigz" ]:
+			if decompressor != "python" and not shutil.which(decompressor):
+				print("{:>22} {:>10}".format(decompressor,"missing"))
+				continue
+
+			log = psearch.Log(filename,meta)
+			log.Output = filename + ".out"
+			log.Decompressor = decompressor
+
+			started = tm.perf_counter()
+			matches = psearch.SearchLog(log,queries,[],-1,"/nonexistent/psearch.terminate",engine=args.engine)
+			elapsed = tm.perf_counter() - started
+
+			os.remove(log.Output)
+
+			baseline = baseline or elapsed
+
+			print("{:>22} {:>10.2f} {:>10.1f} {:>8}".format(decompressor,elapsed,mb / elapsed,matches))
+
+		# First search records the member index
+		log = psearch.Log(filename,meta)
+		log.Output = filename + ".out"
+		log.IndexFile = psearch.GzipIndex(filename).IndexFile
+
+		started = tm.perf_counter()
+		psearch.SearchLog(log,queries,[],-1,"/nonexistent/psearch.terminate",engine=args.engine)
+		elapsed = tm.perf_counter() - started
+
+		os.remove(log.Output)
+
+		log = psearch.Log(filename,meta)
+
+		print("{:>22} {:>10.2f} {:>10.1f}".format("python + index",elapsed,mb / elapsed))
+
+		index = psearch.GzipIndex(filename)
+		index.Load()
+
+		for workers in sorted({ 2, 4, args.workers }):
+			ranges = index.Ranges(workers)
+			shards = [ log.Shard(start,end,count) for count, (start, end) in enumerate(ranges) ]
+
+			for shard in shards:
+				shard.Output = f"{filename}.{shard.ShardIndex}.out"
+
+			# Queries keep their last match, which doesn't pickle
+			fresh = [ psearch.Query(query.Expression) for query in queries ]
+
+			with ProcessPoolExecutor(workers) as executor:
+				started = tm.perf_counter()
+				matches = sum(executor.map(SearchShard,shards,[ fresh ] * len(shards),[ args.engine ] * len(shards)))
+				elapsed = tm.perf_counter() - started
+
+			for shard in shards:
+				os.remove(shard.Output)
+
+			print("{:>22} {:>10.2f} {:>10.1f} {:>8} {:>7.1f}x".format(f"split {len(shards)} of {len(index.Members)}",elapsed,mb / elapsed,matches,baseline / elapsed))
+
+# Termination Benchmark : per line flag file check vs every N lines vs shared event
+def BenchTerminate(args):
+	"""Compare The Cost Of Termination Checks, On A Local Path And Optionally An NFS Path"""
+
+	queries = [ psearch.Query(r".*user=ioc1,") ]
+
+	meta = SyntheticMeta()
+
+	folders = [ ( "local", args.tmp ) ]
+
+	if args.path:
+		folders.append(( "path", args.path ))
+
+	checkLines = psearch.TerminateCheckLines
+
+	for title, where in folders:
+		with tempfile.TemporaryDirectory(dir=where) as folder:
+			filename, lineCount = SyntheticLog(folder,args.size)
+
+			termflag = os.path.join(folder,"psearch.terminate")
+
+			print(f"\n{title} : {folder}, {lineCount} lines")
+			print("{:>26} {:>12} {:>8}".format("termination check","lines/s","speedup"))
+
+			modes = [
+				( "flag file every line", 1, termflag, None ),
+				( f"flag file every {checkLines}", checkLines, termflag, None ),
+				( f"event every {checkLines}", checkLines, None, psearch.multiprocessing.Event() ),
+			]
+
+			baseline = None
+
+			for mode, lines, flag, event in modes:
+				psearch.TerminateCheckLines = lines
+				psearch.TerminateEvent = event
+
+				log = psearch.Log(filename,meta)
+				log.Output = filename + ".out"
+
+				started = tm.perf_counter()
+				psearch.SearchLog(log,queries,[],-1,flag)
+				elapsed = tm.perf_counter() - started
+
+				os.remove(log.Output)
+
+				baseline = baseline or elapsed
+
+				print("{:>26} {:>12.0f} {:>7.1f}x".format(mode,lineCount / elapsed,baseline / elapsed))
+
+	psearch.TerminateCheckLines = checkLines
+	psearch.TerminateEvent = None
+
+# Instrumented Function For The Trace Benchmark
+@psearch.Traced("psbench::Decorated")
+def Decorated(value):
+	return value + 1
+
+# Explicitly Traced Function (how psearch was instrumented before @Traced)
+def Explicit(value):
+	psearch.tracer.Entering("psbench::Explicit")
+
+	value += 1
+
+	psearch.tracer.Exitting("psbench::Explicit")
+
+	return value
+
+# Uninstrumented Function
+def Plain(value):
+	return value + 1
+
+# Time A Callable By Name (looked up per call, as callers of swapped functions do)
+def PerCall(name,calls):
+	"""Return Nanoseconds Per Call"""
+
+	started = tm.perf_counter()
+
+	for index in range(calls):
+		globals()[name](index)
+
+	return (tm.perf_counter() - started) * 1e9 / calls
+
+# Trace Benchmark : per call cost of tracing, off and on
+def BenchTrace(args):
+	"""Per Call Overhead Of @Traced And Explicit Tracing, Tracing Off And On"""
+
+	tracer = psearch.tracer
+
+	# On, but every state suppressed, so this is the bookkeeping cost without printing
+	tracer.SetTraceState([ "psbench::Decorated", "psbench::Explicit" ],"all")
+
+	print("{:>10} {:>10} {:>12}".format("tracing","style","ns/call"))
+
+	for enabled in [ False, True ]:
+		if enabled:
+			tracer.Enable()
+		else:
+			tracer.Disable()
+
+		plain = PerCall("Plain",args.calls)
+
+		print("{:>10} {:>10} {:>12.0f}".format(("on" if enabled else "off"),"plain",plain))
+
+		for name in [ "Decorated", "Explicit" ]:
+			elapsed = PerCall(name,args.calls)
+
+			print("{:>10} {:>10} {:>12.0f} (+{:.0f})".format(("on" if enabled else "off"),name.lower(),elapsed,elapsed - plain))
+
+	tracer.Disable()
+
+# Startup Benchmark : catalog scans and log list de-duplication over a large folder
+def BenchStartup(args):
+	"""Time Catalog Scans And Linear vs Keyed De-duplication On A Synthetic Folder"""
+
+	meta = SyntheticMeta()
+	meta.ParseInfo[0] = r"^host(?P<host>[0-9]+)\.log\.(?P<date>[0-9]{8})$"
+
+	start = psearch.date(2000,1,1).toordinal()
+	hosts = max(args.files // 1000,1)
+
+	with tempfile.TemporaryDirectory(dir=args.tmp) as folder:
+		psearch.TempSpace = folder
+
+		logFolder = os.path.join(folder,"logs")
+		os.mkdir(logFolder)
+
+		for index in range(args.files):
+			stamp = psearch.date.fromordinal(start + index // hosts).strftime("%Y%m%d")
+
+			open(os.path.join(logFolder,f"host{index % hosts}.log.{stamp}"),"wb").close()
+
+		print(f"{args.files} files in {logFolder}")
+
+		timings = []
+
+		started = tm.perf_counter()
+		logs = psearch.LogCatalog([ meta ]).GetLogFiles(meta,logFolder)
+		timings.append(( "catalog scan, in memory", tm.perf_counter() - started ))
+
+		store = os.path.join(folder,psearch.LogCatalog.StoreName)
+
+		for title in [ "catalog store, first run", "catalog store, unchanged" ]:
+			started = tm.perf_counter()
+			count = psearch.LogCatalog([ meta ],store=store).Count(meta,logFolder)
+			timings.append(( title, tm.perf_counter() - started ))
+
+		# De-duplication as GetLogList does it, every candidate is checked before it is added
+		for title, container in [ ( "dedupe, list", [] ), ( "dedupe, KeyedList", psearch.KeyedList() ) ]:
+			candidates = logs
+
+			if type(container) is list and len(logs) > args.legacymax:
+				candidates = logs[:args.legacymax]
+				title += f" ({args.legacymax} files)"
+
+			started = tm.perf_counter()
+
+			for log in candidates:
+				if type(container) is list:
+					found = False
+
+					for item in container:
+						if item.Filename == log.Filename:
+							found = True
+							break
+				else:
+					found = log in container
+
+				if not found:
+					container.append(log)
+
+			timings.append(( title, tm.perf_counter() - started ))
+
+		for title, elapsed in timings:
+			print("{:>36} {:>10.3f}s".format(title,elapsed))
+
+# Scan Ordering, As TopOfOrder Did It (Index Bug Fixed), For Comparison
+def ScanOrder(ordering,completions):
+	"""Release Logs By Scanning The Completed Queue For The Top Of The Ordering List"""
+
+	ordering = list(ordering)
+	queue = []
+	released = []
+
+	for log in completions:
+		queue.append(log)
+
+		while len(ordering) > 0:
+			found = None
+
+			for index, item in enumerate(queue):
+				if item is ordering[0]:
+					found = index
+					break
+
+			if found is None:
+				break
+
+			released.append(queue.pop(found))
+			ordering.pop(0)
+
+	return released
+
+# Heap Ordering, As ProcessOutput Does It With --inorder (And --interleave For days)
+def HeapOrder(logs,completions,days=False):
+	"""Release Logs Through OutputOrder, Returns Released Logs (Or Released Day Groups)"""
+
+	order = psearch.OutputOrder(logs)
+	released = []
+
+	for log in completions:
+		order.Complete(log)
+
+		while True:
+			if days:
+				group = order.NextDay()
+			else:
+				log = order.Next()
+				group = ([ log ] if log else [])
+
+			if len(group) == 0:
+				break
+
+			released.append(group if days else group[0])
+
+	return released
+
+# Order Benchmark : stress test of in order output with out of order completions
+def BenchOrder(args):
+	"""Complete Thousands Of Logs In Random Order, Check And Time Ordered Release"""
+
+	meta = SyntheticMeta()
+
+	start = psearch.date(2021,1,1).toordinal()
+
+	logs = []
+
+	for index in range(args.logs):
+		logdate = psearch.date.fromordinal(start + index // args.sources)
+		filename = f"/logs/source{index % args.sources}/test.log.{logdate.strftime('%Y%m%d')}"
+
+		logs.append(psearch.Log(filename,meta,size=0,encodedDate=logdate))
+
+	expected = sorted(logs,key=lambda log: ( log.EncodedDate, log.Filename ))
+
+	completions = list(logs)
+	random.shuffle(completions)
+
+	print(f"{len(logs)} logs, {args.sources} per day, completed in random order")
+
+	started = tm.perf_counter()
+	released = HeapOrder(logs,completions)
+	elapsed = tm.perf_counter() - started
+
+	print("{:>24} {:>10.3f}s {}".format("heap",elapsed,("in order" if released == expected else "OUT OF ORDER")))
+
+	started = tm.perf_counter()
+	groups = HeapOrder(logs,completions,days=True)
+	elapsed = tm.perf_counter() - started
+
+	whole = all([ len(set([ log.EncodedDate for log in group ])) == 1 and len(group) == args.sources for group in groups ])
+	ascending = [ group[0].EncodedDate for group in groups ] == sorted(set([ log.EncodedDate for log in logs ]))
+
+	print("{:>24} {:>10.3f}s {}".format("heap, whole days",elapsed,("in order" if whole and ascending else "OUT OF ORDER")))
+
+	candidates = completions
+
+	if len(logs) > args.legacymax:
+		# Quadratic, only a prefix of the ordering would ever be released from a truncated run
+		candidates = sorted(expected[:args.legacymax],key=lambda log: completions.index(log))
+
+	started = tm.perf_counter()
+	released = ScanOrder(expected[:len(candidates)],candidates)
+	elapsed = tm.perf_counter() - started
+
+	title = "scan" + (f" ({len(candidates)} logs)" if len(candidates) < len(logs) else "")
+
+	print("{:>24} {:>10.3f}s {}".format(title,elapsed,("in order" if released == expected[:len(candidates)] else "OUT OF ORDER")))
+
+	# Line level merge of one day's results
+	lines = []
+
+	for source in range(args.sources):
+		stamps = sorted([ random.randint(0,86399) for index in range(args.lines) ])
+		lines.append([ "Apr {:2} {:02}:{:02}:{:02} source{} app: x\n".format(1,stamp // 3600,stamp // 60 % 60,stamp % 60,source).encode() for stamp in stamps ])
+
+	def Keyed(source):
+		key = psearch.LineTimestamp(psearch.date(2021,4,1))
+
+		for line in source:
+			yield key(line), line
+
+	started = tm.perf_counter()
+	merged = [ line for stamp, line in psearch.heapq.merge(*[ Keyed(source) for source in lines ],key=lambda item: item[0]) ]
+	elapsed = tm.perf_counter() - started
+
+	key = psearch.LineTimestamp(psearch.date(2021,4,1))
+	stamps = [ key(line) for line in merged ]
+
+	ok = stamps == sorted(stamps) and len(merged) == args.sources * args.lines
+
+	print("{:>24} {:>10.3f}s {} ({:.0f} lines/s)".format("line merge",elapsed,("in order" if ok else "OUT OF ORDER"),len(merged) / elapsed))
+
+# Read Exactly 'size' Bytes From A Blocking Socket, None If The Peer Closed
+def RecvExactly(sock,size):
+	"""Receive Exactly size Bytes"""
+
+	buffer = bytearray()
+
+	while len(buffer) < size:
+		chunk = sock.recv(size - len(buffer))
+
+		if len(chunk) == 0:
+			return None
+
+		buffer += chunk
+
+	return buffer
+
+# Read One Frame From A Blocking Socket
+def RecvPacket(sock):
+	"""Receive Exactly One Frame (v1 Or v2), None If The Peer Closed"""
+
+	header = RecvExactly(sock,4)
+
+	if header is not None and header[0:2] == psearch.MsgPacket.Magic and header[3] == psearch.MsgPacket.Guard:
+		rest = RecvExactly(sock,psearch.MsgPacket.Header.size - 4)
+		header = (header + rest) if rest is not None else None
+
+	if header is None:
+		return None
+
+	headerSize, size = psearch.MsgPacket.FrameSize(header)
+
+	payload = RecvExactly(sock,size)
+
+	if payload is None:
+		return None
+
+	msgpkt = psearch.MsgPacket()
+	msgpkt.Unpack(bytes(payload),(bytes(header) if headerSize > 4 else None))
+
+	return msgpkt
+
+# Simulated Remote Client, Speaks The Client Side Of The Assignment Protocol
+def SimulatedClient(port,threads,latencies,stall=0):
+	"""Ask For Assignments Until Refused, Complete Each, Record Per Request Latency (A Staller Never Reads)"""
+
+	sock = socket.create_connection(( "127.0.0.1", port ))
+	sock.setsockopt(socket.IPPROTO_TCP,socket.TCP_NODELAY,1)
+
+	pid = str(os.getpid())
+	server = psearch.NetworkingBase
+
+	try:
+		while True:
+			started = tm.perf_counter()
+
+			psearch.MsgPacket(server.HELLO,[ pid, str(threads), "1", "0" ]).SendMsg(sock)
+
+			if stall > 0:
+				# Holds its assignments, never acknowledges them
+				tm.sleep(stall)
+				break
+
+			reply = RecvPacket(sock)
+
+			if reply is None or reply.Verb != server.ACK:
+				break
+
+			filenames = []
+
+			while True:
+				msgpkt = RecvPacket(sock)
+
+				if msgpkt is None or msgpkt.Verb == server.FIN:
+					break
+
+				if msgpkt.Verb == server.ASSIGN:
+					filenames.append(msgpkt.Data[1])
+
+				psearch.MsgPacket(server.ACK,pid).SendMsg(sock)
+
+			latencies.append(tm.perf_counter() - started)
+
+			for filename in filenames:
+				psearch.MsgPacket(server.COMPLETED,[ filename, os.devnull, pid ]).SendMsg(sock)
+
+		psearch.MsgPacket(server.CLOSE,pid).SendMsg(sock)
+	finally:
+		sock.close()
+
+# Server Benchmark : loopback load test of the search controller
+def BenchServer(args):
+	"""Many Simulated Clients (Some Stalled) Against One SearchServer, Report Throughput And Latency"""
+
+	meta = SyntheticMeta()
+
+	logs = psearch.KeyedList([ psearch.Log(f"/logs/source{index % 50}/test.log.{20210101 + index}",meta,output=os.devnull,size=0,encodedDate=psearch.date(2021,1,1)) for index in range(args.logs) ])
+	remoteAssignments = psearch.KeyedList(logof=lambda assignment: assignment.Log)
+
+	server = psearch.SearchServer(host="127.0.0.1",port=0)
+
+	latencies = []
+	workers = []
+
+	# Stallers connect first, so they hold assignments while everyone else runs
+	for index in range(args.stalled):
+		worker = threading.Thread(target=SimulatedClient,args=(server.Port,args.threads,[],args.stallfor),daemon=True)
+		worker.start()
+
+	stalledStart = tm.perf_counter()
+
+	while len(remoteAssignments) < args.stalled * args.threads and tm.perf_counter() - stalledStart < 5:
+		server.Process([ meta ],logs,[],[],[],remoteAssignments,timeout=0.01)
+
+	print(f"{args.clients} clients, {args.threads} assignments per request, {args.logs} logs, {args.stalled} stalled clients holding {len(remoteAssignments)}")
+
+	started = tm.perf_counter()
+
+	for index in range(args.clients):
+		worker = threading.Thread(target=SimulatedClient,args=(server.Port,args.threads,latencies),daemon=True)
+		worker.start()
+		workers.append(worker)
+
+	completed = 0
+	connections = 0
+
+	while len(logs) > 0 or any([ worker.is_alive() for worker in workers ]):
+		completed += len(server.Process([ meta ],logs,[],[],[],remoteAssignments,timeout=0.01))
+		connections = max(connections,len(server.Connections))
+
+	elapsed = tm.perf_counter() - started
+
+	latencies.sort()
+
+	def Percentile(fraction):
+		return latencies[min(int(len(latencies) * fraction),len(latencies) - 1)] * 1000 if len(latencies) > 0 else 0
+
+	print("{:>24} {:>10.3f}s".format("elapsed",elapsed))
+	print("{:>24} {:>10}".format("completed",completed))
+	print("{:>24} {:>10.0f}/s".format("assignments",completed / elapsed))
+	print("{:>24} {:>10}".format("peak connections",connections))
+	print("{:>24} {:>10}".format("requests",len(latencies)))
+	print("{:>24} {:>10.2f}ms p50 {:.2f}ms p99 {:.2f}ms max".format("request latency",Percentile(0.5),Percentile(0.99),Percentile(1.0)))
+	print("{:>24} {:>10}".format("still held by stallers",len(remoteAssignments)))
+
+	server.Close()
+
+# Lease Client : simulated client with its own process ID that may die or go quiet mid search
+def LeaseClient(port,pid,threads,work,fate,folder,record,done,lease):
+	"""Search Until done Is Set, killed Drops Dead Holding Assignments, stalled Goes Quiet Past Its Lease And Then Reports"""
+
+	sock = socket.create_connection(( "127.0.0.1", port ))
+	sock.setsockopt(socket.IPPROTO_TCP,socket.TCP_NODELAY,1)
+
+	server = psearch.NetworkingBase
+
+	try:
+		while not done.is_set():
+			psearch.MsgPacket(server.HELLO,[ pid, str(threads), "1", "0" ]).SendMsg(sock)
+
+			reply = RecvPacket(sock)
+
+			if reply is None:
+				break
+
+			if reply.Verb != server.ACK:
+				# Nothing to hand out right now, expired leases may bring more
+				tm.sleep(0.05)
+				continue
+
+			filenames = []
+
+			while True:
+				msgpkt = RecvPacket(sock)
+
+				if msgpkt is None or msgpkt.Verb == server.FIN:
+					break
+
+				if msgpkt.Verb == server.ASSIGN:
+					filenames.append(msgpkt.Data[1])
+
+				psearch.MsgPacket(server.ACK,pid).SendMsg(sock)
+
+			if fate == "stalled":
+				tm.sleep(lease * 3)
+				fate = "normal"
+
+			for index, filename in enumerate(filenames):
+				if fate == "killed" and index > 0:
+					# Dies mid search, the reset is all the server sees
+					tm.sleep(work / 2)
+					sock.setsockopt(socket.SOL_SOCKET,socket.SO_LINGER,struct.pack("ii",1,0))
+					return
+
+				tm.sleep(work)
+
+				output = os.path.join(folder,pid + filename.replace("/","_"))
+				open(output,"wb").close()
+
+				record["searched"].append(filename)
+
+				psearch.MsgPacket(server.COMPLETED,[ filename, output, pid, "1" ]).SendMsg(sock)
+
+				reply = RecvPacket(sock)
+
+				if reply is None or reply.Verb != server.ACK:
+					# Turned down, somebody else's results were taken
+					os.remove(output)
+					record["rejected"].append(filename)
+
+			if fate == "killed":
+				sock.setsockopt(socket.SOL_SOCKET,socket.SO_LINGER,struct.pack("ii",1,0))
+				return
+
+		psearch.MsgPacket(server.CLOSE,pid).SendMsg(sock)
+	finally:
+		sock.close()
+
+# Lease Benchmark : clients killed and stalled mid run, every log must be completed exactly once
+def BenchLeases(args):
+	"""Simulated Clients Against A SearchServer With Short Leases, Report Recovery Time And Check Coverage"""
+
+	folder = tempfile.mkdtemp(dir=args.tmp)
+
+	meta = SyntheticMeta()
+
+	try:
+		logs = psearch.KeyedList([ psearch.Log(f"/logs/source{index % 50}/test.log.{20210101 + index}",meta,output=os.devnull,size=0,encodedDate=psearch.date(2021,1,1)) for index in range(args.logs) ])
+		remoteAssignments = psearch.KeyedList(logof=lambda assignment: assignment.Log)
+
+		filenames = [ log.Filename for log in logs ]
+
+		server = psearch.SearchServer(host="127.0.0.1",port=0)
+		server.LeaseTime = args.lease
+		server.LeaseCheck = args.lease / 10
+
+		record = { "searched" : [], "rejected" : [] }
+		done = threading.Event()
+
+		# The doomed clients start first so they are holding work when they go
+		fates = [ "killed" ] * args.killed + [ "stalled" ] * args.stalled + [ "normal" ] * args.clients
+
+		print(f"{args.logs} logs, {args.clients} clients, {args.killed} killed and {args.stalled} stalled mid search, {args.lease}s leases")
+
+		workers = []
+
+		for index, fate in enumerate(fates):
+			worker = threading.Thread(target=LeaseClient,args=(server.Port,str(100000 + index),args.threads,args.work,fate,folder,record,done,args.lease),daemon=True)
+			worker.start()
+			workers.append(worker)
+
+			tm.sleep(0.01)
+
+		started = tm.perf_counter()
+
+		completed = []
+
+		while len(logs) > 0 or len(remoteAssignments) > 0:
+			completed += server.Process([ meta ],logs,[],[],[],remoteAssignments,timeout=0.01)
+
+		elapsed = tm.perf_counter() - started
+
+		# Stalled clients come back and report, all of it late
+		done.set()
+
+		while any([ worker.is_alive() for worker in workers ]):
+			completed += server.Process([ meta ],logs,[],[],[],remoteAssignments,timeout=0.01)
+
+		server.Close()
+
+		counts = Counter([ log.Filename for log in completed ])
+
+		missing = [ filename for filename in filenames if counts[filename] == 0 ]
+		twice = [ filename for filename, count in counts.items() if count > 1 ]
+
+		accepted = set([ os.path.basename(log.Output) for log in completed ])
+		orphans = [ name for name in os.listdir(folder) if name not in accepted ]
+
+		print("{:>24} {:>10.3f}s".format("elapsed",elapsed))
+		print("{:>24} {:>10}".format("completions accepted",len(completed)))
+		print("{:>24} {:>10}".format("searches run",len(record["searched"])))
+		print("{:>24} {:>10}".format("duplicates turned down",len(record["rejected"])))
+		print("{:>24} {:>10}".format("missing",len(missing)))
+		print("{:>24} {:>10}".format("completed twice",len(twice)))
+		print("{:>24} {:>10}".format("orphaned results",len(orphans)))
+		print("exactly once : " + ("verified" if len(missing) == 0 and len(twice) == 0 and len(orphans) == 0 else "FAILED"))
+	finally:
+		shutil.rmtree(folder,ignore_errors=True)
+
+# Echo Peer For The Wire Benchmark, Answers Every Packet With An ACK In The Same Protocol
+def WireEcho(sock,count):
+	"""Receive count Packets, ACK Each"""
+
+	msgpkt = psearch.MsgPacket()
+
+	for index in range(count):
+		if not msgpkt.RecvMsg(sock):
+			break
+
+		psearch.MsgPacket(psearch.NetworkingBase.ACK,"1",protocol=msgpkt.Protocol).SendMsg(sock)
+
+# Wire Benchmark : round trip latency and large payload throughput, v1 vs v2 framing
+def BenchWire(args):
+	"""Loopback Round Trips Of Small Packets, Then One Way Large Payloads, Per Framing"""
+
+	payload = SyntheticLines(max(1,int(args.payload * 1048576 / 80)),iocs=100)
+	payloadSize = sum([ len(line) + 1 for line in payload ]) / 1048576
+	small = [ "ID", "/logs/source1/test.log.20210401", "/tmp/output.20210401" ]
+
+	modes = [ ( "v1", 1, 0 ), ( "v2", 2, 0 ), ( "v2 + zlib", 2, psearch.MsgPacket.CompressAbove ) ]
+
+	print(f"{args.roundtrips} round trips, {args.transfers} transfers of {payloadSize:.1f} MiB ({len(payload)} lines)")
+
+	for name, protocol, compressAbove in modes:
+		listener = socket.create_server(( "127.0.0.1", 0 ))
+		port = listener.getsockname()[1]
+
+		client = socket.create_connection(( "127.0.0.1", port ))
+		client.setsockopt(socket.IPPROTO_TCP,socket.TCP_NODELAY,1)
+
+		peer, address = listener.accept()
+		peer.setsockopt(socket.IPPROTO_TCP,socket.TCP_NODELAY,1)
+		listener.close()
+
+		echo = threading.Thread(target=WireEcho,args=(peer,args.roundtrips + args.transfers),daemon=True)
+		echo.start()
+
+		msgpkt = psearch.MsgPacket(psearch.NetworkingBase.ASSIGN,small,protocol=protocol)
+		msgpkt.CompressAbove = compressAbove
+		reply = psearch.MsgPacket()
+
+		latencies = []
+
+		for index in range(args.roundtrips):
+			started = tm.perf_counter()
+
+			msgpkt.SendMsg(client)
+			reply.RecvMsg(client)
+
+			latencies.append(tm.perf_counter() - started)
+
+		latencies.sort()
+
+		msgpkt = psearch.MsgPacket(psearch.NetworkingBase.INFORM,payload,protocol=protocol)
+		msgpkt.CompressAbove = compressAbove
+
+		wireBytes = len(msgpkt.Frame())
+		started = tm.perf_counter()
+
+		for index in range(args.transfers):
+			msgpkt.SendMsg(client)
+			reply.RecvMsg(client)
+
+		elapsed = tm.perf_counter() - started
+
+		echo.join()
+		client.close()
+		peer.close()
+
+		p50 = latencies[len(latencies) // 2] * 1000000
+		p99 = latencies[min(int(len(latencies) * 0.99),len(latencies) - 1)] * 1000000
+		throughput = args.transfers * payloadSize / elapsed
+
+		print("{:>24} round trip {:>8.1f}us p50 {:>8.1f}us p99, transfer {:>8.1f} MiB/s ({:.1f} MiB on the wire)".format(name,p50,p99,throughput,wireBytes / 1048576))
+
+# Transfer Benchmark : results sent back by a client the server can't share temp space with
+def BenchTransfer(args):
+	"""One Client Hands Results Back Through SearchServer, Raw (sendfile) And zlib, Report Throughput"""
+
+	folder = tempfile.mkdtemp(dir=args.tmp)
+	psearch.TempSpace = folder
+
+	try:
+		filename, count = SyntheticLog(folder,args.size,name="results.20210401")
+		size = os.path.getsize(filename)
+		meta = SyntheticMeta()
+
+		server = psearch.SearchServer(host="127.0.0.1",port=0)
+
+		print(f"{size / 1048576:.0f} MiB of results over loopback")
+
+		for index, ( name, compress ) in enumerate([ ( "raw (sendfile)", False ), ( "zlib", True ) ]):
+			# A log per run, the server NACKs a second COMPLETED for a file it already finished
+			log = psearch.Log(f"/logs/source{index}/test.log.20210401",meta,output=os.devnull,size=0,encodedDate=psearch.date(2021,4,1))
+			remoteAssignments = psearch.KeyedList([ psearch.RemoteAssignment(log,( "127.0.0.1", 0 ),os.getpid()) ],logof=lambda assignment: assignment.Log)
+
+			result = {}
+
+			def Client():
+				client = psearch.RemoteSearcher("127.0.0.1",server.Port)
+				client.Connect(5)
+				client.Socket.setsockopt(socket.IPPROTO_TCP,socket.TCP_NODELAY,1)
+				client.Protocol = 2
+
+				client.Packet(client.COMPLETED,[ log.Filename, "", str(os.getpid()), "1" ]).SendMsg(client.Socket)
+
+				reply = client.WaitReply()
+
+				if reply.Verb != client.FILE or reply.Data is None or len(reply.Data) < 2:
+					client.Disconnect()
+					return
+
+				result["sent"] = client.SendFile(filename,offset=int(reply.Data[1]),name=log.Filename,compress=compress)
+
+				client.Disconnect()
+
+			started = tm.perf_counter()
+
+			worker = threading.Thread(target=Client,daemon=True)
+			worker.start()
+
+			completed = []
+
+			while worker.is_alive():
+				completed += server.Process([ meta ],[],[],[],[],remoteAssignments,timeout=0.01)
+
+			# The last of the file may still be queued server side, but a client that died sends nothing more
+			drained = tm.perf_counter() + 5
+
+			while len(completed) == 0 and len(remoteAssignments) > 0 and tm.perf_counter() < drained:
+				completed += server.Process([ meta ],[],[],[],[],remoteAssignments,timeout=0.01)
+
+			elapsed = tm.perf_counter() - started
+
+			ok = len(completed) == 1 and os.path.getsize(completed[0].Output) == size
+
+			print("{:>24} {:>10.3f}s {:>8.0f} MiB/s {:>6.2f} GB/s {}".format(name,elapsed,size / 1048576 / elapsed,size / elapsed / 1e9,("verified" if ok and result.get("sent") else "FAILED")))
+
+			for log in completed:
+				os.remove(log.Output)
+
+		server.Close()
+	finally:
+		shutil.rmtree(folder,ignore_errors=True)
+
+# Assignment Benchmark : handout latency for 1..1000 assignments, per packet ACKs vs one batch
+def BenchAssign(args):
+	"""RemoteSearcher.GetAssignments Against One SearchServer Over Loopback, Legacy (v1) And Batched (v2)"""
+
+	meta = SyntheticMeta()
+	counts = [ int(count) for count in args.counts.split(",") ]
+	patterns = [ f"pattern{index}" for index in range(args.patterns) ]
+
+	server = psearch.SearchServer(host="127.0.0.1",port=0)
+
+	print(f"{args.requests} requests per count, {len(patterns)} patterns sent with the first request")
+
+	latest = psearch.MsgPacket.LatestProtocol
+
+	for count in counts:
+		for name, protocol in [ ( "per packet ACK (v1)", 1 ), ( "batch (v2)", 2 ) ]:
+			logs = psearch.KeyedList([ psearch.Log(f"/logs/source{index}/test.log.20210401",meta,output=os.devnull,size=0,encodedDate=psearch.date(2021,4,1)) for index in range(count * args.requests) ])
+			remoteAssignments = psearch.KeyedList(logof=lambda assignment: assignment.Log)
+
+			latencies = []
+			received = []
+
+			def Client():
+				client = psearch.RemoteSearcher("127.0.0.1",server.Port)
+				client.Connect(5)
+				client.Socket.setsockopt(socket.IPPROTO_TCP,socket.TCP_NODELAY,1)
+
+				for request in range(args.requests):
+					started = tm.perf_counter()
+
+					assignments, patternsReceived, namedQueries = client.GetAssignments([ meta ],count)
+
+					latencies.append(tm.perf_counter() - started)
+					received.append(len(assignments))
+
+				client.Disconnect()
+
+			# The HELLO advertises the newest protocol spoken, hold it back for the legacy run
+			psearch.MsgPacket.LatestProtocol = protocol
+
+			worker = threading.Thread(target=Client,daemon=True)
+			worker.start()
+
+			while worker.is_alive():
+				server.Process([ meta ],logs,patterns,[],[],remoteAssignments,timeout=0.01)
+
+			psearch.MsgPacket.LatestProtocol = latest
+
+			latencies.sort()
+
+			ok = sum(received) == count * args.requests
+
+			print("{:>6} assignments {:>22} {:>9.2f}ms p50 {:>9.2f}ms max {}".format(count,name,latencies[len(latencies) // 2] * 1000,latencies[-1] * 1000,("" if ok else f"ONLY {sum(received)} RECEIVED")))
+
+	server.Close()
+
+# Delay Pipe : forward one direction of a connection, each chunk held for delay seconds
+def DelayPipe(source,target,delay):
+	"""Chunks Go Out In Order, None Sooner Than delay After It Arrived"""
+
+	pending = queue.Queue()
+
+	def Sender():
+		while True:
+			due, data = pending.get()
+
+			if data is None:
+				break
+
+			wait = due - tm.perf_counter()
+
+			if wait > 0:
+				tm.sleep(wait)
+
+			try:
+				target.sendall(data)
+			except OSError:
+				break
+
+		try:
+			target.shutdown(socket.SHUT_WR)
+		except OSError:
+			pass
+
+	sender = threading.Thread(target=Sender,daemon=True)
+	sender.start()
+
+	while True:
+		try:
+			data = source.recv(65536)
+		except OSError:
+			data = b""
+
+		if not data:
+			pending.put(( 0, None ))
+			break
+
+		pending.put(( tm.perf_counter() + delay, data ))
+
+	sender.join()
+
+# Delay Proxy : accept connections and forward them to port, adding rtt / 2 each way
+def DelayProxy(listener,port,rtt):
+	"""Simulated High Latency Link In Front Of A Loopback Server"""
+
+	while True:
+		try:
+			inbound, address = listener.accept()
+		except OSError:
+			return
+
+		outbound = socket.create_connection(( "127.0.0.1", port ))
+
+		for sock in [ inbound, outbound ]:
+			sock.setsockopt(socket.IPPROTO_TCP,socket.TCP_NODELAY,1)
+
+		threading.Thread(target=DelayPipe,args=(inbound,outbound,rtt / 2),daemon=True).start()
+		threading.Thread(target=DelayPipe,args=(outbound,inbound,rtt / 2),daemon=True).start()
+
+# Sleeping Manager : a client side SearchManager whose workers sleep instead of searching
+class SleepingManager(psearch.SearchManager):
+	"""Logs Take Work Seconds +/- 50%, Results Go To An Existing Empty File The Server Can Reach"""
+
+	# Mean seconds each log takes
+	Work = 0.5
+	# Seconds slept so far
+	Busy = 0.0
+	# Results file handed back for every log
+	Results = None
+	# Sleeping workers
+	Pool = None
+
+	# Create Sleeping Workers
+	def CreateWorkers(self,clientmode=False):
+		while len(self.Threads) < self.MaxThreads and len(self.Logs) > 0:
+			log = self.Logs.pop()
+			log.SetOutput(self.Results)
+
+			work = self.Work * random.uniform(0.5,1.5)
+			self.Busy += work
+
+			self.Threads.append(( self.Pool.submit(tm.sleep,work), log ))
+
+# Prefetch Benchmark : worker utilisation of a remote client over a high latency link
+def BenchPrefetch(args):
+	"""SearchManager.ClientSearch Against A SearchServer Behind A Delay Proxy, Prefetch Windows Compared"""
+
+	folder = tempfile.mkdtemp(dir=args.tmp)
+	psearch.TempSpace = folder
+
+	# No keyboard polling, stdin may not be a terminal
+	psearch.CmdLineMode(False)
+
+	meta = SyntheticMeta()
+
+	try:
+		# Assigned logs must exist on the client, empty is enough
+		filenames = []
+
+		for index in range(args.logs):
+			filename = os.path.join(folder,f"test.log.{20210101 + index % 28 + index // 28 * 100}")
+
+			open(filename,"wb").close()
+			filenames.append(filename)
+
+		results = os.path.join(folder,"results")
+		open(results,"wb").close()
+
+		server = psearch.SearchServer(host="127.0.0.1",port=0)
+
+		listener = socket.create_server(( "127.0.0.1", 0 ))
+		threading.Thread(target=DelayProxy,args=(listener,server.Port,args.rtt),daemon=True).start()
+
+		print(f"{args.logs} logs of {args.work}s over {args.threads} threads, {args.rtt * 1000:.0f}ms round trip")
+
+		for prefetch in [ int(value) for value in args.prefetch.split(",") ]:
+			# Every run hands out the same logs, the server would take their completions as duplicates
+			server.Finished.clear()
+
+			logs = psearch.KeyedList([ psearch.Log(filename,meta,output=os.devnull,size=0,encodedDate=psearch.date(2021,1,1)) for filename in filenames ])
+			remoteAssignments = psearch.KeyedList(logof=lambda assignment: assignment.Log)
+
+			manager = SleepingManager(log_metas=[ meta ])
+			manager.MaxThreads = args.threads
+			manager.Work = args.work
+			manager.Results = results
+			manager.Pool = ThreadPoolExecutor(args.threads)
+
+			random.seed(1)
+
+			clientArgs = psearch.BuildParser().parse_args([ "search" ])
+			clientArgs.client = f"127.0.0.1:{listener.getsockname()[1]}"
+			clientArgs.compress = False
+			clientArgs.prefetch = str(prefetch)
+			clientArgs.clientwait = 5
+
+			started = tm.perf_counter()
+
+			worker = threading.Thread(target=manager.ClientSearch,args=(clientArgs,),daemon=True)
+			worker.start()
+
+			completed = []
+
+			while worker.is_alive():
+				completed += server.Process([ meta ],logs,[ "x" ],[],[],remoteAssignments,timeout=0.01)
+
+			elapsed = tm.perf_counter() - started
+
+			manager.Pool.shutdown()
+			manager.Executor.shutdown()
+
+			utilisation = manager.Busy / (elapsed * args.threads)
+
+			print("{:>12} prefetch {:>10.2f}s {:>8.1f}% worker utilisation {}".format(prefetch,elapsed,utilisation * 100,("" if len(completed) == args.logs else f"ONLY {len(completed)} COMPLETED")))
+
+		listener.close()
+		server.Close()
+	finally:
+		shutil.rmtree(folder,ignore_errors=True)
+
+# List Schedule : each free worker takes the next job, returns the makespan
+def ListSchedule(costs,workers):
+	"""Jobs Taken In List Order By Whichever Worker Frees Up First"""
+
+	loads = [ 0.0 ] * workers
+
+	for cost in costs:
+		heapq.heappush(loads,heapq.heappop(loads) + cost)
+
+	return max(loads)
+
+# Schedule Benchmark : makespan of log orderings, simulated over heavy tailed log sizes
+def BenchSchedule(args):
+	"""Catalog Order, The Old Smallest First Tail Pops, And Longest Predicted Cost First, Against The Lower Bound"""
+
+	meta = SyntheticMeta()
+	model = psearch.CostModel(patterns=args.patterns)
+
+	random.seed(args.seed)
+
+	logs = []
+
+	for index in range(args.logs):
+		# Pareto sizes, most logs are small, a few are huge
+		size = int(min(args.largest,random.paretovariate(1.2) * 4) * 1048576)
+		suffix = ".gz" if random.random() < args.gzipped else ""
+
+		logs.append(psearch.Log(f"/logs/source{index % 50}/test.log.20210401{suffix}",meta,output=os.devnull,size=size,encodedDate=psearch.date(2021,4,1)))
+
+	# Actual cost, the prediction is off by up to +/- noise
+	actual = { log.ID : model.Cost(log) * random.uniform(1 - args.noise,1 + args.noise) for log in logs }
+
+	total = sum(actual.values())
+	bound = max(total / args.workers,max(actual.values()))
+
+	orders = [
+		( "catalog order", logs ),
+		( "smallest first (old)", sorted(logs,key=lambda log : log.Size) ),
+		( "LPT (predicted cost)", sorted(logs,key=model.Cost,reverse=True) )
+	]
+
+	print(f"{args.logs} logs, {total / 3600:.2f}h of work over {args.workers} workers, lower bound {bound:.0f}s")
+
+	for name, order in orders:
+		makespan = ListSchedule([ actual[log.ID] for log in order ],args.workers)
+
+		print("{:>24} {:>10.0f}s {:>8.3f}x bound".format(name,makespan,makespan / bound))
+
+	print("{:>24} {:>10.0f}s".format("predicted (LPT)",model.Makespan(logs,args.workers)))
+
+# Build Parser
+def BuildParser():
+	"""Build Parser"""
+
+	global parser
+
+	parser = argparse.ArgumentParser(description="psearch benchmarks")
+
+	subparsers = parser.add_subparsers(help="benchmarks",dest="bench")
+
+	matcher = subparsers.add_parser("matcher",help="Per pattern loop vs single pass multi pattern matcher")
+	matcher.add_argument("--lines",type=int,default=20000,help="Synthetic lines per run")
+	matcher.add_argument("--patterns",help="CSV list of pattern counts (default 1,10,100,1000)")
+	matcher.set_defaults(func=BenchMatcher)
+
+	block = subparsers.add_parser("block",help="Line iterator vs block scanner")
+	block.add_argument("--size",type=float,default=64,help="Synthetic log size in MiB")
+	block.add_argument("--blocksize",type=float,default=8,help="Block size in MiB")
+	block.add_argument("--tmp",help="Folder for synthetic logs (default system temp)")
+	block.set_defaults(func=BenchBlock)
+
+	index = subparsers.add_parser("index",help="Token index build time, size and search speed-up")
+	index.add_argument("--size",type=float,default=256,help="Synthetic log size in MiB")
+	index.add_argument("--iocs",type=int,default=100,help="IOC users sprinkled through the log, the rare query hunts one")
+	index.add_argument("--engine",choices=[ "line", "block" ],default="block",help="Search engine")
+	index.add_argument("--tmp",help="Folder for synthetic logs (default system temp)")
+	index.set_defaults(func=BenchIndex)
+
+	fmt = subparsers.add_parser("format",help="Named query output as text, csv, jsonl and parquet, write throughput and downstream load time")
+	fmt.add_argument("--size",type=float,default=64,help="Synthetic log size in MiB")
+	fmt.add_argument("--engine",choices=[ "line", "block" ],default="line",help="Search engine")
+	fmt.add_argument("--tmp",help="Folder for synthetic logs (default system temp)")
+	fmt.set_defaults(func=BenchFormat)
+
+	agg = subparsers.add_parser("aggregate",help="Counting by named groups in the worker vs counting the text output")
+	agg.add_argument("--size",type=float,default=64,help="Synthetic log size in MiB")
+	agg.add_argument("--iocs",type=int,default=100,help="IOC users in the log (more users, more keys)")
+	agg.add_argument("--engine",choices=[ "line", "block" ],default="line",help="Search engine")
+	agg.add_argument("--tmp",help="Folder for synthetic logs (default system temp)")
+	agg.set_defaults(func=BenchAggregate)
+
+	cache = subparsers.add_parser("cache",help="Repeated search over rotated logs, cold, replayed from the result cache and uncached")
+	cache.add_argument("--size",type=float,default=256,help="Synthetic MiB across all logs")
+	cache.add_argument("--logs",type=int,default=8,help="Logs (days), every other one gzipped")
+	cache.add_argument("--iocs",type=int,default=100,help="IOC users the search hunts for")
+	cache.add_argument("--threads",type=int,default=4,help="Local search threads")
+	cache.add_argument("--tmp",help="Folder for synthetic logs and the cache (default system temp)")
+	cache.set_defaults(func=BenchCache)
+
+	term = subparsers.add_parser("terminate",help="Termination check cost, flag file per line vs shared event")
+	term.add_argument("--size",type=float,default=64,help="Synthetic log size in MiB")
+	term.add_argument("--path",help="Additional folder to test in, e.g. an NFS mount")
+	term.add_argument("--tmp",help="Folder for the local test (default system temp)")
+	term.set_defaults(func=BenchTerminate)
+
+	trace = subparsers.add_parser("trace",help="Per call tracing overhead, tracing off and on")
+	trace.add_argument("--calls",type=int,default=1000000,help="Calls per measurement")
+	trace.set_defaults(func=BenchTrace)
+
+	startup = subparsers.add_parser("startup",help="Log list construction over a large folder")
+	startup.add_argument("--files",type=int,default=100000,help="Synthetic files in the folder")
+	startup.add_argument("--legacymax",type=int,default=20000,help="Cap on files for the quadratic list de-duplication")
+	startup.add_argument("--tmp",help="Folder for the synthetic folder (default system temp)")
+	startup.set_defaults(func=BenchStartup)
+
+	order = subparsers.add_parser("order",help="In order output release with out of order completions (stress test)")
+	order.add_argument("--logs",type=int,default=20000,help="Synthetic logs")
+	order.add_argument("--sources",type=int,default=8,help="Logs per day")
+	order.add_argument("--lines",type=int,default=50000,help="Lines per source for the line merge")
+	order.add_argument("--legacymax",type=int,default=5000,help="Cap on logs for the quadratic scan ordering")
+	order.set_defaults(func=BenchOrder)
+
+	server = subparsers.add_parser("server",help="Loopback load test of the search controller with many simulated clients")
+	server.add_argument("--clients",type=int,default=200,help="Simulated clients")
+	server.add_argument("--threads",type=int,default=4,help="Assignments asked for per request")
+	server.add_argument("--logs",type=int,default=20000,help="Synthetic logs to hand out")
+	server.add_argument("--stalled",type=int,default=5,help="Clients that ask for work and then never read a reply")
+	server.add_argument("--stallfor",type=float,default=60,help="Seconds a stalled client holds its connection")
+	server.set_defaults(func=BenchServer)
+
+	leases = subparsers.add_parser("leases",help="Clients killed and stalled mid run, every log completed exactly once (stress test)")
+	leases.add_argument("--logs",type=int,default=500,help="Synthetic logs")
+	leases.add_argument("--clients",type=int,default=8,help="Healthy clients")
+	leases.add_argument("--killed",type=int,default=4,help="Clients that die holding assignments")
+	leases.add_argument("--stalled",type=int,default=2,help="Clients that go quiet past their lease, then report")
+	leases.add_argument("--threads",type=int,default=4,help="Assignments asked for per request")
+	leases.add_argument("--work",type=float,default=0.01,help="Seconds each log takes")
+	leases.add_argument("--lease",type=float,default=1,help="Lease time in seconds")
+	leases.add_argument("--tmp",help="Folder for result files (default system temp)")
+	leases.set_defaults(func=BenchLeases)
+
+	wire = subparsers.add_parser("wire",help="Round trip latency and large payload throughput, v1 vs v2 wire framing")
+	wire.add_argument("--roundtrips",type=int,default=20000,help="Small packet round trips per framing")
+	wire.add_argument("--transfers",type=int,default=20,help="Large payloads sent per framing")
+	wire.add_argument("--payload",type=float,default=16,help="Large payload size in MiB (roughly, 80 bytes a line)")
+	wire.set_defaults(func=BenchWire)
+
+	schedule = subparsers.add_parser("schedule",help="Makespan of log orderings, simulated over heavy tailed log sizes")
+	schedule.add_argument("--logs",type=int,default=2000,help="Synthetic logs")
+	schedule.add_argument("--workers",type=int,default=16,help="Workers")
+	schedule.add_argument("--largest",type=float,default=8192,help="Largest log in MiB")
+	schedule.add_argument("--gzipped",type=float,default=0.5,help="Fraction of gzip logs")
+	schedule.add_argument("--patterns",type=int,default=10,help="Patterns per search")
+	schedule.add_argument("--noise",type=float,default=0.3,help="Prediction error, actual cost is within +/- this fraction")
+	schedule.add_argument("--seed",type=int,default=1,help="Random seed")
+	schedule.set_defaults(func=BenchSchedule)
+
+	assign = subparsers.add_parser("assign",help="Assignment handout latency, per packet ACKs vs one batch")
+	assign.add_argument("--counts",default="1,10,100,1000",help="CSV list of assignments per request")
+	assign.add_argument("--requests",type=int,default=20,help="Requests per count")
+	assign.add_argument("--patterns",type=int,default=100,help="Patterns sent with the first request")
+	assign.set_defaults(func=BenchAssign)
+
+	prefetch = subparsers.add_parser("prefetch",help="Remote client worker utilisation over a simulated high latency link")
+	prefetch.add_argument("--logs",type=int,default=48,help="Logs handed out")
+	prefetch.add_argument("--threads",type=int,default=4,help="Client worker threads")
+	prefetch.add_argument("--work",type=float,default=0.5,help="Mean seconds each log takes (+/- 50%%)")
+	prefetch.add_argument("--rtt",type=float,default=0.1,help="Simulated round trip in seconds")
+	prefetch.add_argument("--prefetch",default="0,2,4",help="CSV list of prefetch windows")
+	prefetch.add_argument("--tmp",help="Folder for the assigned (empty) logs (default system temp)")
+	prefetch.set_defaults(func=BenchPrefetch)
+
+	transfer = subparsers.add_parser("transfer",help="Result transfer from a client back to the server over loopback")
+	transfer.add_argument("--size",type=float,default=512,help="Synthetic result file size in MiB")
+	transfer.add_argument("--tmp",help="Folder for synthetic files (default system temp)")
+	transfer.set_defaults(func=BenchTransfer)
+
+	gz = subparsers.add_parser("gzip",help="Gzip decompressors and split member searching")
+	gz.add_argument("--size",type=float,default=256,help="Synthetic log size in MiB (uncompressed)")
+	gz.add_argument("--member",type=float,default=4,help="Gzip member size in MiB (uncompressed)")
+	gz.add_argument("--workers",type=int,default=os.cpu_count(),help="Largest worker count to split across")
+	gz.add_argument("--engine",choices=[ "line", "block" ],default="block",help="Search engine, block keeps decompression the dominant cost")
+	gz.add_argument("--tmp",help="Folder for synthetic logs (default system temp)")
+	gz.set_defaults(func=BenchGzip)
+
+	return parser
+
+# Initialize psearch Enough To Use Its Classes Directly
+def Initialize():
+	"""Initialize"""
+
+	psearch.tracer = psearch.Tracable()
+
+	random.seed(1)
+
+#
+# Main Loop
+#
+if __name__ == "__main__":
+	Initialize()
+
+	args = BuildParser().parse_args()
+
+	if args.bench:
+		# Benchmarks return True when their results failed a check
+		if args.func(args):
+			sys.exit(1)
+	else:
+		parser.print_help()
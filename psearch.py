@@ -1,12 +1,14 @@
 #!/usr/bin/env python3.8
 
-import os, sys, io, socket, select
-import re, random, queue
+import os, sys, io, socket, select, selectors
+import re, random, queue, threading
 import argparse,configparser,logging
-from collections import deque
+from collections import deque, Counter
 import xml, json, csv, hashlib
 import xml.etree.ElementTree as ET
-import gzip
+import gzip, zlib
+import copy, shutil, subprocess, bisect, functools, heapq, struct, itertools, tempfile
+import sqlite3
 
 # Debug Stuff
 import inspect
@@ -20,8 +22,19 @@ from datetime import datetime,timedelta,date,time
 import time as tm
 
 import multiprocessing
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait as WaitFor
 
+# Regular Expression Parse Trees (for literal extraction)
+try:
+	from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:
+	import sre_parse, sre_constants
+
+# Parquet Output (optional, see ResultFormat)
+try:
+	import pyarrow, pyarrow.json, pyarrow.parquet
+except ImportError:
+	pyarrow = None
 
 import py_helper as ph
 from py_helper import DebugMode,CmdLineMode,Pause,Log,Msg,ErrMsg,DbgMsg,DbgAuto
@@ -61,9 +74,17 @@ searchManager = None
 TRACEStatefile = "trace_ex.txt"
 # Tracer
 tracer = None
+# Functions instrumented with @Traced [ (callerid, function) ]
+TracedCalls = []
 
 # Thread terminate semaphore
 TerminateFlag = ""
+# Shared terminate event (set in worker processes by InitWorker)
+TerminateEvent = None
+# Result queue workers stream matches to (set in worker processes by InitWorker)
+ResultQueue = None
+# Lines searched between termination checks
+TerminateCheckLines = 4096
 
 # Mounts (for log sources)
 Mounts = list()
@@ -79,6 +100,9 @@ LogLocations=[ "/srv/equallogic/fsm_logs", "/srv/array2/fsm_logs", LogMount ]
 # Temp Space for intemediate output
 TempSpace = "/tmp"
 
+# Ignore the stored log catalog and rescan folders (--rescan)
+CatalogRescan = False
+
 # Default Seconds to Wait For a Connection to Client or Server
 DefaultConnectionWait = 585
 
@@ -113,10 +137,60 @@ AccessTime = lambda filename : datetime.fromtimestamp(os.path.getatime(filename)
 # Top Level Functions
 #
 
-# Search Through Open File
-def OpenFileSearch(log,f_in,patterns,streamers,limit,termflag):
-	tracer.Entering("global::OpenFileSearch")
+# Trace Decorator : Register A Function For Entering/Exitting Tracing
+def Traced(callerid):
+	"""Register func, Tracable.Enable Swaps In A Tracing Wrapper, Until Then It Is Untouched"""
+
+	def register(func):
+		TracedCalls.append(( callerid, func ))
+
+		return func
+
+	return register
+
+# Get The Module Or Class Holding A Function
+def TracedOwner(func):
+	owner = sys.modules[func.__module__]
+
+	for name in func.__qualname__.split(".")[:-1]:
+		owner = getattr(owner,name)
+
+	return owner
+
+# Build Tracing Wrapper For A @Traced Function
+def TraceWrapper(callerid,func):
+	@functools.wraps(func)
+	def traced(*args,**kwargs):
+		tracer.Entering(callerid)
+
+		try:
+			return func(*args,**kwargs)
+		finally:
+			tracer.Exitting(callerid)
+
+	return traced
+
+# Initialize Search Worker Process
+def InitWorker(event,results=None):
+	"""Executor Initializer, Events And Queues Can Only Reach Workers Through Inheritance"""
+
+	global TerminateEvent, ResultQueue
 
+	TerminateEvent = event
+	ResultQueue = results
+
+# Check If Search Should Stop
+def Terminating(termflag=None):
+	"""True If The Shared Event Is Set Or The Optional Terminate File Exists"""
+
+	if TerminateEvent is not None and TerminateEvent.is_set():
+		return True
+
+	return termflag is not None and os.path.exists(termflag)
+
+# Search Through Open File
+@Traced("global::OpenFileSearch")
+def OpenFileSearch(log,f_in,patterns,streamers,limit,termflag,bytesmode=True,engine="line",blocksize=None,resultformat=None,aggregate=None):
 	textStream = False
 
 	logOut = "stdout"
@@ -137,15 +211,40 @@ def OpenFileSearch(log,f_in,patterns,streamers,limit,termflag):
 		logOut = "Output supplied was stdout"
 		textStream = True
 		f_out = log.Output
+	elif log.Output and type(log.Output) is ResultStream:
+		logOut = "Streaming to search manager"
+		f_out = log.Output
+
+	# Decoded lines are re-encoded as found, except when streamed (the manager writes raw bytes)
+	outEncoding = "utf-8" if type(f_out) is ResultStream else None
 
 	progs = []
 
 	for pattern in patterns:
-		if pattern is str:
+		if type(pattern) is str:
 			progs.append(Query(pattern))
 		else:
 			progs.append(pattern)
 
+	# Raw lines can only be matched if every pattern also compiled as a bytes expression
+	if bytesmode and not all([ prog.BytesProgram for prog in progs ]):
+		log.Track("pattern(s) not usable as bytes expressions, decoding every line")
+		bytesmode = False
+
+	# All patterns are checked in a single pass, see QueryMatcher
+	matcher = QueryMatcher(progs,binary=bytesmode)
+
+	# Unicode sensitive patterns (see Query.Unicode) check non ASCII raw lines decoded, as the legacy path would
+	textMatcher = QueryMatcher(progs) if bytesmode and any([ prog.Unicode for prog in progs ]) else None
+
+	# Matches as CSV or JSON Lines records (see ResultFormat), otherwise named groups are space joined
+	encode = resultformat.Encoder(log) if resultformat and resultformat.Structured() else None
+
+	# Aggregated searches count matches by their group values, only the counts are written (see Aggregate)
+	counts = Counter() if aggregate else None
+	countColumns = aggregate.Columns if aggregate else None
+
+	linesRead = 0
 	linesProcessed = 0
 	matchingLines = 0
 
@@ -158,96 +257,275 @@ def OpenFileSearch(log,f_in,patterns,streamers,limit,termflag):
 	# Init Pattern Count
 	patternCount = len(progs)
 
-	tracer.Inside("global::OpenFileSearch",postfix=f"Beginning Search of {log.Filename}")
+	if tracer.Enabled:
+		tracer.Inside("global::OpenFileSearch",postfix=f"Beginning Search of {log.Filename}")
 
 	# If we want to use multiple indexes, we have to merge the indexes and order the
 	# the positions in ascending order. In reality, we will probably just be using one
 	# at a time.
 
-	for rawline in f_in:
-		if os.path.exists(termflag):
-			break
+	# The block engine hands over only lines around hits, the line engine hands over every line
+	scanner = None
+	source = f_in
 
-		try:
-			decoded, used, line = log.Decode(rawline)
+	if engine == "block":
+		if not (bytesmode and patternCount > 0):
+			log.Track("block engine needs patterns and raw byte matching, using line engine")
+		elif not BlockScanner.Usable(progs):
+			log.Track("pattern(s) that can read past their own line (newline, \\A, \\Z, lookarounds), using line engine")
+		else:
+			scanner = BlockScanner(progs,blocksize)
+			source = scanner.Lines(f_in,termflag)
 
-			if not decoded:
-				DbgMsg("{} - Decoding line {} failed".format(logName,processedLines+1))
-				continue
+	if bytesmode:
+		# Match raw lines, only lines that match are ever decoded (and only for text output)
+		for rawline in source:
+			linesRead += 1
 
-			if patternCount > 0:
-				for prog in progs:
-					matches = prog.Match(line)
+			if linesRead % TerminateCheckLines == 0 and Terminating(termflag):
+				break
+
+			try:
+				if patternCount > 0:
+					if textMatcher and not rawline.isascii():
+						decoded, used, line = log.Decode(rawline)
+						prog, matches = textMatcher.Match(line) if decoded else ( None, None )
+					else:
+						prog, matches = matcher.Match(rawline)
 
 					if matches:
-						# Run line through stream
 						matchingLines += 1
 
-						# Check for named groups, then only print named groups
+						# Check for named groups, then only print named groups (str values if the line was decoded)
 						groups = matches.groupdict()
 
-						if groups and len(groups) > 0:
-							keys = groups.keys()
+						if counts is not None:
+							counts[tuple([ groups.get(name) for name in countColumns ])] += 1
+						else:
+							if encode:
+								rawline = encode(groups,rawline)
+							elif groups and len(groups) > 0:
+								rawline = b" ".join([ (b"None" if value is None else value.encode(outEncoding or used) if type(value) is str else value) for value in groups.values() ]).strip() + b"\n"
+
+							if textStream:
+								decoded, used, line = log.Decode(rawline)
+								f_out.write(line)
+							else:
+								f_out.write(rawline)
+				else:
+					# Run line through streamer
+					matchingLines += 1
+
+					if encode:
+						rawline = encode({},rawline)
+
+					if textStream:
+						decoded, used, line = log.Decode(rawline)
+						f_out.write(line)
+					else:
+						f_out.write(rawline)
+
+				linesProcessed += 1
+
+				if limit > 0 and matchingLines >= limit:
+					break
+
+			except Exception as err:
+				DbgMsg(f"{logName} - OpenFileSearch : {err}")
+	else:
+		for rawline in f_in:
+			linesRead += 1
+
+			if linesRead % TerminateCheckLines == 0 and Terminating(termflag):
+				break
+
+			try:
+				decoded, used, line = log.Decode(rawline)
 
-							newline = ""
+				if not decoded:
+					DbgMsg("{} - Decoding line {} failed".format(logName,linesProcessed+1))
+					continue
+
+				if patternCount > 0:
+					prog, matches = matcher.Match(line)
 
-							for key in keys:
-								newline += f"{groups[key]} "
+					if matches:
+						# Run line through stream
+						matchingLines += 1
 
-							line = newline.strip() + "\n"
+						# Check for named groups, then only print named groups
+						groups = matches.groupdict()
 
-						if textStream:
-							f_out.write(line)
+						if counts is not None:
+							counts[tuple([ groups.get(name) for name in countColumns ])] += 1
 						else:
-							f_out.write(bytearray(line,used))
+							if encode:
+								line = encode(groups,line).decode("utf-8")
+								used = "utf-8"
+							elif groups and len(groups) > 0:
+								keys = groups.keys()
 
-						break
-			else:
-				# Run line through streamer
-				matchingLines += 1
-				if textStream:
-					f_out.write(line)
+								newline = ""
+
+								for key in keys:
+									newline += f"{groups[key]} "
+
+								line = newline.strip() + "\n"
+
+							if textStream:
+								f_out.write(line)
+							else:
+								f_out.write(bytearray(line,outEncoding or used))
 				else:
-					f_out.write(bytearray(line,used))
+					# Run line through streamer
+					matchingLines += 1
 
-			linesProcessed += 1
+					if encode:
+						line = encode({},line).decode("utf-8")
+						used = "utf-8"
 
-			if limit > 0 and matchingLines >= limit:
-				break
+					if textStream:
+						f_out.write(line)
+					else:
+						f_out.write(bytearray(line,outEncoding or used))
 
-		except Exception as err:
-			DbgMsg(f"{logName} - OpenFileSearch : {err}")
+				linesProcessed += 1
+
+				if limit > 0 and matchingLines >= limit:
+					break
+
+			except Exception as err:
+				DbgMsg(f"{logName} - OpenFileSearch : {err}")
+
+	if counts is not None:
+		partial = aggregate.Partial(counts)
+
+		f_out.write(partial.decode("utf-8") if textStream else partial)
 
 	if type(log.Output) is str:
 		f_out.close()
 
+	if scanner:
+		linesProcessed = scanner.LinesScanned
+
 	log.Track(f"search completed, {matchingLines} matches")
 
-	# DbgMsg(f"{logName} - {linesProcessed} processed, {matchingLines} lines matched")
+	if patternCount > 1 and matchingLines > 0:
+		log.Track(f"matches by pattern {matcher.HitSummary()}")
 
-	tracer.Exitting("global::OpenFileSearch")
+	# DbgMsg(f"{logName} - {linesProcessed} processed, {matchingLines} lines matched")
 
 	return matchingLines
 
 # Begin Log Search
-def SearchLog(log,patterns,streamers,limit,termflag):
-	tracer.Entering("global::SearchLog")
-
+@Traced("global::SearchLog")
+def SearchLog(log,patterns,streamers,limit,termflag,bytesmode=True,engine="line",blocksize=None,resultformat=None,aggregate=None):
 	lines = 0
+	completed = False
+
+	# Streamed logs send their matches to the manager instead of a temp file, a copy goes to the result cache
+	if log.Streamed and ResultQueue is not None:
+		log.Output = ResultStream(ResultQueue,log.ID,tee=ResultCache.Open(log))
 
 	try:
-		# Here the log.Open function determines if the log is compressed or not
-		# and takes the appropriate action to open the file
-		with log.Open() as f_in:
-			lines = OpenFileSearch(log,f_in,patterns,streamers,limit,termflag)
+		# A token index can rule the log out, or narrow a plain log down to the blocks that may match
+		ranges = TokenIndex(log.Filename,log.TokenIndexFile).Candidates(patterns,log) if log.TokenIndexFile else None
+
+		if ranges is None:
+			# Here the log.Open function determines if the log is compressed or not
+			# and takes the appropriate action to open the file
+			f_in = log.Open()
+		elif len(ranges) == 0:
+			log.Track("token index shows no block can match, not read")
+			f_in = io.BufferedReader(io.BytesIO())
+		else:
+			log.Track(f"token index narrowed the search to {sum([ end - start for start, end in ranges ])} bytes in {len(ranges)} range(s)")
+			f_in = RangesReader.Open(log.Filename,ranges)
+
+		with f_in:
+			# Raw byte matching assumes an ASCII compatible encoding, UTF-16 logs must be decoded first
+			if bytesmode and log.NeedsDecoding(f_in):
+				log.Track("UTF-16 byte order mark found, decoding every line")
+				bytesmode = False
+
+			lines = OpenFileSearch(log,f_in,patterns,streamers,limit,termflag,bytesmode,engine,blocksize,resultformat,aggregate)
+
+			# Only a fully read file yields a complete member index
+			if log.IndexFile and ranges is None and f_in.raw.Finished:
+				GzipIndex(log.Filename,log.IndexFile).Save(f_in.raw.Members)
+				log.Track(f"recorded gzip index, {len(f_in.raw.Members)} members")
+
+		# Set once the handle is closed, closing a decompressor is where a truncated file shows up
+		completed = not Terminating(termflag)
 
 	except Exception as err:
 		DbgMsg(f"Error SearchLog : {err}")
 
-	tracer.Exitting("global::SearchLog")
+		# Partial output from a truncated or corrupt gzip (decompressor pipe, gzip.open, GzipMemberStream) is not a
+		# searched log, the manager reports it and it is neither cached nor learned from
+		if isinstance(err,( EOFError, zlib.error, gzip.BadGzipFile )) or (isinstance(err,OSError) and type(log.OpenHandle) is DecompressorPipe):
+			raise
+	finally:
+		# Always end the stream, the manager waits for it
+		if type(log.Output) is ResultStream:
+			log.Output.close()
+
+		if log.CacheFile:
+			ResultCache.Keep(log,completed)
+
+	return lines
+
+# Replay A Result Cache Entry (Worker Side)
+@Traced("global::ReplayLog")
+def ReplayLog(cachefile,log,*search):
+	"""Write The Entry To The Log's Output As SearchLog Would Have, If It's Gone Search After All (search Are SearchLog's Remaining Arguments)"""
+
+	lines = 0
+
+	try:
+		f_in = open(cachefile,"rb")
+	except OSError as err:
+		log.Track(f"result cache entry gone ({err}), searching")
+
+		return SearchLog(log,*search)
+
+	if log.Streamed and ResultQueue is not None:
+		log.Output = ResultStream(ResultQueue,log.ID)
+
+	try:
+		with f_in:
+			f_out = open(log.Output,"wb") if type(log.Output) is str else log.Output
+
+			for block in iter(lambda: f_in.read(1024 * 1024),b""):
+				f_out.write(block)
+				lines += block.count(b"\n")
+
+			if type(log.Output) is str:
+				f_out.close()
+	except Exception as err:
+		DbgMsg(f"Error ReplayLog : {err}")
+	finally:
+		if type(log.Output) is ResultStream:
+			log.Output.close()
 
 	return lines
 
+# Build A Token Index Sidecar (Worker Side)
+def IndexLog(log,indexfile,niceness=None):
+	"""TokenIndex.Build At A Lower Priority, So Live Searches Keep The CPU. Returns (built, seconds)"""
+
+	if niceness is not None:
+		try:
+			os.setpriority(os.PRIO_PROCESS,0,niceness)
+		except OSError:
+			pass
+
+	started = tm.perf_counter()
+
+	built = TokenIndex(log.Filename,indexfile).Build(log)
+
+	return built, tm.perf_counter() - started
+
 # Show Log Info
 # Params:
 # showpattern - True/False, show the log file name pattern expression
@@ -274,6 +552,14 @@ def ShowLogsInfo(showpattern=False,filter=None,status=None,showCounts=False,samp
 
 	Msg(fmt.format(*columns))
 
+	counts = dict()
+
+	if showCounts:
+		# One scan per location for all metas, the catalog is closed before any sample is read
+		with LogCatalog.Default(LogMetas) as catalog:
+			for meta in LogMetas:
+				counts[id(meta)] = sum(catalog.Count(meta,logPath) for logPath in LogLocations)
+
 	for meta in LogMetas:
 		if status and not re.match(status,meta.Status):
 			continue
@@ -296,12 +582,7 @@ def ShowLogsInfo(showpattern=False,filter=None,status=None,showCounts=False,samp
 		statusField = meta.Status
 
 		if showCounts:
-			count = 0
-
-			for logPath in LogLocations:
-				count += len(meta.GetLogFiles(folder=logPath))
-
-			statusField = f"{meta.Status}/{count}"
+			statusField = f"{meta.Status}/{counts[id(meta)]}"
 
 		columns = [ meta.Nickname, ",".join(meta.LogGroups), statusField, meta.Name ]
 
@@ -379,16 +660,17 @@ def ShowLogs(status,logspec):
 	else:
 		selected.extend(metas)
 
-	for logPath in LogLocations:
-		Msg(f"Logs in Storage Location : {logPath}\n" + "=" * 40)
+	with LogCatalog.Default(selected) as catalog:
+		for logPath in LogLocations:
+			Msg(f"Logs in Storage Location : {logPath}\n" + "=" * 40)
 
-		for meta in selected:
-			logs = meta.GetLogFiles(folder=logPath)
+			for meta in selected:
+				logs = meta.GetLogFiles(folder=logPath,catalog=catalog)
 
-			Msg(f"Logs Of {meta.Name} / {meta.Nickname} / {meta.Description} - {len(logs)}")
+				Msg(f"Logs Of {meta.Name} / {meta.Nickname} / {meta.Description} - {len(logs)}")
 
-			for log in logs:
-				Msg(f"{log.Filename}")
+				for log in logs:
+					Msg(f"{log.Filename}")
 
 #
 # Classes
@@ -449,7 +731,7 @@ class TitleValueFormatter:
 class Tracable:
 	# State File
 	Statefile = None
-	# Active States
+	# Active States (callerid -> state)
 	TraceStates = None
 	# Trace Enable Flag
 	Enabled = False
@@ -458,9 +740,11 @@ class Tracable:
 
 	# Init Intance
 	def __init__(self,statefile=None,enabled=False):
+		self.TraceStates = dict()
 		self.LoadStates(statefile)
-		self.Enabled = enabled
-		self.TraceStates = []
+
+		if enabled:
+			self.Enable()
 
 	# Load State file
 	def LoadStates(self,statefile=None):
@@ -475,10 +759,10 @@ class Tracable:
 					for line in f_in:
 						line = line.strip()
 
-						if not line.startswith("#") or line != "":
-							tuple = line.split(",")
+						if not line.startswith("#") and line != "":
+							callerid, state = (line.split(",",1) + [ "none" ])[:2]
 
-							self.TraceStates.append(tuple)
+							self.TraceStates[callerid] = state
 			else:
 				print(f"{self.Statefile} does not appear to exist")
 
@@ -487,18 +771,18 @@ class Tracable:
 		self.Statefile = filename
 
 		with open(self.Statefile,"wt") as f_out:
-			for entry in self.TraceStates:
-				f_out.write(f"{entry[0]},{entry[1]}\n")
+			for callerid, state in self.TraceStates.items():
+				f_out.write(f"{callerid},{state}\n")
 
 	# Add State to Trace State Lit
 	def AddState(self,callerid,state=None):
 		if type(callerid) is list and state is None:
-			self.TraceStates.append(callerid)
-		else:
-			if state is None:
-				state = "none"
+			callerid, state = callerid
+
+		if state is None:
+			state = "none"
 
-			self.TraceStates.append([callerid,state])
+		self.TraceStates[callerid] = state
 
 	# Add States To Trace State List
 	def AddStates(self,spairs):
@@ -512,6 +796,13 @@ class Tracable:
 
 		return callerframe
 
+	# Get Callerid From String Or Calling Object (only inspects frames for objects)
+	def CallerID(self,traceCaller,callerframe):
+		if type(traceCaller) is str:
+			return traceCaller
+
+		return f"{traceCaller.__class__.__name__}::{callerframe.f_code.co_name}"
+
 	# Add Reference To State Table
 	def AddReference(self,object):
 		if object.__class__.__name__ == "function":
@@ -532,215 +823,108 @@ class Tracable:
 	def Enable(self):
 		self.Enabled = True
 
+		# Swap tracing wrappers in for @Traced functions
+		for callerid, func in TracedCalls:
+			owner = TracedOwner(func)
+
+			if owner.__dict__.get(func.__name__) is func:
+				setattr(owner,func.__name__,TraceWrapper(callerid,func))
+
 	# Disable Tracing
 	def Disable(self):
 		self.Enabled = False
 
-	# Get Trace Entry
-	def GetTraceEntry(self,traceCaller):
-		callerid = ""
-
-		if type(traceCaller) is str:
-			callerid = traceCaller
-		else:
-			callerframe = inspect.currentframe().f_back
+		# Put the undecorated functions back, the disabled path is then a plain call
+		for callerid, func in TracedCalls:
+			owner = TracedOwner(func)
 
-			callerclass = traceCaller.__class__.__name__
-			callername = callerframe.f_code.co_name
-			callerid = f"{callerclass}::{callername}"
+			if getattr(owner.__dict__.get(func.__name__),"__wrapped__",None) is func:
+				setattr(owner,func.__name__,func)
 
-		entry = None
+	# Get Trace Entry
+	def GetTraceEntry(self,traceCaller):
+		callerid = self.CallerID(traceCaller,inspect.currentframe().f_back)
 
-		for tuple in self.TraceStates:
-			if tuple[0] == callerid:
-				entry = tuple
-				break
+		state = self.TraceStates.get(callerid)
 
-		return entry
+		return [ callerid, state ] if state is not None else None
 
 	# Get Trace State of supplied Caller
 	def GetTraceState(self,traceCaller):
-		callerid = ""
-
-		if type(traceCaller) is str:
-			callerid = traceCaller
-		else:
-			callerframe = inspect.currentframe().f_back
-
-			callerclass = traceCaller.__class__.__name__
-			callername = callerframe.f_code.co_name
-			callerid = f"{callerclass}::{callername}"
-
-		state = None
+		callerid = self.CallerID(traceCaller,inspect.currentframe().f_back)
 
-		entry = self.GetTraceEntry(callerid)
-
-		if entry:
-			state = entry[1]
-
-		return state
+		return self.TraceStates.get(callerid)
 
 	# Set State of Callerid (or clear) callerid for Trace Processing
 	def SetTraceState(self,traceCaller,state="none"):
 		"""Set Trace State"""
 
-		if type(traceCaller) is list:
-			for id in traceCaller:
-				callerid = ""
-
-				if type(id) is str:
-					callerid = id
-				else:
-					callerframe = inspect.currentframe().f_back
-					callerclass = id.__class__.__name__
-					callername = callerframe.f_code.co_name
-
-					callerid = f"{callerclass}::{callername}"
-
-				entry = self.GetTraceEntry(callerid)
-
-				if entry:
-					entry[1] = state
-				elif callerid != "":
-					self.AddState([ callerid, state ])
-		else:
-			callerid = ""
-
-			if type(traceCaller) is str:
-				callerid = traceCaller
-			else:
-				callerframe = inspect.currentframe().f_back
-				callerclass = traceCaller.__class__.__name__
-				callername = callerframe.f_code.co_name
+		callerframe = inspect.currentframe().f_back
 
-				callerid = f"{callerclass}::{callername}"
+		if not type(traceCaller) is list:
+			traceCaller = [ traceCaller ]
 
-			entry = self.GetTraceEntry(callerid)
+		for id in traceCaller:
+			callerid = self.CallerID(id,callerframe)
 
-			if entry:
-				entry[1] = state
-			elif callerid != "":
-				self.AddState([ callerid, state ])
+			if callerid != "":
+				self.TraceStates[callerid] = state
 
 	# Trace Function : Display tracing messages
 	def Trace(self,traceCaller,callerframe=None,prefix="",postfix=""):
 
 		if self.Enabled:
-			callerid = ""
-
 			if callerframe is None:
 				callerframe = inspect.currentframe().f_back
 
-			if type(traceCaller) is str:
-				callerid = traceCaller
-			else:
-				callerclass = traceCaller.__class__.__name__
-				callername = callerframe.f_code.co_name
-				callerid = f"{callerclass}::{callername}"
+			callerid = self.CallerID(traceCaller,callerframe)
 
 			if callerid == "":
 				print(f"Could not determine trace caller for {traceCaller}")
 			else:
-				entry = self.GetTraceEntry(callerid)
-				state = None
+				state = self.TraceStates.get(callerid)
 
-				if entry:
-					state = entry[1]
-
-				if entry and not (state in [ "both", "all" ] or not entry):
+				if state is not None and not state in [ "both", "all" ]:
 
 					trcmsg = f"File {callerframe.f_code.co_filename} line {callerframe.f_lineno} : {prefix}{callerid} {postfix}"
 
 					# If set to "once", disable
-					if (entry and state == "once"):
-						entry[1] = "all"
+					if state == "once":
+						self.TraceStates[callerid] = "all"
 
 					print(trcmsg)
 
 				self.LastCalled = callerid
 
+	# Issue Trace Message Unless State Suppresses This Kind
+	def TraceKind(self,traceCaller,callerframe,prefix,suppressors,postfix):
+		callerid = self.CallerID(traceCaller,callerframe)
+
+		if callerid == "":
+			Msg(f"Could not determine trace caller for {traceCaller}")
+		elif not self.TraceStates.get(callerid) in suppressors:
+			self.Trace(callerid,callerframe,prefix=prefix,postfix=postfix)
+
 	# Entering Trace Alias
 	def Entering(self,traceCaller,allow=True,postfix=""):
 		"""Issue Entering Trace Message"""
 
 		if allow and self.Enabled:
-			callerframe = inspect.currentframe().f_back
-
-			callerid = ""
-			if type(traceCaller) is str:
-				callerid = traceCaller
-			else:
-				callerclass = traceCaller.__class__.__name__
-				callername = callerframe.f_code.co_name
-				callerid = f"{callerclass}::{callername}"
-
-			if callerid == "":
-				Msg(f"Could not determine trace caller for {traceCaller}")
-			else:
-				entry = self.GetTraceEntry(callerid)
-				state = None
-
-				if entry:
-					state = entry[1]
-
-				if not entry or not state in [ "enter", "both", "all" ]:
-					self.Trace(f"{callerid}",callerframe,prefix="Entering ",postfix=postfix)
+			self.TraceKind(traceCaller,inspect.currentframe().f_back,"Entering ",( "enter", "both", "all" ),postfix)
 
 	# Inside Function Trace Statement
 	def Inside(self,traceCaller,allow=True,postfix=""):
 		"""Issue Inside Trace Message"""
 
 		if allow and self.Enabled:
-			callerframe = inspect.currentframe().f_back
-
-			callerid = ""
-
-			if type(traceCaller) is str:
-				callerid = traceCaller
-			else:
-				callerclass = traceCaller.__class__.__name__
-				callername = callerframe.f_code.co_name
-				callerid = f"{callerclass}::{callername}"
-
-			if callerid == "":
-				print(f"Could not determine trace caller for {traceCaller}")
-			else:
-				entry = self.GetTraceEntry(callerid)
-				state = None
-
-				if entry:
-					state = entry[1]
-
-				if not entry or not state in [ "inside", "both", "all" ]:
-					self.Trace(f"{callerid}",callerframe,prefix="Inside ",postfix=postfix)
+			self.TraceKind(traceCaller,inspect.currentframe().f_back,"Inside ",( "inside", "both", "all" ),postfix)
 
 	# Exitting Trace Alias
 	def Exitting(self,traceCaller,allow=True,postfix=""):
 		"""Issue Exitting Trace Message"""
 
 		if allow and self.Enabled:
-			callerframe = inspect.currentframe().f_back
-
-			callerid = ""
-
-			if type(traceCaller) is str:
-				callerid = traceCaller
-			else:
-				callerclass = traceCaller.__class__.__name__
-				callername = callerframe.f_code.co_name
-				callerid = f"{callerclass}::{callername}"
-
-			if callerid == "":
-				print(f"Could not determine trace caller for {traceCaller}")
-			else:
-				entry = self.GetTraceEntry(callerid)
-				state = None
-
-				if entry:
-					state = entry[1]
-
-				if not entry or not state in [ "exit", "both", "all" ]:
-					self.Trace(f"{callerid}",callerframe,prefix="Exitting ",postfix=postfix)
+			self.TraceKind(traceCaller,inspect.currentframe().f_back,"Exitting ",( "exit", "both", "all" ),postfix)
 
 # Do Something Peridically
 class Periodic(TitleValueFormatter,Taggable):
@@ -841,8 +1025,16 @@ debugTrigger = Periodic(trigger=1)
 
 # App Level Helper Functions
 class App(TitleValueFormatter,Taggable):
-	# App Termination Flag
+	# App Termination Flag (external trigger, polled at most every TerminatePoll seconds)
 	TerminateFlag = "/tmp/psearch.terminate"
+	# Shared Termination Event (optional, see SearchManager.InitExecutor)
+	TerminateEvent = None
+	# Seconds between terminate flag file checks
+	TerminatePoll = 1.0
+	# Time of last flag file check
+	TerminateChecked = None
+	# Termination seen (latched until the flag is removed)
+	Terminated = False
 
 	# Init Instance
 	def __init__(self):
@@ -854,54 +1046,67 @@ class App(TitleValueFormatter,Taggable):
 		self.Pfmt("Tag",self.Tag)
 
 	# Equivalent of Unix Touch (just create a file)
+	@Traced("App::Touch")
 	def Touch(self,fname,data=None):
-		tracer.Entering(self)
-
 		if not os.path.exists(fname):
 			with open(fname,"wt") as f_out:
 				if data:
 					f_out.write(data)
-		tracer.Exitting(self)
 
 	# Create Terminate Flag
 	def CreateTerminateFlag(self):
+		self.Terminated = True
+
+		if self.TerminateEvent:
+			self.TerminateEvent.set()
+
 		self.Touch(self.TerminateFlag)
 
 	# Remove Termination Flag
 	def RemoveTerminateFlag(self):
+		self.Terminated = False
+		self.TerminateChecked = None
+
+		if self.TerminateEvent:
+			self.TerminateEvent.clear()
+
 		if os.path.exists(self.TerminateFlag):
 			os.remove(self.TerminateFlag)
 
-	# Determine If Terminate Flag Exists
+	# Determine If Termination Requested (Event, Or Flag File Polled At Most Every TerminatePoll Seconds)
+	@Traced("App::IfTerminate")
 	def IfTerminate(self):
-		tracer.Entering(self)
+		if not self.Terminated and self.TerminateEvent and self.TerminateEvent.is_set():
+			self.Terminated = True
 
-		flag = False
+		if not self.Terminated and self.TerminateFlag:
+			now = tm.monotonic()
 
-		if self.TerminateFlag and os.path.exists(self.TerminateFlag):
-			flag = True
+			if self.TerminateChecked is None or now - self.TerminateChecked >= self.TerminatePoll:
+				self.TerminateChecked = now
 
-		tracer.Exitting(self)
+				if os.path.exists(self.TerminateFlag):
+					self.Terminated = True
 
-		return flag
+					# Pass the external trigger on to the search workers
+					if self.TerminateEvent:
+						self.TerminateEvent.set()
+
+		return self.Terminated
 
 	# Calculate Elapsed Time From a Starting Time Stamp (using "now()")
+	@Traced("App::ElapsedTime")
 	def ElapsedTime(self,started):
-		tracer.Entering(self)
-
 		finished = datetime.now()
 
 		elapsed = finished - started
 
-		tracer.Exitting(self)
-
 		return elapsed
 
 	# Find Meta
+	@Traced("App::FindMeta")
 	def FindMeta(self,pattern,metas):
 		"""Find Metas That Match 'pattern', Name,Nickname nd LogGroup searched for pattern"""
-		tracer.Entering(self)
-
 		progs = []
 		patterns = []
 
@@ -931,16 +1136,13 @@ class App(TitleValueFormatter,Taggable):
 		if len(groups) > 0:
 			found = groups
 
-		tracer.Exitting(self)
-
 		return found
 
 	# Load Log Meta Info (deprecated 3/3/2022)
+	@Traced("App::LoadLogMeta")
 	def LoadLogMeta(self,filename):
 		"""Load Log Meta Info File"""
 
-		tracer.Entering(self)
-
 		items = []
 
 		try:
@@ -956,8 +1158,6 @@ class App(TitleValueFormatter,Taggable):
 		except Exception as err:
 			Msg(f"An error occurred attempting to open {filename} : {err}")
 
-		tracer.Exitting(self)
-
 		return items
 
 	# Attempt to Get Keyboard Input Without Blocking
@@ -1024,6 +1224,14 @@ class Query(TitleValueFormatter,Taggable,ItemID):
 	Matches = None
 	# Compiled Expression
 	Program = None
+	# Compiled Expression For Raw (undecoded) Lines, None If The Expression Isn't ASCII
+	BytesProgram = None
+	# Expression means more than ASCII on decoded text (\w, \d, \s, \b, ., ignore case), BytesProgram only agrees on ASCII lines
+	Unicode = False
+	# Expression relies on the line being matched on its own (can match the newline, \A, \Z, lookarounds), see BlockScanner.Usable
+	Bound = False
+	# Token index hint, "" derives keys from the expression, "none" never skips, otherwise csv literals every match contains
+	Index = ""
 
 	# Init Instance
 	def __init__(self, expression = None):
@@ -1039,6 +1247,9 @@ class Query(TitleValueFormatter,Taggable,ItemID):
 		self.Pfmt("Expression",self.Expression)
 		self.Pfmt("Matches",self.Matches)
 		self.Pfmt("Program",self.Program)
+		self.Pfmt("Bytes Program",self.BytesProgram)
+		self.Pfmt("Unicode",self.Unicode)
+		self.Pfmt("Bound",self.Bound)
 		self.Pfmt("Tag",self.Tag)
 
 	# Compile Expression
@@ -1046,15 +1257,253 @@ class Query(TitleValueFormatter,Taggable,ItemID):
 		if self.Expression:
 			self.Program = re.compile(self.Expression)
 
-	# Check for matches
+			self.BytesProgram = None
+			self.Unicode = False
+			self.Bound = False
+
+			# Non ASCII characters don't carry over to bytes (a class of é would be two separate bytes), every line is decoded first
+			if not self.Expression.isascii():
+				DbgMsg(f"Query::Compile - {self.Expression} is not ASCII, lines are decoded before matching")
+				return
+
+			# Same expression for raw lines, on bytes \w is [a-zA-Z0-9_] and . is one byte, so Unicode sensitive ones check non ASCII lines decoded
+			try:
+				self.BytesProgram = re.compile(self.Expression.encode("ascii"))
+
+				parsed = sre_parse.parse(self.Program.pattern,self.Program.flags)
+
+				self.Unicode = self.Sensitive(parsed)
+				self.Bound = self.LineBound(parsed)
+			except Exception as err:
+				DbgMsg(f"Query::Compile - {self.Expression} can not be used as a bytes expression : {err}")
+				self.BytesProgram = None
+
+	# Check for matches (raw bytes are checked with the bytes expression)
 	def Match(self,buffer):
 		self.Matches = None
 
-		if self.Program:
-			self.Matches = self.Program.match(buffer)
+		program = self.BytesProgram if type(buffer) is bytes else self.Program
+
+		if program:
+			self.Matches = program.match(buffer)
 
 		return self.Matches
 
+	# Every (op, av) Of A Parsed Expression, Nested Ones Included (Character Class Members Too, Unless classes Is False)
+	def Walk(self,items,classes=True):
+		repeats = [ sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants,"POSSESSIVE_REPEAT",None) ]
+
+		for op, av in items:
+			yield op, av
+
+			if op == sre_constants.IN:
+				if classes:
+					yield from self.Walk(av)
+			elif op == sre_constants.SUBPATTERN:
+				yield from self.Walk(av[3],classes)
+			elif op == sre_constants.BRANCH:
+				for branch in av[1]:
+					yield from self.Walk(branch,classes)
+			elif op in repeats:
+				yield from self.Walk(av[2],classes)
+			elif op in [ sre_constants.ASSERT, sre_constants.ASSERT_NOT ]:
+				yield from self.Walk(av[1],classes)
+			elif op == sre_constants.GROUPREF_EXISTS:
+				for branch in av[1:]:
+					if branch:
+						yield from self.Walk(branch,classes)
+			elif op == getattr(sre_constants,"ATOMIC_GROUP",None):
+				yield from self.Walk(av,classes)
+
+	# Check Parsed Expression For Parts That Match Differently On Decoded Text
+	def Sensitive(self,parsed):
+		"""True If Any Part Can Match A Non ASCII Character (Or Span Part Of One On Bytes)"""
+
+		if parsed.state.flags & sre_constants.SRE_FLAG_IGNORECASE:
+			return True
+
+		for op, av in self.Walk(parsed):
+			if op in [ sre_constants.ANY, sre_constants.NOT_LITERAL, sre_constants.CATEGORY, sre_constants.NEGATE ]:
+				return True
+			elif op == sre_constants.AT and av in [ sre_constants.AT_BOUNDARY, sre_constants.AT_NON_BOUNDARY ]:
+				return True
+			elif op == sre_constants.SUBPATTERN and av[1] & sre_constants.SRE_FLAG_IGNORECASE:
+				return True
+
+		return False
+
+	# Check Parsed Expression For Parts That Only Hold When The Line Is Matched On Its Own
+	def LineBound(self,parsed):
+		"""True If A Part Can Match The Newline Or Look Past The Line (\\A, \\Z, Lookarounds), In A Block It Would Read Into The Next Or Previous Line"""
+
+		newline = ord("\n")
+		# \s, \D and \W all take the newline
+		crossing = [ sre_constants.CATEGORY_SPACE, sre_constants.CATEGORY_NOT_DIGIT, sre_constants.CATEGORY_NOT_WORD ]
+
+		# A character class takes the newline if a member does, or if negated, none does
+		def Takes(members):
+			taken = any([ (op == sre_constants.LITERAL and av == newline) or (op == sre_constants.RANGE and av[0] <= newline <= av[1]) or (op == sre_constants.CATEGORY and av in crossing) for op, av in members ])
+
+			return not taken if len(members) > 0 and members[0][0] == sre_constants.NEGATE else taken
+
+		# . only crosses lines under DOTALL, set for the whole expression or a group
+		dotall = parsed.state.flags & sre_constants.SRE_FLAG_DOTALL
+
+		for op, av in self.Walk(parsed,classes=False):
+			if op == sre_constants.SUBPATTERN and av[1] & sre_constants.SRE_FLAG_DOTALL:
+				dotall = True
+
+		for op, av in self.Walk(parsed,classes=False):
+			if op == sre_constants.AT and av in [ sre_constants.AT_BEGINNING_STRING, sre_constants.AT_END_STRING ]:
+				return True
+			elif op == sre_constants.ASSERT_NOT or (op == sre_constants.ASSERT and av[0] >= 0):
+				# Lookaheads see the next line, negative lookbehinds the previous one
+				return True
+			elif op == sre_constants.IN and Takes(av):
+				return True
+			elif op == sre_constants.LITERAL and av == newline:
+				return True
+			elif op == sre_constants.NOT_LITERAL and av != newline:
+				return True
+			elif op == sre_constants.ANY and dotall:
+				return True
+
+		return False
+
+	# Get Longest Literal Any Match Must Contain
+	def RequiredLiteral(self,binary=False):
+		"""Get Longest Literal Substring Required By Expression (None if there isn't one)"""
+
+		literal = None
+
+		program = self.BytesProgram if binary else self.Program
+
+		if program:
+			try:
+				parsed = sre_parse.parse(program.pattern,program.flags)
+
+				if not (parsed.state.flags & sre_constants.SRE_FLAG_IGNORECASE):
+					runs = self.LiteralRuns(parsed)
+
+					if len(runs) > 0:
+						literal = max(runs,key=len)
+
+						if binary:
+							literal = bytes(literal)
+						else:
+							literal = "".join([ chr(c) for c in literal ])
+			except Exception as err:
+				DbgMsg(f"Query::RequiredLiteral - could not extract literal from {self.Expression} : {err}")
+				literal = None
+
+		return literal
+
+	# Collect Runs of Literal Characters From A Parsed Expression
+	def LiteralRuns(self,parsed):
+		"""Collect Runs Of Literal Character Codes That Must Appear In Any Match"""
+
+		runs = []
+		run = []
+
+		for op, av in parsed:
+			if op == sre_constants.LITERAL:
+				run.append(av)
+				continue
+
+			if op == sre_constants.SUBPATTERN:
+				# av = (group, add_flags, del_flags, subpattern)
+				if av[1] & sre_constants.SRE_FLAG_IGNORECASE:
+					inner = []
+				elif all([ item[0] == sre_constants.LITERAL for item in av[3] ]):
+					# Group made entirely of literals, keep the current run going
+					run.extend([ item[1] for item in av[3] ])
+					continue
+				else:
+					inner = self.LiteralRuns(av[3])
+
+				if len(run) > 0:
+					runs.append(run)
+				run = []
+
+				runs.extend(inner)
+				continue
+
+			if len(run) > 0:
+				runs.append(run)
+			run = []
+
+			if op in [ sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT ] and av[0] >= 1:
+				# Repeated item must appear at least once
+				runs.extend(self.LiteralRuns(av[2]))
+
+		if len(run) > 0:
+			runs.append(run)
+
+		return runs
+
+	# Get Token Index Keys Any Matching Line Must Contain
+	def IndexKeys(self):
+		"""Whole Token And Token Trigram Keys (See TokenIndex), Empty If The Index Can't Help This Query"""
+
+		keys = set()
+
+		if self.Index == "none" or not self.BytesProgram:
+			return []
+
+		if self.Index:
+			# Hinted literals may sit inside longer tokens, so neither edge is a boundary
+			for literal in self.Index.split(","):
+				keys.update(TokenIndex.LiteralKeys([ TokenIndex.UNKNOWN ] + list(literal.strip().encode("utf-8")) + [ TokenIndex.UNKNOWN ]))
+		else:
+			try:
+				parsed = sre_parse.parse(self.BytesProgram.pattern,self.BytesProgram.flags)
+
+				if not (parsed.state.flags & sre_constants.SRE_FLAG_IGNORECASE):
+					# Matching is anchored at the line start, the end is open
+					items = [ TokenIndex.BOUNDARY ] + self.LiteralItems(parsed) + [ TokenIndex.UNKNOWN ]
+
+					keys.update(TokenIndex.LiteralKeys(items))
+			except Exception as err:
+				DbgMsg(f"Query::IndexKeys - could not extract index keys from {self.Expression} : {err}")
+
+		return sorted(keys)
+
+	# Flatten A Parsed Expression Into Literal Codes, Boundaries And Unknowns
+	def LiteralItems(self,parsed):
+		"""Character Codes Where The Text Is Known, TokenIndex.BOUNDARY Where Only Non Token Characters Can Match, Else TokenIndex.UNKNOWN"""
+
+		items = []
+
+		for op, av in parsed:
+			if op == sre_constants.LITERAL:
+				items.append(av)
+			elif op == sre_constants.SUBPATTERN and not (av[1] & sre_constants.SRE_FLAG_IGNORECASE):
+				items.extend(self.LiteralItems(av[3]))
+			elif op == sre_constants.AT and av in [ sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_STRING, sre_constants.AT_END, sre_constants.AT_END_STRING ]:
+				items.append(TokenIndex.BOUNDARY)
+			elif op == sre_constants.IN and self.Delimits(av):
+				items.append(TokenIndex.BOUNDARY)
+			elif op in [ sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT ] and av[0] >= 1 and all([ item == TokenIndex.BOUNDARY or (item >= 0 and not TokenIndex.IsTokenChar(item)) for item in self.LiteralItems(av[2]) ]):
+				# One or more delimiters
+				items.append(TokenIndex.BOUNDARY)
+			else:
+				items.append(TokenIndex.UNKNOWN)
+
+		return items
+
+	# Character Class That Only Matches Non Token Characters
+	def Delimits(self,members):
+		for op, av in members:
+			if op == sre_constants.LITERAL and not TokenIndex.IsTokenChar(av):
+				continue
+
+			if op == sre_constants.CATEGORY and av == sre_constants.CATEGORY_SPACE:
+				continue
+
+			return False
+
+		return len(members) > 0
+
 # Log Meta Prepackaged Query
 class NamedQuery(Query):
 	# Name of Query
@@ -1079,6 +1528,7 @@ class NamedQuery(Query):
 	def Read(self,xnode):
 		self.Name = xnode.attrib['name']
 		self.Expression = xnode.text
+		self.Index = xnode.attrib.get("index","")
 
 		self.Compile()
 
@@ -1089,391 +1539,2696 @@ class NamedQuery(Query):
 
 		self.Compile()
 
-# Log Meta Data
-class LogMeta(TitleValueFormatter,Taggable,ItemID):
-	"""Log Source Meta Data Information Class"""
+# Multi Pattern Matcher : Literal prefilter in front of Query/NamedQuery instances
+class QueryMatcher(TitleValueFormatter,Taggable):
+	"""Match A Line Against Many Queries In A Single Pass"""
 
-	DateExpression = "^(?P<year>\d{4})(?P<month>\d{2})(?P<day>\d{2})$"
+	# Queries (in priority order, first match wins)
+	Queries = None
+	# Indexes of queries with no required literal (always confirmed)
+	Unfiltered = None
+	# Prefilter literal -> indexes of queries whose literal it contains
+	Candidates = None
+	# Compiled literal prefilter
+	Prefilter = None
+	# Match counts per query
+	Hits = None
+	# Matching raw (bytes) lines
+	Binary = False
 
-	# Official Name of Log
+	# Init Instance
+	def __init__(self,queries=None,binary=False):
+		self.Queries = list(queries) if queries else []
+		self.Binary = binary
+
+		self.Compile()
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Queries",len(self.Queries))
+		self.Pfmt("Unfiltered",len(self.Unfiltered))
+		self.Pfmt("Literals",len(self.Candidates))
+		self.Pfmt("Prefilter",(self.Prefilter.pattern[:60] if self.Prefilter else None))
+		self.Pfmt("Binary",self.Binary)
+		self.Pfmt("Hits",self.HitSummary())
+		self.Pfmt("Tag",self.Tag)
+
+	# Build Prefilter From Query Literals
+	def Compile(self):
+		self.Unfiltered = []
+		self.Candidates = {}
+		self.Prefilter = None
+		self.Hits = [ 0 ] * len(self.Queries)
+
+		literals = {}
+
+		# A single query gains nothing from a prefilter
+		if len(self.Queries) > 1:
+			for index, query in enumerate(self.Queries):
+				literal = query.RequiredLiteral(self.Binary)
+
+				if literal:
+					literals.setdefault(literal,[]).append(index)
+				else:
+					self.Unfiltered.append(index)
+		else:
+			self.Unfiltered.extend(range(len(self.Queries)))
+
+		if len(literals) > 0:
+			# The prefilter reports the longest literal found at each position, which
+			# also stands in for every shorter literal contained within it
+			for literal in literals.keys():
+				indexes = set(self.Unfiltered)
+
+				for other, owners in literals.items():
+					if other in literal:
+						indexes.update(owners)
+
+				self.Candidates[literal] = sorted(indexes)
+
+			expr = self.TrieExpression(sorted(literals.keys()))
+
+			# Zero width lookahead so overlapping literals are all reported
+			if type(expr) is bytes:
+				self.Prefilter = re.compile(b"(?=(" + expr + b"))")
+			else:
+				self.Prefilter = re.compile("(?=(" + expr + "))")
+
+	# Convert Literals Into A Prefix Factored (Trie) Expression
+	def TrieExpression(self,literals):
+		"""Build Alternation Expression Sharing Common Prefixes"""
+
+		trie = {}
+
+		for literal in literals:
+			node = trie
+
+			for position in range(len(literal)):
+				node = node.setdefault(literal[position:position + 1],{})
+
+			# None marks the end of a literal
+			node[None] = None
+
+		empty = literals[0][:0]
+
+		def emit(node):
+			branches = [ re.escape(key) + emit(child) for key, child in node.items() if key is not None ]
+
+			if len(branches) == 0:
+				return empty
+
+			if len(branches) == 1 and not None in node:
+				return branches[0]
+
+			if type(empty) is bytes:
+				expr = b"(?:" + b"|".join(branches) + b")"
+				optional = b"?"
+			else:
+				expr = "(?:" + "|".join(branches) + ")"
+				optional = "?"
+
+			# Greedy optional, so the longest literal at a position is preferred
+			return expr + optional if None in node else expr
+
+		return emit(trie)
+
+	# Check Line Against Queries
+	def Match(self,line):
+		"""Return (query, match) For The First Matching Query, Or (None, None)"""
+
+		candidates = self.Unfiltered
+
+		if self.Prefilter:
+			found = self.Prefilter.findall(line)
+
+			if len(found) == 1:
+				candidates = self.Candidates[found[0]]
+			elif len(found) > 1:
+				indexes = set()
+
+				for literal in set(found):
+					indexes.update(self.Candidates[literal])
+
+				candidates = sorted(indexes)
+
+		for index in candidates:
+			matches = self.Queries[index].Match(line)
+
+			if matches:
+				self.Hits[index] += 1
+
+				return self.Queries[index], matches
+
+		return None, None
+
+	# Summary Of Matches Per Query
+	def HitSummary(self):
+		summary = []
+
+		for index, query in enumerate(self.Queries):
+			if self.Hits[index] > 0:
+				name = getattr(query,"Name",None) or query.Expression
+
+				summary.append(f"{name}={self.Hits[index]}")
+
+		return ",".join(summary)
+
+# Block Scanner : Scan large raw blocks, only materialize lines around hits
+class BlockScanner(TitleValueFormatter,Taggable):
+	"""Find Candidate Lines By Scanning Whole Blocks Of A Raw Stream"""
+
+	# Default Block Size (bytes)
+	DefaultBlockSize = 8 * 1024 * 1024
+
+	# Block Size
+	BlockSize = DefaultBlockSize
+	# Compiled scanning expressions (MULTILINE)
+	Scanners = None
+	# Lines scanned so far
+	LinesScanned = 0
+	# Bytes scanned so far
+	BytesScanned = 0
+
+	# Init Instance
+	def __init__(self,queries,blocksize=None):
+		if blocksize:
+			self.BlockSize = blocksize
+
+		self.LinesScanned = 0
+		self.BytesScanned = 0
+
+		self.Compile(queries)
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Block Size",self.BlockSize)
+		self.Pfmt("Scanners",len(self.Scanners))
+		self.Pfmt("Lines Scanned",self.LinesScanned)
+		self.Pfmt("Bytes Scanned",self.BytesScanned)
+		self.Pfmt("Tag",self.Tag)
+
+	# Check Queries Can Be Scanned For In Whole Blocks
+	@staticmethod
+	def Usable(queries):
+		"""False If A Query Without A Required Literal Is Bound To Its Own Line (Query.Bound), Scanned Over A Block It Could Miss Lines"""
+
+		return not any([ query.Bound and not query.RequiredLiteral(True) for query in queries ])
+
+	# Build Scanning Expressions
+	def Compile(self,queries):
+		"""Build Scanners : One For All Required Literals, One Per Query Without A Literal"""
+
+		self.Scanners = []
+
+		literals = set()
+		unicode = False
+
+		for query in queries:
+			literal = query.RequiredLiteral(True)
+
+			if literal:
+				literals.add(literal)
+			else:
+				unicode = unicode or query.Unicode
+
+				# Anchor to line starts, the line is confirmed with the real query anyway
+				try:
+					self.Scanners.append(re.compile(b"^(?:" + query.BytesProgram.pattern + b")",re.MULTILINE))
+				except re.error:
+					# Inline global flags can't be wrapped, scan unanchored instead
+					self.Scanners.append(re.compile(query.BytesProgram.pattern,re.MULTILINE))
+
+		if len(literals) > 0:
+			expr = QueryMatcher().TrieExpression(sorted(literals))
+
+			self.Scanners.insert(0,re.compile(expr))
+
+		# Non ASCII lines may match such a query decoded but not as bytes, they are handed over for OpenFileSearch to decide
+		if unicode:
+			self.Scanners.append(re.compile(rb"[\x80-\xff]"))
+
+	# Get Lines In Block Holding A Scanner Hit
+	def HitLines(self,scanner,block,endpos):
+		"""Yield (start, end) For Each Line In block[:endpos] With A Hit"""
+
+		pos = 0
+
+		while pos < endpos:
+			hit = scanner.search(block,pos,endpos)
+
+			if hit is None or hit.start() >= endpos:
+				break
+
+			start = block.rfind(b"\n",0,hit.start()) + 1
+			end = block.find(b"\n",hit.start(),endpos)
+
+			end = endpos if end < 0 else end + 1
+
+			yield start, end
+
+			pos = end
+
+	# Read Stream In Blocks And Yield Candidate Lines
+	def Lines(self,f_in,termflag=None):
+		"""Yield Raw Lines Containing A Scanner Hit, In File Order"""
+
+		carry = b""
+
+		while True:
+			if Terminating(termflag):
+				break
+
+			chunk = f_in.read(self.BlockSize)
+
+			if chunk:
+				block = carry + chunk
+
+				# Lines straddling the block boundary are carried into the next block
+				endpos = block.rfind(b"\n") + 1
+
+				if endpos == 0:
+					carry = block
+					continue
+
+				carry = block[endpos:]
+			else:
+				# Last line of the file may not be newline terminated
+				block = carry
+				endpos = len(block)
+				carry = b""
+
+			self.BytesScanned += endpos
+			self.LinesScanned += block.count(b"\n",0,endpos) + (0 if chunk or endpos == 0 else 1)
+
+			if len(self.Scanners) == 1:
+				for start, end in self.HitLines(self.Scanners[0],block,endpos):
+					yield block[start:end]
+			else:
+				spans = set()
+
+				for scanner in self.Scanners:
+					spans.update(self.HitLines(scanner,block,endpos))
+
+				for start, end in sorted(spans):
+					yield block[start:end]
+
+			if not chunk:
+				break
+
+# Decompressor Pipe : Read A Gzip File Through An External Decompressor
+class DecompressorPipe(TitleValueFormatter,Taggable):
+	"""File-like Reader Over The Output Of pigz/zcat"""
+
+	# External decompressor command lines (filename is appended)
+	Commands = {
+		"pigz" : [ "pigz", "-dc" ],
+		"zcat" : [ "zcat" ]
+	}
+
+	# Pipe buffer size
+	BufferSize = 1024 * 1024
+	# Exit statuses that still mean the output is whole (gzip and pigz exit 2 on warnings, like trailing garbage)
+	Whole = ( 0, 2 )
+
+	# Decompressor Name
 	Name = None
-	# Current Status of log, good or not good (i.e. being fed or stopped)
-	Status = None
-	# Primary Log Group (also in LogGroups)
-	LogGroup = None
-	# Log groups this log belongs to, CSV-Str
-	LogGroups = None
-	# Nickname of log (short name)
-	Nickname = None
-	# Description of Log
-	Description = None
-	# Log Owner
-	Owner = None
-	# IP Source of Log (Part of Name)
-	Source = None
-	# ???
-	Targets = None
-	# Parsing info (filename pattern)
-	ParseInfo = None
-	# ??
-	Streamers = None
-	# Named Queries
-	Queries = None
-	# Log Meta Comment
-	Comment = None
-	# Any Notes
-	Notes = None
+	# Compressed File
+	Filename = None
+	# Subprocess
+	Process = None
+	# Decompressed Stream (stdout of Process)
+	Stream = None
+	# Decompressor's stderr, a file so it can't fill a pipe and stall while stdout is read
+	Errors = None
+
+	# Init Instance
+	def __init__(self,name,filename):
+		self.Name = name
+		self.Filename = filename
+
+		self.Errors = tempfile.TemporaryFile()
+
+		self.Process = subprocess.Popen(self.Commands[name] + [ filename ],stdout=subprocess.PIPE,stderr=self.Errors,bufsize=self.BufferSize)
+		self.Stream = self.Process.stdout
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Name",self.Name)
+		self.Pfmt("Filename",self.Filename)
+		self.Pfmt("PID",(self.Process.pid if self.Process else None))
+		self.Pfmt("Tag",self.Tag)
+
+	# Context Manager Entry
+	def __enter__(self):
+		return self
+
+	# Context Manager Exit
+	def __exit__(self,exc_type,exc_value,exc_tb):
+		self.close()
+
+	# Iterate Over Lines
+	def __iter__(self):
+		return iter(self.Stream)
+
+	# Read Bytes
+	def read(self,size=-1):
+		return self.Stream.read(size)
+
+	# Read Line
+	def readline(self,size=-1):
+		return self.Stream.readline(size)
+
+	# Peek At Buffered Bytes Without Consuming Them
+	def peek(self,size=0):
+		return self.Stream.peek(size)
+
+	# Close Pipe And Reap Decompressor, OSError If A Fully Read Stream Ended In Error (truncated or corrupt file)
+	def close(self):
+		if self.Process:
+			process = self.Process
+			self.Process = None
+
+			# Nothing left in the pipe means the decompressor is done, its exit status says whether the output is whole
+			drained = len(self.Stream.peek(1)) == 0
+
+			self.Stream.close()
+
+			# Closing early (limit, terminate) leaves the decompressor blocked on a full pipe
+			if not drained and process.poll() is None:
+				process.terminate()
+
+			process.wait()
+
+			self.Errors.seek(0)
+			errors = self.Errors.read().decode(errors="replace").strip()
+			self.Errors.close()
+
+			if drained and process.returncode not in self.Whole:
+				raise OSError(f"{self.Name} exited with {process.returncode} on {self.Filename}" + (f" : {errors}" if errors else ""))
+
+# Gzip Member Stream : Inflate A Multi-member Gzip File, Optionally Limited To A Range Of Members
+class GzipMemberStream(io.RawIOBase):
+	"""Raw Stream Over Gzip Members, Records Member Offsets While Reading"""
+
+	# Compressed bytes read per file access
+	CompressedChunk = 1024 * 1024
+	# Max uncompressed bytes produced per inflate call
+	OutputChunk = 256 * 1024
+
+	# Compressed File
+	Filename = None
+	# Compressed Range [Start, End)
+	Start = 0
+	End = None
+	# Current Compressed File Position
+	Position = 0
+	# Uncompressed Bytes Produced
+	Produced = 0
+	# Members seen so far [ (compressed offset, uncompressed offset) ]
+	Members = None
+	# Finished Reading Range
+	Finished = False
+
+	# Init Instance
+	def __init__(self,filename,start=0,end=None):
+		io.RawIOBase.__init__(self)
+
+		self.Filename = filename
+		self.Start = self.Position = start
+		self.End = end
+		self.Produced = 0
+		self.Members = []
+		self.Finished = False
+
+		self.Handle = open(filename,"rb")
+		self.Handle.seek(start)
+
+		self.Decompressor = None
+		self.MemberOutput = 0
+		self.Input = b""
+		self.Pending = b""
+		self.PendingOffset = 0
+
+	# Create Buffered Reader Over A Member Stream
+	@classmethod
+	def Open(cls,filename,start=0,end=None):
+		return io.BufferedReader(cls(filename,start,end),buffer_size=cls.CompressedChunk)
+
+	# Readable Stream
+	def readable(self):
+		return True
+
+	# Close Stream And File
+	def close(self):
+		if not self.closed:
+			self.Handle.close()
+
+		io.RawIOBase.close(self)
+
+	# Produce The Next Piece Of Uncompressed Data, b"" At End Of Range
+	def Inflate(self):
+		while not self.Finished:
+			if not self.Input:
+				size = self.CompressedChunk
+
+				if self.End is not None:
+					size = min(size,self.End - self.Position)
+
+				data = self.Handle.read(size) if size > 0 else b""
+
+				if not data:
+					self.Finished = True
+
+					if self.Decompressor and not self.Decompressor.eof:
+						raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+
+					break
+
+				self.Input = data
+				self.Position += len(data)
+
+			# Start of a new member
+			if self.Decompressor is None:
+				self.Decompressor = zlib.decompressobj(31)
+				self.MemberOutput = 0
+				self.Members.append(( self.Position - len(self.Input), self.Produced ))
+
+			try:
+				data = self.Decompressor.decompress(self.Input,self.OutputChunk)
+			except zlib.error:
+				if self.MemberOutput == 0 and len(self.Members) > 1:
+					# Padding or garbage after the last member, gzip.open ignores it too
+					self.Members.pop()
+					self.Decompressor = None
+					self.Finished = True
+					break
+
+				raise
+
+			if self.Decompressor.eof:
+				self.Input = self.Decompressor.unused_data
+				self.Decompressor = None
+			else:
+				self.Input = self.Decompressor.unconsumed_tail
+
+			if data:
+				self.MemberOutput += len(data)
+				self.Produced += len(data)
+
+				return data
+
+		return b""
+
+	# Fill Buffer With Uncompressed Data
+	def readinto(self,buffer):
+		if self.PendingOffset >= len(self.Pending):
+			self.Pending = self.Inflate()
+			self.PendingOffset = 0
+
+			if not self.Pending:
+				return 0
+
+		count = min(len(buffer),len(self.Pending) - self.PendingOffset)
+
+		buffer[:count] = self.Pending[self.PendingOffset:self.PendingOffset + count]
+
+		self.PendingOffset += count
+
+		return count
+
+# Range Reader : Raw Stream Over A Byte Range Of A Plain File
+class RangeReader(io.RawIOBase):
+	"""Raw Stream Limited To [start, end) Of A File"""
+
+	# Read buffer size
+	BufferSize = 1024 * 1024
+
+	# File
+	Filename = None
+	# Range [Start, End)
+	Start = 0
+	End = None
+	# Current File Position
+	Position = 0
+
+	# Init Instance
+	def __init__(self,filename,start=0,end=None):
+		io.RawIOBase.__init__(self)
+
+		self.Filename = filename
+		self.Start = self.Position = start
+		self.End = end
+
+		self.Handle = open(filename,"rb")
+		self.Handle.seek(start)
+
+	# Create Buffered Reader Over A Range
+	@classmethod
+	def Open(cls,filename,start=0,end=None):
+		return io.BufferedReader(cls(filename,start,end),buffer_size=cls.BufferSize)
+
+	# Readable Stream
+	def readable(self):
+		return True
+
+	# Close Stream And File
+	def close(self):
+		if not self.closed:
+			self.Handle.close()
+
+		io.RawIOBase.close(self)
+
+	# Fill Buffer From The Range
+	def readinto(self,buffer):
+		size = len(buffer)
+
+		if self.End is not None:
+			size = min(size,self.End - self.Position)
+
+		if size <= 0:
+			return 0
+
+		count = self.Handle.readinto(memoryview(buffer)[:size])
+
+		self.Position += count
+
+		return count
+
+# Ranges Reader : Several Byte Ranges Of A File Read As One Stream
+class RangesReader(RangeReader):
+	"""Raw Stream Over [start, end) Ranges Of A File, In Order, Ranges Should Start And End On Line Boundaries"""
+
+	# Ranges still to read
+	Ranges = None
+
+	# Init Instance
+	def __init__(self,filename,ranges):
+		self.Ranges = deque(ranges)
+
+		start, end = self.Ranges.popleft()
+
+		RangeReader.__init__(self,filename,start,end)
+
+	# Create Buffered Reader Over Ranges
+	@classmethod
+	def Open(cls,filename,ranges):
+		return io.BufferedReader(cls(filename,ranges),buffer_size=cls.BufferSize)
+
+	# Fill Buffer, Moving On To The Next Range When One Runs Out
+	def readinto(self,buffer):
+		while True:
+			count = RangeReader.readinto(self,buffer)
+
+			if count > 0 or len(self.Ranges) == 0:
+				return count
+
+			self.Start, self.End = self.Ranges.popleft()
+			self.Position = self.Start
+			self.Handle.seek(self.Start)
+
+# Gzip Member Index : Sidecar Of Member Offsets For Splitting Multi-member Gzip Logs
+class GzipIndex(TitleValueFormatter,Taggable):
+	"""Gzip Member Index Stored In TempSpace"""
+
+	# Index folder name inside TempSpace
+	FolderName = "psearch.gzindex"
+
+	# Indexed Gzip File
+	Filename = None
+	# Sidecar Filename
+	IndexFile = None
+	# Members [ (compressed offset, uncompressed offset) ]
+	Members = None
+	# Size of the indexed file
+	Size = 0
+
+	# Init Instance
+	def __init__(self,filename,indexfile=None):
+		global TempSpace
+
+		self.Filename = filename
+		self.Members = []
+		self.Size = 0
+
+		if indexfile:
+			self.IndexFile = indexfile
+		else:
+			key = hashlib.sha1(os.path.realpath(filename).encode("utf-8")).hexdigest()
+
+			self.IndexFile = os.path.join(TempSpace,self.FolderName,key + ".json")
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Filename",self.Filename)
+		self.Pfmt("Index File",self.IndexFile)
+		self.Pfmt("Members",len(self.Members))
+		self.Pfmt("Tag",self.Tag)
+
+	# Load Index, True If It Exists And Matches The Current File
+	def Load(self):
+		"""Load Sidecar, Reject It If The Log Changed Since It Was Recorded"""
+
+		try:
+			with open(self.IndexFile,"rt") as f_in:
+				index = json.load(f_in)
+
+			stat = os.stat(self.Filename)
+
+			if index["filename"] != os.path.realpath(self.Filename) or index["size"] != stat.st_size or index["mtime"] != stat.st_mtime:
+				return False
+
+			self.Members = [ tuple(member) for member in index["members"] ]
+			self.Size = index["size"]
+		except (OSError,ValueError,KeyError):
+			return False
+
+		return True
+
+	# Save Index
+	def Save(self,members):
+		stat = os.stat(self.Filename)
+
+		self.Members = list(members)
+		self.Size = stat.st_size
+
+		index = {
+			"filename" : os.path.realpath(self.Filename),
+			"size" : stat.st_size,
+			"mtime" : stat.st_mtime,
+			"members" : self.Members
+		}
+
+		os.makedirs(os.path.dirname(self.IndexFile),exist_ok=True)
+
+		# Write then rename so a concurrent reader never sees a partial index
+		tmpfile = f"{self.IndexFile}.{os.getpid()}"
+
+		with open(tmpfile,"wt") as f_out:
+			json.dump(index,f_out)
+
+		os.replace(tmpfile,self.IndexFile)
+
+	# Group Members Into Roughly Equal Compressed Ranges
+	def Ranges(self,count):
+		"""Return Up To count [start, end) Compressed Ranges On Member Boundaries"""
+
+		if len(self.Members) == 0:
+			return []
+
+		offsets = [ member[0] for member in self.Members ]
+
+		# Cut at the member boundary nearest each even split point
+		cuts = { offsets[0], self.Size }
+
+		for part in range(1,count):
+			point = self.Size * part / count
+			position = bisect.bisect_left(offsets,point)
+
+			nearby = offsets[max(position - 1,0):position + 1]
+
+			cuts.add(min(nearby,key=lambda offset: abs(offset - point)))
+
+		cuts = sorted(cuts)
+
+		return list(zip(cuts[:-1],cuts[1:]))
+
+# Token Index : Sidecar Of Per Block Bloom Filters Over Tokens, So Searches Can Skip What Can't Match
+class TokenIndex(TitleValueFormatter,Taggable):
+	"""Token Index Stored In TempSpace : A JSON Header Line, Then One Bloom Filter Per Line Aligned Block"""
+
+	# Index folder name inside TempSpace
+	FolderName = "psearch.tokindex"
+	# Uncompressed bytes per block
+	BlockSize = 4 * 1024 * 1024
+	# Bloom filter bits per key, one bit is set per seed (about 0.6% false positives)
+	BitsPerKey = 14
+	# CRC32 start values, one hash per seed
+	Seeds = [ 0, 0x5BD1E995, 0x9E3779B1 ]
+
+	# Tokens are runs of these, usernames, IPs, MACs, hostnames and addresses stay whole
+	TokenChars = rb"A-Za-z0-9_.:@-"
+	Tokenizer = re.compile(rb"[" + TokenChars + rb"]+")
+	# Translation table blanking everything else, split() on it is quicker than findall()
+	TokenTable = re.sub(rb"[^" + TokenChars + rb"]",b" ",bytes(range(256)))
+	# Literal items (see Query.LiteralItems) that aren't character codes
+	BOUNDARY = -1
+	UNKNOWN = -2
+	# Whole token keys are prefixed, so a 3 character token is not taken for a trigram
+	TOKEN = b"\x01"
+
+	# Indexed Log File
+	Filename = None
+	# Sidecar Filename
+	IndexFile = None
+	# Blocks [ [ start, end, bitmap offset, bitmap length ] ] (start/end are uncompressed offsets)
+	Blocks = None
+	# Size of the indexed file
+	Size = 0
+	# Length of the header line, bitmaps follow it
+	HeaderSize = 0
+
+	# Init Instance
+	def __init__(self,filename,indexfile=None):
+		global TempSpace
+
+		self.Filename = filename
+		self.Blocks = []
+		self.Size = 0
+		self.HeaderSize = 0
+
+		if indexfile:
+			self.IndexFile = indexfile
+		else:
+			key = hashlib.sha1(os.path.realpath(filename).encode("utf-8")).hexdigest()
+
+			self.IndexFile = os.path.join(TempSpace,self.FolderName,key + ".idx")
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Filename",self.Filename)
+		self.Pfmt("Index File",self.IndexFile)
+		self.Pfmt("Blocks",len(self.Blocks))
+		self.Pfmt("Tag",self.Tag)
+
+	# Character Code Is Part Of A Token
+	@staticmethod
+	def IsTokenChar(code):
+		return code < 128 and TokenIndex.Tokenizer.fullmatch(bytes([ code ])) is not None
+
+	# Keys For A Sequence Of Literal Items
+	@staticmethod
+	def LiteralKeys(items):
+		"""Runs Of Token Characters Bounded On Both Sides Are Whole Tokens, Others Contribute Their Trigrams"""
+
+		keys = []
+
+		run = []
+		bounded = False
+
+		for item in items + [ TokenIndex.UNKNOWN ]:
+			if item >= 0 and TokenIndex.IsTokenChar(item):
+				run.append(item)
+				continue
+
+			# Delimiting literals and boundaries end a token, unknowns may continue it
+			edge = item != TokenIndex.UNKNOWN
+
+			if len(run) > 0:
+				token = bytes(run)
+
+				if bounded and edge:
+					keys.append(TokenIndex.TOKEN + token)
+				else:
+					keys.extend([ token[index:index + 3] for index in range(len(token) - 2) ])
+
+			run = []
+			bounded = edge
+
+		return keys
+
+	# Keys Present In A Block
+	@staticmethod
+	def BlockKeys(block):
+		tokens = set(block.translate(TokenIndex.TokenTable).split())
+
+		keys = set(map(TokenIndex.TOKEN.__add__,tokens))
+
+		# Trigrams of the distinct tokens, found by the regex engine over the joined tokens
+		keys.update(re.findall(rb"(?=([^ ]{3}))",b" ".join(tokens)))
+
+		return keys
+
+	# Bit Positions Of A Key In A Filter Of bits Bits
+	@staticmethod
+	def Positions(key,bits):
+		return [ zlib.crc32(key,seed) % bits for seed in TokenIndex.Seeds ]
+
+	# Build A Bloom Filter For One Block
+	def Bitmap(self,block):
+		keys = TokenIndex.BlockKeys(block)
+
+		bits = max(64,len(keys) * self.BitsPerKey)
+		bits += -bits % 8
+
+		bitmap = bytearray(bits >> 3)
+
+		# Same positions as Positions(), hashed a seed at a time
+		hashes = itertools.chain.from_iterable([ map(zlib.crc32,keys,itertools.repeat(seed)) for seed in self.Seeds ])
+
+		for value in hashes:
+			position = value % bits
+			bitmap[position >> 3] |= 1 << (position & 7)
+
+		return bytes(bitmap)
+
+	# Bloom Filter May Hold Every Key
+	def MayHold(self,bitmap,keys):
+		bits = len(bitmap) << 3
+
+		for key in keys:
+			for position in TokenIndex.Positions(key,bits):
+				if not bitmap[position >> 3] & (1 << (position & 7)):
+					return False
+
+		return True
+
+	# Build The Index By Reading The Whole Log
+	def Build(self,log,termflag=None):
+		"""False For Logs That Need Decoding (UTF-16) Or When Terminated, The Index Is Only Saved Whole"""
+
+		bitmaps = []
+		blocks = []
+
+		offset = 0
+		stored = 0
+		carry = b""
+
+		with log.Open() as f_in:
+			if log.NeedsDecoding(f_in):
+				return False
+
+			while True:
+				if Terminating(termflag):
+					return False
+
+				chunk = f_in.read(self.BlockSize)
+
+				if chunk:
+					block = carry + chunk
+
+					# Blocks end on a line boundary, a partial line waits for the next chunk
+					end = block.rfind(b"\n") + 1
+
+					if end == 0:
+						carry = block
+						continue
+
+					carry = block[end:]
+					block = block[:end]
+				else:
+					block = carry
+					carry = b""
+
+				if len(block) > 0:
+					bitmap = self.Bitmap(block)
+
+					blocks.append([ offset, offset + len(block), stored, len(bitmap) ])
+					bitmaps.append(bitmap)
+
+					offset += len(block)
+					stored += len(bitmap)
+
+				if not chunk:
+					break
+
+		self.Save(blocks,bitmaps)
+
+		return True
+
+	# Load Header, True If It Exists And Matches The Current File
+	def Load(self):
+		"""Load Sidecar Header, Reject It If The Log Changed Since It Was Indexed"""
+
+		try:
+			with open(self.IndexFile,"rb") as f_in:
+				header = f_in.readline()
+
+			index = json.loads(header)
+
+			stat = os.stat(self.Filename)
+
+			if index["filename"] != os.path.realpath(self.Filename) or index["size"] != stat.st_size or index["mtime"] != stat.st_mtime or index["seeds"] != self.Seeds:
+				return False
+
+			self.Blocks = index["blocks"]
+			self.Size = index["size"]
+			self.HeaderSize = len(header)
+		except (OSError,ValueError,KeyError):
+			return False
+
+		return True
+
+	# Save Index
+	def Save(self,blocks,bitmaps):
+		stat = os.stat(self.Filename)
+
+		self.Blocks = blocks
+		self.Size = stat.st_size
+
+		index = {
+			"filename" : os.path.realpath(self.Filename),
+			"size" : stat.st_size,
+			"mtime" : stat.st_mtime,
+			"seeds" : self.Seeds,
+			"blocks" : blocks
+		}
+
+		header = json.dumps(index).encode("utf-8") + b"\n"
+
+		self.HeaderSize = len(header)
+
+		os.makedirs(os.path.dirname(self.IndexFile),exist_ok=True)
+
+		# Write then rename so a concurrent reader never sees a partial index
+		tmpfile = f"{self.IndexFile}.{os.getpid()}"
+
+		with open(tmpfile,"wb") as f_out:
+			f_out.write(header)
+
+			for bitmap in bitmaps:
+				f_out.write(bitmap)
+
+		os.replace(tmpfile,self.IndexFile)
+
+	# Ranges Of A Log That May Hold A Match
+	def Candidates(self,patterns,log):
+		"""Newline Aligned [start, end) Ranges, [] If Nothing Can Match, None If The Index Can't Tell (Missing, Stale, Or A Query Without Keys)"""
+
+		queries = [ (Query(pattern) if type(pattern) is str else pattern) for pattern in patterns ]
+		keys = [ query.IndexKeys() for query in queries ]
+
+		if len(keys) == 0 or not all(keys) or not self.Load():
+			return None
+
+		ranges = []
+
+		with open(self.IndexFile,"rb") as f_in:
+			f_in.seek(self.HeaderSize)
+
+			for start, end, offset, length in self.Blocks:
+				bitmap = f_in.read(length)
+
+				if any([ self.MayHold(bitmap,querykeys) for querykeys in keys ]):
+					if len(ranges) > 0 and ranges[-1][1] == start:
+						ranges[-1] = ( ranges[-1][0], end )
+					else:
+						ranges.append(( start, end ))
+
+		if len(ranges) == 0:
+			return ranges
+
+		# Block offsets are uncompressed, gzip logs can only be ruled out whole
+		if ".gz" in log.Filename:
+			return None
+
+		if log.Range:
+			first, last = log.Range
+
+			ranges = [ ( max(start,first), min(end,last) ) for start, end in ranges if start < last and end > first ]
+
+		return ranges
+
+# Result Format : Named Group Matches As Records, So Downstream Tools Don't Re-parse Text
+class ResultFormat(TitleValueFormatter,Taggable):
+	"""Workers Write A CSV Or JSON Lines Record Per Match, A Column Per Named Group, Parquet Is Converted From JSON Lines At The End"""
+
+	# Output formats (--format)
+	Formats = [ "text", "csv", "jsonl", "parquet" ]
+	# Named groups holding timestamps, written as ISO 8601 (a timestamp column in parquet)
+	TimestampColumns = [ "timestamp" ]
+	# Column for matches of patterns without named groups (and for dumps)
+	LineColumn = "line"
+	# Integer columns (aggregate counts, see Aggregate)
+	IntegerColumns = []
+
+	# Output format
+	Name = "text"
+	# Format the workers write (text, csv or jsonl)
+	Records = "text"
+	# Named groups of every query, in order of first appearance
+	Columns = None
+
+	# Init Instance
+	def __init__(self,name="text",queries=None):
+		self.Name = name
+		self.Records = "jsonl" if name == "parquet" else name
+		self.Columns = []
+
+		for query in (queries if queries else []):
+			self.AddColumns(query)
+
+		if len(self.Columns) == 0:
+			self.Columns.append(self.LineColumn)
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Name",self.Name)
+		self.Pfmt("Records",self.Records)
+		self.Pfmt("Columns",self.Columns)
+		self.Pfmt("Tag",self.Tag)
+
+	# Add The Named Groups Of A Query As Columns
+	def AddColumns(self,query):
+		program = query.Program
+
+		names = sorted(program.groupindex.keys(),key=program.groupindex.get) if program else []
+
+		if len(names) == 0:
+			names = [ self.LineColumn ]
+
+		for name in names:
+			if not name in self.Columns:
+				self.Columns.append(name)
+
+	# Records Rather Than Text
+	def Structured(self):
+		return self.Records != "text"
+
+	# Check The Format Can Be Written Here, Say Why Not
+	def Usable(self,args):
+		if self.Name == "parquet" and pyarrow is None:
+			Msg("--format parquet needs pyarrow (pip install pyarrow), csv and jsonl don't",ignoreModuleMode=True)
+		elif self.Name == "parquet" and not args.out:
+			Msg("--format parquet needs --out, it can't be streamed",ignoreModuleMode=True)
+		elif self.Structured() and args.server:
+			Msg(f"--format {self.Name} is for local searches, remote clients return text",ignoreModuleMode=True)
+		else:
+			return True
+
+		return False
+
+	# File The Workers' Records Go To (Parquet Output Is Converted From It)
+	def RecordsFile(self,filename):
+		return f"{filename}.{os.getpid()}.jsonl" if self.Name == "parquet" else filename
+
+	# Leading Bytes Of The Output
+	def Header(self):
+		if self.Records == "csv":
+			buffer = io.StringIO()
+			csv.writer(buffer,lineterminator="\n").writerow(self.Columns)
+
+			return buffer.getvalue().encode("utf-8")
+
+		return b""
+
+	# Record Encoder For One Log (Runs In The Worker)
+	def Encoder(self,log):
+		"""Callable (groups, line) -> Newline Ended bytes, groups Maps Group Names To Values (bytes Or str, None If A Group Didn't Take Part), Empty Groups Record The Line"""
+
+		columns = self.Columns
+		stamps = set(self.TimestampColumns)
+		lineColumn = self.LineColumn
+
+		# Syslog timestamps have no year, the log's date supplies it
+		stamper = LineTimestamp(log.EncodedDate)
+
+		buffer = io.StringIO()
+		writer = csv.writer(buffer,lineterminator="\n")
+
+		stampIndexes = [ index for index, name in enumerate(columns) if name in stamps ]
+		stampCache = dict()
+
+		# JSON records are put together from escaped strings, a JSONEncoder is rebuilt on every call
+		quote = json.encoder.encode_basestring
+		keys = [ ("{" if index == 0 else ",") + quote(name) + ":" for index, name in enumerate(columns) ]
+
+		def Stamp(value):
+			stamp = stampCache.get(value)
+
+			if stamp is None:
+				match = stamper.Expression.match(value.encode("utf-8"))
+				converted = stamper.Convert(match) if match else None
+
+				# Convert() falls back on the last good timestamp, there is none here
+				stamp = converted.isoformat() if converted and converted != stamper.Last else value
+
+				if len(stampCache) >= LineTimestamp.CacheSize:
+					stampCache.clear()
+
+				stampCache[value] = stamp
+
+			return stamp
+
+		def Values(groups,line):
+			if len(groups) == 0:
+				groups = { lineColumn : line.rstrip(b"\r\n" if type(line) is bytes else "\r\n") }
+
+			values = [ groups.get(name) for name in columns ]
+			values = [ (value.decode("utf-8","replace") if type(value) is bytes else value) for value in values ]
+
+			for index in stampIndexes:
+				if values[index] is not None:
+					values[index] = Stamp(values[index])
+
+			return values
+
+		def EncodeCsv(groups,line):
+			values = [ ("" if value is None else value) for value in Values(groups,line) ]
+
+			record = ",".join(values)
+
+			# The csv module only for records that need quoting
+			if record == "" or record.count(",") != len(values) - 1 or '"' in record or "\n" in record or "\r" in record:
+				writer.writerow(values)
+
+				record = buffer.getvalue()
+
+				buffer.seek(0)
+				buffer.truncate()
+			else:
+				record += "\n"
+
+			return record.encode("utf-8")
+
+		def EncodeJson(groups,line):
+			# Every column in every record, in the same order, a leading timestamp stays the merge key
+			return ("".join([ key + ("null" if value is None else quote(value)) for key, value in zip(keys,Values(groups,line)) ]) + "}\n").encode("utf-8")
+
+		return EncodeCsv if self.Records == "csv" else EncodeJson
+
+	# Finish The Output Once The Search Is Done, Parquet Is Converted From The Records File
+	def Finish(self,filename,completed=True):
+		if self.Name != "parquet":
+			return
+
+		records = self.RecordsFile(filename)
+
+		try:
+			if completed:
+				schema = pyarrow.schema([ (name,(pyarrow.int64() if name in self.IntegerColumns else pyarrow.timestamp("s") if name in self.TimestampColumns else pyarrow.string())) for name in self.Columns ])
+
+				if os.path.getsize(records) > 0:
+					table = pyarrow.json.read_json(records,parse_options=pyarrow.json.ParseOptions(explicit_schema=schema))
+				else:
+					table = schema.empty_table()
+
+				pyarrow.parquet.write_table(table,filename)
+		finally:
+			if os.path.exists(records):
+				os.remove(records)
+
+# Aggregate : Counts Per Combination Of Named Group Values, Instead Of The Matches Themselves
+class Aggregate(TitleValueFormatter,Taggable):
+	"""Workers Count Each Log, Their Partials ([ count, value, ... ] JSON Lines) Are Written Into This (It's File-like) And Merged"""
+
+	# Aggregations (--count-by, --distinct)
+	Modes = [ "count", "distinct" ]
+	# Column holding the count in csv, jsonl and parquet reports
+	CountColumn = "count"
+
+	# Aggregation
+	Mode = "count"
+	# Named groups making up the key
+	Columns = None
+	# Only the N most common (count) or first N (distinct), 0 for all
+	Top = 0
+	# Merged counts by key (tuple of values)
+	Counts = None
+	# Partial line left over from the last write
+	Pending = b""
+
+	# Init Instance
+	def __init__(self,mode="count",columns=None,top=0):
+		self.Mode = mode
+		self.Columns = list(columns) if columns else []
+		self.Top = top
+		self.Counts = Counter()
+		self.Pending = b""
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Mode",self.Mode)
+		self.Pfmt("Columns",self.Columns)
+		self.Pfmt("Top",self.Top)
+		self.Pfmt("Keys",len(self.Counts) if self.Counts is not None else 0)
+		self.Pfmt("Tag",self.Tag)
+
+	# Workers Get The Spec, Not What Has Been Merged So Far
+	def __getstate__(self):
+		return { "Mode" : self.Mode, "Columns" : self.Columns, "Top" : self.Top }
+
+	def __setstate__(self,state):
+		self.__dict__.update(state)
+		self.Counts = Counter()
+		self.Pending = b""
+
+	# Aggregate Asked For On The Command Line, None If Not
+	@classmethod
+	def FromArgs(cls,args):
+		if not args.count_by and not args.distinct:
+			return None
+
+		mode, columns = ( "count", args.count_by ) if args.count_by else ( "distinct", args.distinct )
+
+		return cls(mode,[ column.strip() for column in columns.split(",") if column.strip() ],int(args.top) if args.top else 0)
+
+	# Spec As One Line, Sent To Remote Clients With The Patterns
+	def Pack(self):
+		return f"{self.Mode} {','.join(self.Columns)}"
+
+	# Aggregate From A Packed Spec
+	@classmethod
+	def Unpack(cls,line):
+		mode, sep, columns = line.partition(" ")
+
+		return cls((mode if mode in cls.Modes else "count"),columns.split(","))
+
+	# Check The Columns Are Named Groups Of The Queries, Say Why Not
+	def Usable(self,args,queries):
+		names = set()
+
+		for query in queries:
+			if query.Program:
+				names.update(query.Program.groupindex.keys())
+
+		missing = [ column for column in self.Columns if not column in names ]
+
+		if args.count_by and args.distinct:
+			Msg("--count-by and --distinct can't be used together",ignoreModuleMode=True)
+		elif len(self.Columns) == 0:
+			Msg(f"--{'count-by' if self.Mode == 'count' else self.Mode} needs named groups (comma separated)",ignoreModuleMode=True)
+		elif len(missing) > 0:
+			Msg(f"{', '.join(missing)} not a named group of any pattern or named query in scope",ignoreModuleMode=True)
+		else:
+			return True
+
+		return False
+
+	# Partial Aggregate Of One Log (Runs In The Worker)
+	def Partial(self,counts):
+		"""Counts Keyed By Tuples Of Group Values (bytes Or str, None If A Group Didn't Take Part) As JSON Lines"""
+
+		# Put together from escaped strings, as ResultFormat does, json.dumps per key is several times slower
+		quote = json.encoder.encode_basestring_ascii
+
+		return "".join([ f"[{count}," + ",".join([ ("null" if value is None else quote(value.decode("utf-8","replace") if type(value) is bytes else value)) for value in key ]) + "]\n" for key, count in counts.items() ]).encode("ascii")
+
+	# Merge Partials, Which Arrive In Arbitrary Pieces (Spools, Remote Result Files)
+	def write(self,data):
+		data = self.Pending + bytes(data)
+		end = data.rfind(b"\n") + 1
+
+		self.Pending = data[end:]
+
+		lines = [ line for line in data[:end].splitlines() if line.strip() ]
+
+		if len(lines) == 0:
+			return len(data)
+
+		# The lines are arrays, one parse of them all as an array of arrays
+		try:
+			records = json.loads(b"[" + b",".join(lines) + b"]")
+		except ValueError as err:
+			DbgMsg(f"Partial aggregate not merged : {err}")
+			return len(data)
+
+		counts = self.Counts
+
+		for record in records:
+			counts[tuple(record[1:])] += record[0]
+
+		return len(data)
+
+	def flush(self):
+		pass
+
+	# Merged Result, Most Common First (count) Or Sorted By Values (distinct)
+	def Rows(self):
+		top = self.Top if self.Top > 0 else None
+
+		if self.Mode == "count":
+			return self.Counts.most_common(top)
+
+		return sorted(self.Counts.items(),key=lambda item: [ ("" if value is None else value) for value in item[0] ])[:top]
+
+	# Output Format Of The Report, Group Values Are Written As Found (No Timestamp Conversion)
+	def ReportFormat(self,name):
+		resultformat = ResultFormat(name)
+
+		resultformat.Columns = self.Columns + ([ self.CountColumn ] if self.Mode == "count" else [])
+		resultformat.TimestampColumns = []
+		resultformat.IntegerColumns = [ self.CountColumn ] if self.Mode == "count" else []
+
+		return resultformat
+
+	# Write The Merged Result In The Output Format
+	def Report(self,out,resultformat):
+		"""Text Is Like 'uniq -c', Records Get A Column Per Group (Plus count), Parquet Is Converted Later By ResultFormat.Finish"""
+
+		out = getattr(out,"buffer",out)
+		counted = self.Mode == "count"
+
+		if resultformat.Records == "text":
+			for key, count in self.Rows():
+				values = " ".join([ ("None" if value is None else value) for value in key ])
+
+				out.write((f"{count:>7} {values}\n" if counted else f"{values}\n").encode("utf-8"))
+		elif resultformat.Records == "csv":
+			buffer = io.StringIO()
+			writer = csv.writer(buffer,lineterminator="\n")
+
+			writer.writerow(resultformat.Columns)
+
+			for key, count in self.Rows():
+				writer.writerow([ ("" if value is None else value) for value in key ] + ([ count ] if counted else []))
+
+			out.write(buffer.getvalue().encode("utf-8"))
+		else:
+			for key, count in self.Rows():
+				record = dict(zip(self.Columns,key))
+
+				if counted:
+					record[self.CountColumn] = count
+
+				out.write((json.dumps(record) + "\n").encode("utf-8"))
+
+# Result Stream : Worker Side File-like That Ships Result Batches To The Manager
+class ResultStream:
+	"""Write-only Binary Stream, Batches Are Put On The Result Queue As (log ID, bytes), None Ends The Log"""
+
+	# Bytes per batch
+	BatchSize = 256 * 1024
+
+	# Init Instance
+	def __init__(self,results,id,tee=None):
+		self.Results = results
+		self.ID = id
+		self.Buffer = bytearray()
+		self.Closed = False
+		# Binary file that gets a copy of every batch (see ResultCache)
+		self.Tee = tee
+
+	# Write Bytes
+	def write(self,data):
+		self.Buffer += data
+
+		if len(self.Buffer) >= self.BatchSize:
+			self.flush()
+
+		return len(data)
+
+	# Ship Buffered Bytes
+	def flush(self):
+		if len(self.Buffer) > 0:
+			if self.Tee:
+				self.Tee.write(self.Buffer)
+
+			self.Results.put(( self.ID, bytes(self.Buffer) ))
+			self.Buffer.clear()
+
+	# Ship The Rest And Mark The End Of This Log
+	def close(self):
+		if not self.Closed:
+			self.flush()
+			self.Results.put(( self.ID, None ))
+			self.Closed = True
+
+			if self.Tee:
+				self.Tee.close()
+
+# Result Spool : Manager Side Store For A Log's Streamed Results
+class ResultSpool(TitleValueFormatter,Taggable):
+	"""In Memory Result Batches For A Log, Spilled To A Temp File When Over Budget"""
+
+	# Log the results belong to
+	Log = None
+	# In memory batches
+	Batches = None
+	# Bytes held in memory
+	Size = 0
+	# Spill file (once spilled, all later batches go there too)
+	Spill = None
+	# End of stream received
+	Finished = False
+	# Spools of shards, in order, whose results make up this spool
+	Parts = None
+	# Being read by a merge (see ResultMerge), can't be spilled
+	Merging = False
+
+	# Init Instance
+	def __init__(self,log,parts=None):
+		self.Log = log
+		self.Batches = []
+		self.Size = 0
+		self.Spill = None
+		self.SpillHandle = None
+		self.Finished = parts is not None
+		self.Parts = parts
+		self.Merging = False
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Log",self.Log.Filename)
+		self.Pfmt("Batches",len(self.Batches))
+		self.Pfmt("Size",self.Size)
+		self.Pfmt("Spill",self.Spill)
+		self.Pfmt("Finished",self.Finished)
+		self.Pfmt("Parts",(len(self.Parts) if self.Parts else None))
+		self.Pfmt("Tag",self.Tag)
+
+	# All Results Received (Own Stream And Those Of Any Parts)
+	def Done(self):
+		return self.Finished and all([ part.Done() for part in (self.Parts or []) ])
+
+	# Add Batch, Returns Bytes Added To Memory
+	def Append(self,batch):
+		if self.SpillHandle:
+			self.SpillHandle.write(batch)
+			return 0
+
+		self.Batches.append(batch)
+		self.Size += len(batch)
+
+		return len(batch)
+
+	# Move In Memory Batches To A Spill File, Returns Bytes Freed
+	def SpillTo(self,folder):
+		freed = self.Size
+
+		if self.SpillHandle is None:
+			self.Spill = TmpFilename(folder=folder,prefix="logsearch_spool_",postfix="_"+self.Log.EncodedDateStr())
+			self.SpillHandle = open(self.Spill,"wb")
+
+			self.Log.Track(f"results spilled to {self.Spill}")
+
+		for batch in self.Batches:
+			self.SpillHandle.write(batch)
+
+		self.Batches.clear()
+		self.Size = 0
+
+		return freed
+
+	# Mark Spool (And Its Parts) As Being Merged
+	def Hold(self):
+		self.Merging = True
+
+		for part in (self.Parts or []):
+			part.Hold()
+
+	# Iterate Lines Held, Releasing Them As They Are Read
+	def Consume(self):
+		for part in (self.Parts or []):
+			yield from part.Consume()
+
+		if self.SpillHandle:
+			self.SpillHandle.close()
+			self.SpillHandle = None
+
+		if self.Spill:
+			with open(self.Spill,"rb") as f_in:
+				yield from f_in
+
+			os.remove(self.Spill)
+
+			self.Spill = None
+
+		while len(self.Batches) > 0:
+			batch = self.Batches.pop(0)
+			self.Size -= len(batch)
+
+			yield from batch.splitlines(True)
+
+	# Iterate Lines Held So Far (Parts, Then Spill File, Then Memory)
+	def Lines(self):
+		for part in (self.Parts or []):
+			yield from part.Lines()
+
+		if self.SpillHandle:
+			self.SpillHandle.flush()
+
+		if self.Spill:
+			with open(self.Spill,"rb") as f_in:
+				yield from f_in
+
+		for batch in self.Batches:
+			yield from batch.splitlines(True)
+
+	# Write Everything Held So Far To out, Returns (bytes, lines, memory freed)
+	def WriteTo(self,out):
+		written = lines = freed = 0
+
+		for part in (self.Parts or []):
+			count, newlines, released = part.WriteTo(out)
+
+			written += count
+			lines += newlines
+			freed += released
+
+		if self.SpillHandle:
+			self.SpillHandle.close()
+			self.SpillHandle = None
+
+			with open(self.Spill,"rb") as f_in:
+				for block in iter(lambda: f_in.read(1024 * 1024),b""):
+					out.write(block)
+
+					written += len(block)
+					lines += block.count(b"\n")
+
+			os.remove(self.Spill)
+
+			self.Spill = None
+
+		for batch in self.Batches:
+			out.write(batch)
+
+			written += len(batch)
+			lines += batch.count(b"\n")
+
+		freed += self.Size
+
+		self.Batches.clear()
+		self.Size = 0
+
+		return written, lines, freed
+
+	# Throw Results Away, Returns Memory Freed
+	def Discard(self):
+		freed = self.Size
+
+		for part in (self.Parts or []):
+			freed += part.Discard()
+
+		if self.SpillHandle:
+			self.SpillHandle.close()
+			self.SpillHandle = None
+
+		if self.Spill and os.path.exists(self.Spill):
+			os.remove(self.Spill)
+
+		self.Batches.clear()
+		self.Size = 0
+
+		return freed
+
+# Log Meta Data
+class LogMeta(TitleValueFormatter,Taggable,ItemID):
+	"""Log Source Meta Data Information Class"""
+
+	DateExpression = "^(?P<year>\d{4})(?P<month>\d{2})(?P<day>\d{2})$"
+
+	# Official Name of Log
+	Name = None
+	# Current Status of log, good or not good (i.e. being fed or stopped)
+	Status = None
+	# Primary Log Group (also in LogGroups)
+	LogGroup = None
+	# Log groups this log belongs to, CSV-Str
+	LogGroups = None
+	# Nickname of log (short name)
+	Nickname = None
+	# Description of Log
+	Description = None
+	# Log Owner
+	Owner = None
+	# IP Source of Log (Part of Name)
+	Source = None
+	# ???
+	Targets = None
+	# Parsing info (filename pattern)
+	ParseInfo = None
+	# Compiled ParseInfo[0] and the pattern it was compiled from
+	FilenameExpression = None
+	FilenamePattern = None
+	# ??
+	Streamers = None
+	# Named Queries
+	Queries = None
+	# Log Meta Comment
+	Comment = None
+	# Any Notes
+	Notes = None
+
+	# Init Instance
+	def __init__(self, xnode = None):
+		"""Init Instance"""
+
+		super(Taggable,self).__init__()
+		super(ItemID,self).__init__()
+		super(TitleValueFormatter,self).__init__()
+
+		self.Targets = list()
+		self.ParseInfo = list()
+		self.Queries = list()
+		self.LogGroups = list()
+
+		if not xnode is None:
+			self.Read(xnode)
+
+		ItemID.RandomID(self)
+
+	# Default Print
+	def Print(self):
+		"""Pretty Print Instance"""
+
+		self.Pfmt("ID",self.ID)
+		self.Pfmt("Name",self.Name)
+		self.Pfmt("Status",self.Status)
+		self.Pfmt("Group",self.LogGroup)
+		self.Pfmt("Nickname",self.Nickname)
+		self.Pfmt("Description",self.Description)
+		self.Pfmt("Owner",self.Owner)
+		self.Pfmt("Source",self.Source)
+		self.Pfmt("Comment",self.Comment)
+		self.Pfmt("Notes",self.Notes)
+
+		self.Pfmt("Groups","")
+
+		for lgrp in self.LogGroups:
+			self.Pfmt("\t",lgrp)
+
+		self.Pfmt("Targets","")
+
+		for target in self.Targets:
+			self.Pfmt("\t",target)
+
+		self.Pfmt("File Exprs","")
+
+		for expr in self.ParseInfo:
+			self.Pfmt("\t",expr)
+
+		self.Pfmt("Streamers","")
+
+		if self.Streamers:
+			for streamer in self.Streamers:
+				self.Pfmt("\t",f"{streamer.Name} {streamer.Filename}")
+		else:
+			self.Pfmt("Streamers","None")
+
+		self.Pfmt("Queries","")
+
+		for query in self.Queries:
+			self.Pfmt("\t",f"{query.Name} {query.Expression}")
+
+		self.Pfmt("Tag",self.Tag)
+
+	# Read Data From XElement
+	def Read(self,xnode):
+		"""Read Log Meta Info From XNode"""
+
+		self.Name=xnode.attrib['name']
+		self.Nickname = xnode.attrib['nick']
+		loggroups = xnode.attrib['group']
+
+		self.LogGroups = list(loggroups.split(","))
+
+		self.LogGroup = self.LogGroups[0]
+
+		self.Status=xnode.attrib['status']
+		self.Description=xnode.find("description").text
+		self.Owner=xnode.find("owner").text
+		self.Source=xnode.find("source").text
+		self.Comment=xnode.find("comment").text
+		self.Notes=xnode.find("notes").text
+
+		for name in xnode.find("parse-info").findall("name"):
+			self.ParseInfo.append(name.text)
+
+		for target in xnode.find("targets").findall("target"):
+			self.Targets.append([ target.attrib["comment"],target.text ])
+
+		queries = xnode.find("queries")
+
+		if queries:
+			for query in queries.findall("query"):
+				qry = NamedQuery(query)
+
+				self.Queries.append(qry)
+
+	# Unpack Packed Line
+	def Unpack(self,lines):
+		"""Unpack a Packed Line of Meta Info"""
+
+		self.Name = lines.pop(0)
+		self.Nickname = lines.pop(0)
+		self.LogGroup = lines.pop(0)
+
+		self.LogGroups = list(lines.pop(0).split(","))
+
+		self.Status = lines.pop(0)
+		self.Description = lines.pop(0)
+		self.Owner = lines.pop(0)
+		self.Source = lines.pop(0)
+		self.Comment = lines.pop(0)
+		self.Notes = lines.pop(0)
+
+		line = lines.pop(0)
+
+		while not line == "endmeta":
+			prefix, sep, data = line.partition(":")
+
+			if prefix == "name":
+				self.ParseInfo.append(data)
+			elif prefix == "target":
+				self.Targets.append(data)
+			elif prefix == "streamer":
+				data = data.split(",")
+				streamer = Streamer(data[0],data[1])
+				self.Streamers.append(streamer)
+			elif prefix == "query":
+				data = data.split(",")
+				query = NamedQuery(data[0],data[1])
+				self.Queries.append(query)
+
+			line = lines.pop(0)
+
+	# Pack Meta for Network Transfer
+	def Pack(self):
+		"""Pack Meta Into a Dat Line for XFer"""
+
+		lines = []
+
+		lines.append(self.Name)
+		lines.append(self.Nickname)
+		lines.append(self.LogGroup)
+		lines.append(",".join(self.LogGroups))
+		lines.append(self.Status)
+		lines.append(self.Description)
+		lines.append(self.Owner)
+		lines.append(self.Source)
+		lines.append(self.Comment)
+		lines.append(self.Notes)
+
+		for name in self.ParseInfo:
+			lines.append(f"name:{name}")
+
+		for target in self.Targets:
+			lines.append(f"target:{target}")
+
+		for streamer in self.Streamers:
+			lines.append(f"streamer:{streamer.Name},{streamer.Filename}")
+
+		for query in self.Queries:
+			lines.append(f"query:{query.Name},{query.Expression}")
+
+		lines.append("endmeta")
+
+		return lines
+
+	# Return list of searchable fields
+	def Searchables(self):
+		"""Return a List of Searchable Fields"""
+
+		lst = [ self.Nickname, self.LogGroup, self.Source, self.Owner ]
+
+		lst.extend(self.LogGroups)
+
+		return lst
+
+	# Convert File Date YYYYMMDD into Date
+	def ConvertStringToDate(self,dateString):
+		"""Convert YYMMDD date string into Date"""
+
+
+		# TODO: This can be fixed or use py_helper date conversions
+
+		year = date.today().year
+		month = date.today().month
+
+		inlen = len(dateString)
+
+		if inlen <= 2: # If just day, assume this year and this month
+			dateString = "{:4}{:2}{:2}".format(str(year).zfill(4),str(month).zfill(2),str(dateString).zfill(2))
+		elif inlen <= 4: # if month and day, assume this year
+			dateString = "{:4}{:4}".format(str(year).zfill(4),str(dateString).zfill(4))
+
+		match = re.match(self.DateExpression,dateString)
+
+		computed_date = None
+
+		if match != None:
+			computed_date = date(int(match.group("year")),\
+				int(match.group("month")), \
+				int(match.group("day")))
+		else:
+			DbgMsg(f"Bad Date String : {dateString}")
+
+		return computed_date
+
+	# Convert Date into YYYYMMDD String
+	def ConvertDateToString(self,inputDate):
+		"""Convert Date Into YYYMMDD String"""
+
+		# TODO : Replace with python built in functionality or py_helper date conversion facilities
+
+		output = "{}{}{}".format(str(inputDate.year).zfill(4),str(inputDate.month).zfill(2),str(inputDate.day).zfill(2))
+
+		return output
+
+	# Get Compiled Filename Expression (ParseInfo[0])
+	def FilenameProgram(self):
+		if self.FilenamePattern is not self.ParseInfo[0]:
+			self.FilenamePattern = self.ParseInfo[0]
+			self.FilenameExpression = re.compile(self.FilenamePattern)
+
+		return self.FilenameExpression
+
+	# Get Archive Date
+	def GetDate(self,filename=None,match=None):
+		"""Get Date Encoded Into Filename (YYYYMMDD)"""
+
+		date_cvt = None
+
+		if filename and not match:
+			match = self.FilenameProgram().match(os.path.basename(filename))
+
+		if match:
+			filedate = match.group("date")
+
+			if filedate != None:
+				date_cvt = self.ConvertStringToDate(filedate)
+			else:
+				date_cvt = ModificationTime(filename).date()
+
+		return date_cvt
+
+	# Get Matching Log Files
+	def GetLogFiles(self,folder,startDate=None,endDate=None,catalog=None):
+		"""Get Matching Log Files From Storage With Matching Dates"""
+
+		# Searches covering many metas should share one catalog, so each folder is scanned once
+		if catalog is None:
+			catalog = LogCatalog([ self ])
+
+		return catalog.GetLogFiles(self,folder,startDate,endDate)
+
+	# Check for Prepackaged Queries
+	def HasQuery(self,name):
+		qry = None
+
+		for query in self.Queries:
+			if query.Name == name:
+				qry = query
+
+				break
+
+		return qry
+
+	# Check for Prepackaged Streamer Filters
+	def HasStreamer(self,name):
+		strmr = None
+
+		for streamer in self.Streamers:
+			if streamer.Name == name:
+				strmr = streamer
+				break
+
+		return strmr
+
+	# Get Named Streamers
+	def GetStreamers(self,names):
+		strmrs = []
+
+		for name in names:
+			strmr = self.HasStreamer(name)
+
+			if strmr:
+				strmrs.append(strmr)
+
+		return strmrs
+
+	# Get Named Queries
+	def GetQueries(self,names):
+		qrys = []
+
+		for name in names:
+			query = self.HasQuery(name)
+
+			if query:
+				qrys.append(query)
+
+		return qrys
+
+	#
+	# Static Members
+	#
+
+	# LoadMetas
+	@Traced("LogMeta::LoadMetas")
+	def LoadMetas(filename):
+		"""Load Log Metas from a Log Meta XML Source File"""
+
+		metas = list()
+
+		if os.path.exists(filename):
+			try:
+				sources = ET.parse(filename)
+
+				root = sources.getroot()
+
+				xmetas = root.findall("log")
+
+				for meta in xmetas:
+					metas.append(LogMeta(meta))
+
+			except Exception as err:
+				ErrMsg(err,f"An error occurred attempting to open {filename}")
+		else:
+			Msg(f"{filename} does not exist")
+
+		return metas
+
+# Log Catalog : Scan Each Folder Once, Classify Files Against All Metas
+class LogCatalog(TitleValueFormatter,Taggable):
+	"""Date Sorted Catalog Of Log Files Per Folder And Meta, Optionally Persisted In SQLite"""
+
+	# Catalog store filename (inside TempSpace)
+	StoreName = "psearch.catalog.sqlite"
+
+	# Metas files are classified against
+	Metas = None
+	# Scanned Folders { folder : { meta.ID : ( [ dates ], [ (date, path, size) ], [ undated entries ] ) } }
+	Folders = None
+	# Files Scanned
+	FilesScanned = 0
+	# Persistent Store (SQLite filename, None for in memory only)
+	Store = None
+	# Ignore stored folder state, rescan everything
+	Rescan = False
+	# Store Connection
+	Connection = None
+	# Seconds a directory mtime may lag a change (NFS and FAT stamps are coarse), listings this fresh are re-read
+	MtimeGranularity = 2
+
+	# Init Instance
+	def __init__(self,metas,store=None,rescan=False):
+		self.Metas = list(metas)
+		self.Folders = dict()
+		self.FilesScanned = 0
+		self.Store = store
+		self.Rescan = rescan
+		self.Connection = None
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Metas",len(self.Metas))
+		self.Pfmt("Folders",list(self.Folders.keys()))
+		self.Pfmt("Files Scanned",self.FilesScanned)
+		self.Pfmt("Store",self.Store)
+		self.Pfmt("Rescan",self.Rescan)
+		self.Pfmt("Tag",self.Tag)
+
+	# Context Manager Entry
+	def __enter__(self):
+		return self
+
+	# Context Manager Exit
+	def __exit__(self,exc_type,exc_value,exc_tb):
+		self.Close()
+
+	# Open Catalog Store In TempSpace
+	@classmethod
+	def Default(cls,metas):
+		"""Catalog Persisted In TempSpace, Honoring --rescan"""
+
+		global TempSpace, CatalogRescan
+
+		return cls(metas,store=os.path.join(TempSpace,cls.StoreName),rescan=CatalogRescan)
+
+	# Stable Key For A Meta (ID is random per run, a changed filename pattern is a new meta)
+	def MetaKey(self,meta):
+		return hashlib.sha1(f"{meta.Name}\n{meta.ParseInfo[0]}".encode("utf-8")).hexdigest()
+
+	# Open Store Connection, Creating Tables If Needed
+	def Open(self):
+		if self.Connection is None:
+			self.Connection = sqlite3.connect(self.Store,timeout=30)
+
+			# Folder mtimes are kept in nanoseconds with the time the listing was read (the old float table is dropped)
+			self.Connection.executescript("""
+				drop table if exists folders;
+				create table if not exists listings (folder text primary key, mtime integer, scanned integer);
+				create table if not exists files (folder text, name text, size integer, mtime integer, primary key (folder, name));
+				create table if not exists classified (folder text, meta text, primary key (folder, meta));
+				create table if not exists classes (folder text, name text, meta text, date integer, primary key (folder, meta, name));
+			""")
+
+		return self.Connection
+
+	# Close Store
+	def Close(self):
+		if self.Connection:
+			self.Connection.close()
+			self.Connection = None
+
+	# Classify Entries Into Date Sorted Lists Per Meta
+	def Catalog(self,entries):
+		catalog = dict()
+
+		for id, items in entries.items():
+			# Undated entries can't be compared with dates, they are only returned unfiltered
+			undated = [ entry for entry in items if entry[0] is None ]
+			items = sorted([ entry for entry in items if entry[0] is not None ])
+
+			catalog[id] = ( [ entry[0] for entry in items ], items, undated )
+
+		return catalog
+
+	# Scan Folder, Classifying Every File Against Every Meta In One Pass
+	@Traced("LogCatalog::Scan")
+	def Scan(self,folder):
+		"""Scan folder Once (os.scandir), Entries Are Sorted By Date For Bisecting"""
+
+		catalog = None
+
+		if self.Store:
+			try:
+				catalog = self.Refresh(folder)
+			except sqlite3.Error as err:
+				DbgMsg(f"Catalog store {self.Store} unusable, scanning in memory : {err}")
+				self.Close()
+				self.Store = None
+
+		if catalog is None:
+			entries = { meta.ID : [] for meta in self.Metas }
+			programs = [ ( meta, meta.FilenameProgram() ) for meta in self.Metas ]
+
+			with os.scandir(folder) as scanner:
+				for item in scanner:
+					self.FilesScanned += 1
 
-	# Init Instance
-	def __init__(self, xnode = None):
-		"""Init Instance"""
+					# Same filter as Refresh, so stored and in memory catalogs list the same logs
+					if not item.is_file():
+						continue
 
-		super(Taggable,self).__init__()
-		super(ItemID,self).__init__()
-		super(TitleValueFormatter,self).__init__()
+					stat = None
 
-		self.Targets = list()
-		self.ParseInfo = list()
-		self.Queries = list()
-		self.LogGroups = list()
+					for meta, program in programs:
+						match = program.match(item.name)
 
-		if not xnode is None:
-			self.Read(xnode)
+						if match:
+							if stat is None:
+								stat = item.stat()
 
-		ItemID.RandomID(self)
+							entries[meta.ID].append(( meta.GetDate(item.path,match), item.path, stat.st_size ))
 
-	# Default Print
-	def Print(self):
-		"""Pretty Print Instance"""
+			catalog = self.Catalog(entries)
 
-		self.Pfmt("ID",self.ID)
-		self.Pfmt("Name",self.Name)
-		self.Pfmt("Status",self.Status)
-		self.Pfmt("Group",self.LogGroup)
-		self.Pfmt("Nickname",self.Nickname)
-		self.Pfmt("Description",self.Description)
-		self.Pfmt("Owner",self.Owner)
-		self.Pfmt("Source",self.Source)
-		self.Pfmt("Comment",self.Comment)
-		self.Pfmt("Notes",self.Notes)
+		self.Folders[folder] = catalog
 
-		self.Pfmt("Groups","")
+		return catalog
 
-		for lgrp in self.LogGroups:
-			self.Pfmt("\t",lgrp)
+	# Refresh Stored Folder State, Then Load Catalog From Store
+	def Refresh(self,folder):
+		"""Only Listing Changes (dir mtime) Are Re-read, Only New Files Are Stat'ed"""
 
-		self.Pfmt("Targets","")
+		db = self.Open()
 
-		for target in self.Targets:
-			self.Pfmt("\t",target)
+		folderStat = os.stat(folder)
+		scanned = tm.time_ns()
 
-		self.Pfmt("File Exprs","")
+		row = db.execute("select mtime, scanned from listings where folder = ?",( folder, )).fetchone()
 
-		for expr in self.ParseInfo:
-			self.Pfmt("\t",expr)
+		added = []
 
-		self.Pfmt("Streamers","")
+		# A file made in the same mtime tick as the last listing doesn't move the mtime, a listing that fresh is read again
+		granularity = int(self.MtimeGranularity * 1e9)
 
-		if self.Streamers:
-			for streamer in self.Streamers:
-				self.Pfmt("\t",f"{streamer.Name} {streamer.Filename}")
+		if self.Rescan or row is None:
+			for table in [ "files", "classified", "classes" ]:
+				db.execute(f"delete from {table} where folder = ?",( folder, ))
+
+			known = set()
+		elif row[0] != folderStat.st_mtime_ns or row[1] - row[0] < granularity:
+			known = set(name for (name,) in db.execute("select name from files where folder = ?",( folder, )))
 		else:
-			self.Pfmt("Streamers","None")
+			known = None
 
-		self.Pfmt("Queries","")
+		if known is not None:
+			current = dict()
 
-		for query in self.Queries:
-			self.Pfmt("\t",f"{query.Name} {query.Expression}")
+			with os.scandir(folder) as scanner:
+				for item in scanner:
+					self.FilesScanned += 1
 
-		self.Pfmt("Tag",self.Tag)
+					if item.is_file():
+						current[item.name] = item
 
-	# Read Data From XElement
-	def Read(self,xnode):
-		"""Read Log Meta Info From XNode"""
+			for name in known - set(current.keys()):
+				db.execute("delete from files where folder = ? and name = ?",( folder, name ))
+				db.execute("delete from classes where folder = ? and name = ?",( folder, name ))
 
-		self.Name=xnode.attrib['name']
-		self.Nickname = xnode.attrib['nick']
-		loggroups = xnode.attrib['group']
+			for name in set(current.keys()) - known:
+				stat = current[name].stat()
 
-		self.LogGroups = list(loggroups.split(","))
+				db.execute("insert or replace into files values (?,?,?,?)",( folder, name, stat.st_size, stat.st_mtime_ns ))
 
-		self.LogGroup = self.LogGroups[0]
+				added.append(name)
 
-		self.Status=xnode.attrib['status']
-		self.Description=xnode.find("description").text
-		self.Owner=xnode.find("owner").text
-		self.Source=xnode.find("source").text
-		self.Comment=xnode.find("comment").text
-		self.Notes=xnode.find("notes").text
+			db.execute("insert or replace into listings values (?,?,?)",( folder, folderStat.st_mtime_ns, scanned ))
 
-		for name in xnode.find("parse-info").findall("name"):
-			self.ParseInfo.append(name.text)
+		keys = { self.MetaKey(meta) : meta for meta in self.Metas }
 
-		for target in xnode.find("targets").findall("target"):
-			self.Targets.append([ target.attrib["comment"],target.text ])
+		if added:
+			# New files are only classified for the metas in this catalog, others must redo the folder
+			for (key,) in db.execute("select meta from classified where folder = ?",( folder, )).fetchall():
+				if not key in keys:
+					db.execute("delete from classified where folder = ? and meta = ?",( folder, key ))
+					db.execute("delete from classes where folder = ? and meta = ?",( folder, key ))
 
-		queries = xnode.find("queries")
+		classified = set(key for (key,) in db.execute("select meta from classified where folder = ?",( folder, )))
 
-		if queries:
-			for query in queries.findall("query"):
-				qry = NamedQuery(query)
+		for key, meta in keys.items():
+			names = added
 
-				self.Queries.append(qry)
+			if not key in classified:
+				names = [ name for (name,) in db.execute("select name from files where folder = ?",( folder, )) ]
 
-	# Unpack Packed Line
-	def Unpack(self,lines):
-		"""Unpack a Packed Line of Meta Info"""
+				db.execute("insert or replace into classified values (?,?)",( folder, key ))
 
-		self.Name = lines.pop(0)
-		self.Nickname = lines.pop(0)
-		self.LogGroup = lines.pop(0)
+			program = meta.FilenameProgram()
 
-		self.LogGroups = list(lines.pop(0).split(","))
+			for name in names:
+				match = program.match(name)
 
-		self.Status = lines.pop(0)
-		self.Description = lines.pop(0)
-		self.Owner = lines.pop(0)
-		self.Source = lines.pop(0)
-		self.Comment = lines.pop(0)
-		self.Notes = lines.pop(0)
+				if match:
+					encodedDate = meta.GetDate(os.path.join(folder,name),match)
 
-		line = lines.pop(0)
+					db.execute("insert or replace into classes values (?,?,?,?)",( folder, name, key, (encodedDate.toordinal() if encodedDate else None) ))
 
-		while not line == "endmeta":
-			prefix, sep, data = line.partition(":")
+		db.commit()
 
-			if prefix == "name":
-				self.ParseInfo.append(data)
-			elif prefix == "target":
-				self.Targets.append(data)
-			elif prefix == "streamer":
-				data = data.split(",")
-				streamer = Streamer(data[0],data[1])
-				self.Streamers.append(streamer)
-			elif prefix == "query":
-				data = data.split(",")
-				query = NamedQuery(data[0],data[1])
-				self.Queries.append(query)
+		entries = dict()
 
-			line = lines.pop(0)
+		for key, meta in keys.items():
+			rows = db.execute("select classes.name, classes.date, files.size from classes join files using (folder, name) where folder = ? and meta = ?",( folder, key ))
 
-	# Pack Meta for Network Transfer
-	def Pack(self):
-		"""Pack Meta Into a Dat Line for XFer"""
+			entries[meta.ID] = [ ( (date.fromordinal(ordinal) if ordinal else None), os.path.join(folder,name), size ) for name, ordinal, size in rows ]
 
-		lines = []
+		return self.Catalog(entries)
 
-		lines.append(self.Name)
-		lines.append(self.Nickname)
-		lines.append(self.LogGroup)
-		lines.append(",".join(self.LogGroups))
-		lines.append(self.Status)
-		lines.append(self.Description)
-		lines.append(self.Owner)
-		lines.append(self.Source)
-		lines.append(self.Comment)
-		lines.append(self.Notes)
+	# Get Catalog Entries For A Meta In A Folder Between Dates (inclusive)
+	def Entries(self,meta,folder,startDate=None,endDate=None):
+		catalog = self.Folders.get(folder)
 
-		for name in self.ParseInfo:
-			lines.append(f"name:{name}")
+		if catalog is None:
+			catalog = self.Scan(folder)
 
-		for target in self.Targets:
-			lines.append(f"target:{target}")
+		dates, items, undated = catalog.get(meta.ID,( [], [], [] ))
 
-		for streamer in self.Streamers:
-			lines.append(f"streamer:{streamer.Name},{streamer.Filename}")
+		if not (startDate or endDate):
+			return undated + items
 
-		for query in self.Queries:
-			lines.append(f"query:{query.Name},{query.Expression}")
+		low = bisect.bisect_left(dates,startDate) if startDate else 0
+		high = bisect.bisect_right(dates,endDate) if endDate else len(dates)
 
-		lines.append("endmeta")
+		return items[low:high]
 
-		return lines
+	# Get Log Objects For A Meta In A Folder Between Dates (inclusive)
+	def GetLogFiles(self,meta,folder,startDate=None,endDate=None):
+		"""Catalog Version Of LogMeta.GetLogFiles"""
 
-	# Return list of searchable fields
-	def Searchables(self):
-		"""Return a List of Searchable Fields"""
+		# Stored sizes of uncompressed (possibly live) logs may be stale, let Log stat those
+		return [ Log(path,meta,size=(size if path.endswith(".gz") or not self.Store else None),encodedDate=encodedDate) for encodedDate, path, size in self.Entries(meta,folder,startDate,endDate) ]
 
-		lst = [ self.Nickname, self.LogGroup, self.Source, self.Owner ]
+	# Count Logs For A Meta In A Folder
+	def Count(self,meta,folder,startDate=None,endDate=None):
+		return len(self.Entries(meta,folder,startDate,endDate))
 
-		lst.extend(self.LogGroups)
+# Cost Model : Predicted Search Time Per Log, Learned From Previous Runs
+class CostModel(TitleValueFormatter,Taggable):
+	"""Seconds = Bytes x Rate (Learned Per Engine And Compression) x Pattern Factor, Persisted As JSON In TempSpace"""
 
-		return lst
+	# Model store filename (inside TempSpace)
+	StoreName = "psearch.costs.json"
 
-	# Convert File Date YYYYMMDD into Date
-	def ConvertStringToDate(self,dateString):
-		"""Convert YYMMDD date string into Date"""
+	# Seconds per stored byte before anything is learned (gzip expands, and inflating costs)
+	DefaultRates = { "plain" : 1 / 200e6, "gzip" : 1 / 40e6 }
+	# Extra cost per pattern beyond the first (patterns are matched in one pass, so it's small)
+	PatternWeight = 0.02
+	# Seconds per search whatever its size (handing it to a worker, opening the file)
+	Overhead = 0.05
+	# Weight of a new observation in a learned rate
+	Smoothing = 0.2
+	# Searches of fewer bytes teach nothing, fixed overheads dominate them
+	LearnAbove = 1048576
 
+	# JSON store (None to keep the model in memory)
+	Store = None
+	# Learned seconds per byte { "engine:compression" : rate }
+	Rates = None
+	# Observations behind each learned rate
+	Samples = None
+	# Search engine (line or block)
+	Engine = "line"
+	# Patterns and named queries per search
+	Patterns = 1
+	# Learned something since loading
+	Changed = False
 
-		# TODO: This can be fixed or use py_helper date conversions
+	# Init Instance
+	def __init__(self,store=None,engine="line",patterns=1):
+		self.Store = store
+		self.Rates = dict()
+		self.Samples = dict()
+		self.Engine = engine
+		self.Patterns = max(1,patterns)
+		self.Changed = False
 
-		year = date.today().year
-		month = date.today().month
+	# Print State
+	def Print(self):
+		self.Pfmt("Store",self.Store)
+		self.Pfmt("Engine",self.Engine)
+		self.Pfmt("Patterns",self.Patterns)
 
-		inlen = len(dateString)
+		for key, rate in self.Rates.items():
+			self.Pfmt(key,f"{1 / rate / 1048576:.1f} MiB/s",postfix=f"({self.Samples.get(key,0)} samples)")
 
-		if inlen <= 2: # If just day, assume this year and this month
-			dateString = "{:4}{:2}{:2}".format(str(year).zfill(4),str(month).zfill(2),str(dateString).zfill(2))
-		elif inlen <= 4: # if month and day, assume this year
-			dateString = "{:4}{:4}".format(str(year).zfill(4),str(dateString).zfill(4))
+		self.Pfmt("Tag",self.Tag)
 
-		match = re.match(self.DateExpression,dateString)
+	# Model Persisted In TempSpace
+	@classmethod
+	def Default(cls,engine="line",patterns=1):
+		global TempSpace
 
-		computed_date = None
+		model = cls(store=os.path.join(TempSpace,cls.StoreName),engine=engine,patterns=patterns)
+		model.Load()
 
-		if match != None:
-			computed_date = date(int(match.group("year")),\
-				int(match.group("month")), \
-				int(match.group("day")))
-		else:
-			DbgMsg(f"Bad Date String : {dateString}")
+		return model
 
-		return computed_date
+	# Load Learned Rates
+	def Load(self):
+		if self.Store and os.path.exists(self.Store):
+			try:
+				with open(self.Store,"r") as f_in:
+					stored = json.load(f_in)
 
-	# Convert Date into YYYYMMDD String
-	def ConvertDateToString(self,inputDate):
-		"""Convert Date Into YYYMMDD String"""
+				self.Rates = { key : float(rate) for key, rate in stored.get("rates",{}).items() if rate > 0 }
+				self.Samples = { key : int(count) for key, count in stored.get("samples",{}).items() }
+			except ( OSError, ValueError, AttributeError ) as err:
+				DbgMsg(f"Cost model {self.Store} not loaded : {err}")
 
-		# TODO : Replace with python built in functionality or py_helper date conversion facilities
+	# Save Learned Rates (Only When Something Was Learned)
+	def Save(self):
+		if self.Store and self.Changed:
+			try:
+				temporary = self.Store + ".tmp"
 
-		output = "{}{}{}".format(str(inputDate.year).zfill(4),str(inputDate.month).zfill(2),str(inputDate.day).zfill(2))
+				with open(temporary,"w") as f_out:
+					json.dump({ "rates" : self.Rates, "samples" : self.Samples },f_out,indent=1)
 
-		return output
+				os.replace(temporary,self.Store)
 
-	# Get Archive Date
-	def GetDate(self,filename=None,match=None):
-		"""Get Date Encoded Into Filename (YYYYMMDD)"""
+				self.Changed = False
+			except OSError as err:
+				DbgMsg(f"Cost model {self.Store} not saved : {err}")
 
-		date_cvt = None
+	# Compression Of A Log
+	def Compression(self,log):
+		return "gzip" if ".gz" in log.Filename else "plain"
 
-		if filename:
-			match = re.match(self.ParseInfo[0],os.path.basename(filename))
+	# Rate Key
+	def Key(self,log):
+		return f"{self.Engine}:{self.Compression(log)}"
 
-		if match:
-			filedate = match.group("date")
+	# Bytes A Search Reads (A Shard Only Reads Its Range)
+	def Bytes(self,log):
+		if log.Range:
+			return log.Range[1] - log.Range[0]
 
-			if filedate != None:
-				date_cvt = self.ConvertStringToDate(filedate)
+		return log.Size
+
+	# Cost Multiplier For The Pattern Count
+	def PatternFactor(self):
+		return 1 + self.PatternWeight * (self.Patterns - 1)
+
+	# Seconds Per Byte, Learned Or Default
+	def Rate(self,log):
+		return self.Rates.get(self.Key(log),self.DefaultRates[self.Compression(log)])
+
+	# Predicted Seconds To Search A Log
+	def Cost(self,log):
+		return self.Overhead + self.Bytes(log) * self.Rate(log) * self.PatternFactor()
+
+	# Learn From A Completed Search
+	def Learn(self,log,seconds):
+		size = self.Bytes(log)
+
+		if size < self.LearnAbove or seconds <= self.Overhead:
+			return
+
+		key = self.Key(log)
+		observed = (seconds - self.Overhead) / (size * self.PatternFactor())
+
+		if key in self.Rates:
+			self.Rates[key] += self.Smoothing * (observed - self.Rates[key])
+		else:
+			self.Rates[key] = observed
+
+		self.Samples[key] = self.Samples.get(key,0) + 1
+		self.Changed = True
+
+	# Predicted Makespan Of logs Over workers, Longest First To The Least Loaded Worker
+	def Makespan(self,logs,workers,splitsize=0):
+		"""Logs Of splitsize Or More Are Split Across All Workers (Plain Ones, Gzip Splitting Depends On An Index)"""
+
+		workers = max(1,workers)
+
+		jobs = []
+
+		for log in logs:
+			cost = self.Cost(log)
+
+			if splitsize > 0 and workers > 1 and log.Size >= splitsize and self.Compression(log) == "plain":
+				jobs.extend([ cost / workers ] * workers)
 			else:
-				date_cvt = ModificationTime(filename).date()
+				jobs.append(cost)
 
-		return date_cvt
+		loads = [ 0.0 ] * workers
 
-	# Get Matching Log Files
-	def GetLogFiles(self,folder,startDate=None,endDate=None):
-		"""Get Matching Log Files From Storage With Matching Dates"""
+		for cost in sorted(jobs,reverse=True):
+			heapq.heappush(loads,heapq.heappop(loads) + cost)
+
+		return max(loads)
+
+# Index State : Progress Of The Index Builder, So A Stopped Or Killed Run Picks Up Where It Left Off
+class IndexState(TitleValueFormatter,Taggable):
+	"""Logs Already Indexed (Or Not Indexable) By Real Path, With The Size And Mtime They Had, Persisted As JSON In TempSpace"""
+
+	# State store filename (inside TempSpace)
+	StoreName = "psearch.indexer.json"
 
-		matching_items = [ ]
+	# JSON store
+	Store = None
+	# { real path : { "size", "mtime", "status", "seconds", "when" } }
+	Files = None
+	# Lock file, held while a builder runs
+	LockFile = None
+	# Recorded something since loading
+	Changed = False
 
-		files = os.listdir(folder)
+	# Init Instance
+	def __init__(self,store=None):
+		self.Store = store
+		self.Files = dict()
+		self.LockFile = None
+		self.Changed = False
 
-		for log in files:
-			match = re.match(self.ParseInfo[0],log)
+	# Print State
+	def Print(self):
+		self.Pfmt("Store",self.Store)
+		self.Pfmt("Files",len(self.Files))
+		self.Pfmt("Locked",self.LockFile is not None)
+		self.Pfmt("Tag",self.Tag)
 
-			if match:
-				objLog = Log(os.path.join(folder,log),self)
+	# State Persisted In TempSpace, Unless Another Store Is Given
+	@classmethod
+	def Default(cls,store=None):
+		global TempSpace
 
-				if startDate or endDate:
-					archiveDate = objLog.EncodedDate
+		state = cls(store=(store if store else os.path.join(TempSpace,cls.StoreName)))
+		state.Load()
 
-					# start set, no end
-					# end set, no start
-					# both start and end
+		return state
 
-					if (startDate and not endDate) and archiveDate >= startDate:
-						# Hachacha
-						matching_items.append(objLog)
-					elif (not startDate and endDate) and archiveDate <= endDate:
-						# Hachacha
-						matching_items.append(objLog)
-					elif archiveDate >= startDate and archiveDate <= endDate:
-						# Hachacha...
-						matching_items.append(objLog)
-				else:
-					matching_items.append(objLog)
+	# Take The Builder Lock, False If Another Builder Holds It
+	def Lock(self):
+		"""Cron Runs That Overlap A Slow Run (Or A Daemon) Leave Straight Away"""
 
-		return matching_items
+		try:
+			self.LockFile = open(self.Store + ".lock","w")
+			# A POSIX lock belongs to this process, executor workers forked later don't hold it
+			fcntl.lockf(self.LockFile,fcntl.LOCK_EX | fcntl.LOCK_NB)
+		except OSError:
+			self.Unlock()
 
-	# Check for Prepackaged Queries
-	def HasQuery(self,name):
-		qry = None
+			return False
 
-		for query in self.Queries:
-			if query.Name == name:
-				qry = query
+		return True
 
-				break
+	# Release The Builder Lock
+	def Unlock(self):
+		if self.LockFile:
+			self.LockFile.close()
+			self.LockFile = None
 
-		return qry
+	# Load Progress
+	def Load(self):
+		if self.Store and os.path.exists(self.Store):
+			try:
+				with open(self.Store,"r") as f_in:
+					self.Files = json.load(f_in).get("files",{})
+			except ( OSError, ValueError, AttributeError ) as err:
+				DbgMsg(f"Index state {self.Store} not loaded : {err}")
+
+	# Save Progress (Only When Something Was Recorded)
+	def Save(self):
+		if self.Store and self.Changed:
+			try:
+				temporary = self.Store + ".tmp"
 
-	# Check for Prepackaged Streamer Filters
-	def HasStreamer(self,name):
-		strmr = None
+				with open(temporary,"w") as f_out:
+					json.dump({ "files" : self.Files },f_out,indent=1)
+
+				os.replace(temporary,self.Store)
+
+				self.Changed = False
+			except OSError as err:
+				DbgMsg(f"Index state {self.Store} not saved : {err}")
+
+	# Log Needs No Build, Its Index Is Current Or It Can't Be Indexed
+	def Done(self,log,stat):
+		entry = self.Files.get(os.path.realpath(log.Filename))
+
+		if entry is None or entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime:
+			return False
+
+		# A sidecar removed since (TempSpace cleaned out) is rebuilt
+		if entry["status"] == "indexed":
+			return TokenIndex(log.Filename).Load()
+
+		return True
+
+	# Record The Outcome Of A Build (indexed, skipped Or failed, The Last Two Aren't Retried Until The Log Changes)
+	def Record(self,log,status,seconds=0):
+		try:
+			stat = os.stat(log.Filename)
+		except OSError:
+			return
+
+		self.Files[os.path.realpath(log.Filename)] = {
+			"size" : stat.st_size,
+			"mtime" : stat.st_mtime,
+			"status" : status,
+			"seconds" : round(seconds,3),
+			"when" : datetime.now().isoformat(timespec="seconds")
+		}
+
+		self.Changed = True
+
+	# Forget Logs That No Longer Exist
+	def Prune(self):
+		for filename in [ filename for filename in self.Files.keys() if not os.path.exists(filename) ]:
+			del self.Files[filename]
+
+			self.Changed = True
+
+# Result Cache : Output Of Searches Over Logs That No Longer Change, Replayed When The Same Search Is Repeated
+class ResultCache(TitleValueFormatter,Taggable):
+	"""Entries Named By A Hash Of The File Identity (Path, Size, Mtime, Shard Range) And The Search, Least Recently Used Evicted Over Budget"""
+
+	# Cache folder (inside TempSpace)
+	FolderName = "psearch.cache"
+	# Entry list (inside the cache folder)
+	StoreName = "entries.json"
+	# Logs modified this recently may still be written to (the live log, a rotation being compressed)
+	Settle = 300
+
+	# Cache folder
+	Folder = None
+	# Bytes the entries can take up
+	Budget = 0
+	# { key : { "size", "used" } }, the entry file is named by its key
+	Entries = None
+	# Lookups this run
+	Lookups = 0
+	# Hits this run
+	Hits = 0
+	# Bytes of log files not read thanks to hits
+	Saved = 0
+	# Entries added this run
+	Added = 0
+	# Changed since loading
+	Changed = False
+
+	# Init Instance
+	def __init__(self,folder=None,budget=0):
+		self.Folder = folder
+		self.Budget = budget
+		self.Entries = dict()
+		self.Lookups = self.Hits = self.Saved = self.Added = 0
+		self.Changed = False
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Folder",self.Folder)
+		self.Pfmt("Budget",self.Budget)
+		self.Pfmt("Entries",len(self.Entries))
+		self.Pfmt("Size",self.Size())
+		self.Pfmt("Lookups",self.Lookups)
+		self.Pfmt("Hits",self.Hits)
+		self.Pfmt("Saved",self.Saved)
+		self.Pfmt("Tag",self.Tag)
+
+	# Cache Kept In TempSpace, Unless Another Folder Is Given
+	@classmethod
+	def Default(cls,budget,folder=None):
+		global TempSpace
+
+		cache = cls(folder=(folder if folder else os.path.join(TempSpace,cls.FolderName)),budget=budget)
+
+		try:
+			os.makedirs(cache.Folder,exist_ok=True)
+		except OSError as err:
+			DbgMsg(f"Result cache {cache.Folder} not usable : {err}")
+			return None
+
+		cache.Load()
+
+		# The budget may have been lowered since
+		cache.Evict()
+
+		return cache
+
+	# Load Entries, Dropping Those Whose Files Are Gone And Taking In Those Left Unlisted
+	def Load(self):
+		store = os.path.join(self.Folder,self.StoreName)
+
+		if os.path.exists(store):
+			try:
+				with open(store,"r") as f_in:
+					self.Entries = json.load(f_in).get("entries",{})
+			except ( OSError, ValueError, AttributeError ) as err:
+				DbgMsg(f"Result cache {store} not loaded : {err}")
+
+		for key in [ key for key in self.Entries.keys() if not os.path.exists(self.Path(key)) ]:
+			del self.Entries[key]
+
+			self.Changed = True
+
+		# Kept by a search that was ended before recording them, or listed by a concurrent search's save
+		try:
+			with os.scandir(self.Folder) as entries:
+				for entry in entries:
+					if len(entry.name) == 64 and not entry.name in self.Entries and entry.is_file():
+						stat = entry.stat()
+
+						self.Entries[entry.name] = { "size" : stat.st_size, "used" : stat.st_mtime }
+						self.Changed = True
+		except OSError as err:
+			DbgMsg(f"Result cache {self.Folder} not scanned : {err}")
+
+	# Save Entries (Only When Something Changed)
+	def Save(self):
+		if self.Changed:
+			store = os.path.join(self.Folder,self.StoreName)
+
+			try:
+				temporary = store + f".{os.getpid()}.tmp"
+
+				with open(temporary,"w") as f_out:
+					json.dump({ "entries" : self.Entries },f_out,indent=1)
+
+				os.replace(temporary,store)
+
+				self.Changed = False
+			except OSError as err:
+				DbgMsg(f"Result cache {store} not saved : {err}")
+
+	# Key For A Log (Or Shard) And A Search, None If The Log Can't Be Cached
+	def Key(self,log,patterns,settings):
+		"""patterns Are The Log's Queries (Or Expressions), settings Anything Else That Shapes The Output"""
+
+		try:
+			stat = os.stat(log.Filename)
+		except OSError:
+			return None
+
+		if tm.time() - stat.st_mtime < self.Settle:
+			return None
+
+		# Named queries are Query subclasses, anything hashed by str() would change every run
+		expressions = [ ([ getattr(pattern,"Name",None), pattern.Expression, pattern.Index ] if isinstance(pattern,Query) else pattern) for pattern in patterns ]
+		identity = [ os.path.realpath(log.Filename), stat.st_size, stat.st_mtime_ns, log.Range, expressions, settings ]
 
-		for streamer in self.Streamers:
-			if streamer.Name == name:
-				strmr = streamer
-				break
+		return hashlib.sha256(json.dumps(identity,default=str).encode("utf-8")).hexdigest()
 
-		return strmr
+	# Entry File For A Key
+	def Path(self,key):
+		return os.path.join(self.Folder,key)
 
-	# Get Named Streamers
-	def GetStreamers(self,names):
-		strmrs = []
+	# Entry File If The Key Is Cached, Marked As Used
+	def Lookup(self,key,log):
+		self.Lookups += 1
 
-		for name in names:
-			strmr = self.HasStreamer(name)
+		entry = self.Entries.get(key)
 
-			if strmr:
-				strmrs.append(strmr)
+		if entry is None or not os.path.exists(self.Path(key)):
+			return None
 
-		return strmrs
+		entry["used"] = tm.time()
 
-	# Get Named Queries
-	def GetQueries(self,names):
-		qrys = []
+		self.Hits += 1
+		self.Saved += (log.Range[1] - log.Range[0]) if log.Range else log.Size
+		self.Changed = True
 
-		for name in names:
-			query = self.HasQuery(name)
+		return self.Path(key)
 
-			if query:
-				qrys.append(query)
+	# Record An Entry A Worker Wrote, Then Evict Down To Budget
+	def Add(self,path):
+		if not os.path.exists(path):
+			return
 
-		return qrys
+		self.Entries[os.path.basename(path)] = { "size" : os.path.getsize(path), "used" : tm.time() }
+		self.Added += 1
+		self.Changed = True
 
-	#
-	# Static Members
-	#
+		self.Evict()
 
-	# LoadMetas
-	def LoadMetas(filename):
-		"""Load Log Metas from a Log Meta XML Source File"""
+	# Bytes Held
+	def Size(self):
+		return sum([ entry["size"] for entry in self.Entries.values() ])
 
-		global tracer
+	# Remove Least Recently Used Entries Until Within Budget
+	def Evict(self):
+		size = self.Size()
 
-		tracer.Entering("LogMeta::LoadMetas")
+		for key in sorted(self.Entries.keys(),key=lambda key: self.Entries[key]["used"]):
+			if size <= self.Budget:
+				break
 
-		metas = list()
+			size -= self.Entries[key]["size"]
+
+			del self.Entries[key]
 
-		if os.path.exists(filename):
 			try:
-				sources = ET.parse(filename)
+				os.remove(self.Path(key))
+			except OSError:
+				pass
 
-				root = sources.getroot()
+			self.Changed = True
 
-				xmetas = root.findall("log")
+	# Open The Log's Entry For Writing (Worker Side), None If It Isn't Cached Or Can't Be
+	@staticmethod
+	def Open(log):
+		if not log.CacheFile:
+			return None
 
-				for meta in xmetas:
-					metas.append(LogMeta(meta))
+		try:
+			return open(f"{log.CacheFile}.{os.getpid()}.tmp","wb")
+		except OSError as err:
+			DbgMsg(f"Result cache entry {log.CacheFile} not written : {err}")
 
-			except Exception as err:
-				ErrMsg(err,f"An error occurred attempting to open {filename}")
-		else:
-			Msg(f"{filename} does not exist")
+		return None
 
-		tracer.Exitting("LogMeta::LoadMetas")
+	# Keep What A Worker Wrote As The Log's Entry (Worker Side)
+	@staticmethod
+	def Keep(log,completed):
+		"""The Entry Is Written Beside Its Final Name, Only A Search That Ran To The End Is Renamed Into Place"""
 
-		return metas
+		temporary = f"{log.CacheFile}.{os.getpid()}.tmp"
+
+		try:
+			if completed and type(log.Output) is str and os.path.exists(log.Output):
+				shutil.copyfile(log.Output,temporary)
+
+			if completed and os.path.exists(temporary):
+				os.replace(temporary,log.CacheFile)
+			elif os.path.exists(temporary):
+				os.remove(temporary)
+		except OSError as err:
+			DbgMsg(f"Result cache entry {log.CacheFile} not kept : {err}")
 
 # Log Class
 class Log(TitleValueFormatter,Taggable,ItemID):
@@ -1498,9 +4253,29 @@ class Log(TitleValueFormatter,Taggable,ItemID):
 	History = None
 	# Output Ordering Flag
 	WasOutput = False
+	# Gzip Decompressor (auto, pigz, zcat or python), resolved when opened
+	Decompressor = "auto"
+	# Sidecar to record a gzip member index into while reading (see GzipIndex)
+	IndexFile = None
+	# Token index sidecar that may rule out parts of the log (see TokenIndex)
+	TokenIndexFile = None
+	# Result cache entry to keep the output in (see ResultCache), None to not cache
+	CacheFile = None
+	# Byte range (start, end) of the file to search when this log is a shard
+	Range = None
+	# Log this shard was split from
+	Parent = None
+	# Position of this shard within the parent
+	ShardIndex = 0
+	# Identity keys (real path, inode/size/mtime), see KeyedList
+	Identity = None
+	# Results streamed to the search manager (see ResultStream), instead of written to Output
+	Streamed = False
+	# When a local worker started on this log (perf_counter), for the cost model
+	Started = None
 
 	# Init Instance
-	def __init__(self,filename = None,logMeta = None,output=None):
+	def __init__(self,filename = None,logMeta = None,output=None,size=None,encodedDate=None):
 		# Log Meta this log belongs to
 		self.Meta = logMeta
 		# Name of log file
@@ -1508,9 +4283,10 @@ class Log(TitleValueFormatter,Taggable,ItemID):
 
 		self.History = []
 
+		# LogCatalog supplies date and size, saving a regex match and a stat per log
 		if filename:
-			self.EncodedDate = self.Meta.GetDate(filename)
-			self.Size = os.path.getsize(filename)
+			self.EncodedDate = encodedDate if encodedDate else self.Meta.GetDate(filename)
+			self.Size = size if size is not None else os.path.getsize(filename)
 		else:
 			self.EncodedDate = None
 			self.Size = 0
@@ -1536,6 +4312,10 @@ class Log(TitleValueFormatter,Taggable,ItemID):
 		self.Pfmt("Open Handle",self.OpenHandle)
 		self.Pfmt("Output",self.Output)
 		self.Pfmt("Was Out Yet",self.WasOutput)
+		self.Pfmt("Decompressor",self.Decompressor)
+		self.Pfmt("Range",self.Range)
+		self.Pfmt("Token Index",self.TokenIndexFile)
+		self.Pfmt("Shard",(f"{self.ShardIndex} of {self.Parent.Filename}" if self.Parent else None))
 		self.Pfmt("History Entries",len(self.History))
 
 		self.Pfmt("Meta","")
@@ -1550,26 +4330,39 @@ class Log(TitleValueFormatter,Taggable,ItemID):
 		for event in self.History:
 			self.Pfmt("\t",event)
 
+	# Get Identity Keys For A Filename
+	@staticmethod
+	def FileKeys(filename):
+		"""Real Path, Plus Inode/Size/Mtime So The Same File Under Two Mounts Matches"""
+
+		keys = [ os.path.realpath(filename) ]
+
+		try:
+			stat = os.stat(filename)
+
+			keys.append(( stat.st_ino, stat.st_size, stat.st_mtime ))
+		except OSError:
+			pass
+
+		return keys
+
+	# Get (Cached) Identity Keys
+	def Keys(self):
+		if self.Identity is None:
+			self.Identity = Log.FileKeys(self.Filename)
+
+		return self.Identity
+
 	# Add message to history tracker
 	def Track(self,msg):
-		tracer.Entering("Log::Track",False)
-
 		self.History.append(f"{datetime.now()} - {msg}")
 
-		tracer.Exitting("Log::Track")
-
 	# Return Last Track Msg
 	def LastTrack(self):
-		tracer.Entering("Log::Print",False)
-
-		tracer.Exitting("Log::Print (one statement in return)")
-
 		return self.History[-1]
 
 	# Track output file changes
 	def SetOutput(self,output):
-		tracer.Entering("Log::SetOutput",False)
-
 		if output is None:
 			self.Track("output set to None")
 		elif output is sys.stdout:
@@ -1583,23 +4376,107 @@ class Log(TitleValueFormatter,Taggable,ItemID):
 
 		self.Output = output
 
-		tracer.Exitting("Log::SetOutput",False)
-
 	# Convert Coded Date Into Date String
 	def EncodedDateStr(self):
 		return self.Meta.ConvertDateToString(self.EncodedDate)
 
+	# Create Shard Of This Log Covering [start, end) Of The File
+	def Shard(self,start,end,index):
+		"""Create A Shard (Copy Of This Log Limited To A Byte Range)"""
+
+		shard = copy.copy(self)
+
+		shard.History = []
+		shard.Range = ( start, end )
+		shard.Parent = self
+		shard.ShardIndex = index
+		shard.Output = None
+		shard.OpenHandle = None
+		shard.IndexFile = None
+
+		ItemID.RandomID(shard)
+
+		shard.Track(f"created as shard {index} ({start}-{end}) of {self.Filename}")
+
+		return shard
+
+	# Determine Which Gzip Decompressor To Use
+	def ChooseDecompressor(self):
+		"""Resolve Decompressor Preference Against What Is Available"""
+
+		decompressor = self.Decompressor
+
+		# Member ranges and index recording need the in process reader
+		if self.Range or self.IndexFile:
+			decompressor = "python"
+		elif decompressor == "auto":
+			decompressor = "python"
+
+			for candidate in [ "pigz", "zcat" ]:
+				if shutil.which(candidate):
+					decompressor = candidate
+					break
+		elif decompressor in DecompressorPipe.Commands and not shutil.which(decompressor):
+			decompressor = "python"
+
+		return decompressor
+
 	# Open Log File
 	def Open(self):
 		if ".gz" in self.Filename:
-			self.Track("opened as gzip stream")
-			self.OpenHandle = gzip.open(self.Filename,"rb")
+			self.Decompressor = self.ChooseDecompressor()
+
+			if self.Range:
+				self.Track(f"opened as gzip member range {self.Range[0]}-{self.Range[1]} via {self.Decompressor}")
+				self.OpenHandle = GzipMemberStream.Open(self.Filename,self.Range[0],self.Range[1])
+			elif self.Decompressor in DecompressorPipe.Commands:
+				self.Track(f"opened as gzip stream via {self.Decompressor}")
+				self.OpenHandle = DecompressorPipe(self.Decompressor,self.Filename)
+			elif self.IndexFile:
+				self.Track(f"opened as gzip stream via {self.Decompressor}, recording member index")
+				self.OpenHandle = GzipMemberStream.Open(self.Filename)
+			else:
+				self.Track(f"opened as gzip stream via {self.Decompressor}")
+				self.OpenHandle = gzip.open(self.Filename,"rb")
+		elif self.Range:
+			self.Track(f"opened as regular file range {self.Range[0]}-{self.Range[1]}")
+			self.OpenHandle = RangeReader.Open(self.Filename,self.Range[0],self.Range[1])
 		else:
 			self.Track("opened as regular file stream")
 			self.OpenHandle = open(self.Filename,"rb")
 
 		return self.OpenHandle
 
+	# Split Plain Log Into Byte Ranges That Start And End On Line Boundaries
+	def LineRanges(self,count):
+		"""Return Up To count Newline Aligned [start, end) Ranges Covering The File"""
+
+		cuts = [ 0 ]
+
+		with open(self.Filename,"rb") as f_in:
+			# UTF-16 lines can't be cut on a single newline byte
+			if self.NeedsDecoding(f_in):
+				return [ ( 0, self.Size ) ]
+
+			for part in range(1,count):
+				point = self.Size * part // count
+
+				if point <= cuts[-1]:
+					continue
+
+				# Move the cut just past the next newline
+				f_in.seek(point - 1)
+				f_in.readline()
+
+				position = f_in.tell()
+
+				if position > cuts[-1] and position < self.Size:
+					cuts.append(position)
+
+		cuts.append(self.Size)
+
+		return list(zip(cuts[:-1],cuts[1:]))
+
 	# Clean Up - Assume File Already Closed
 	def Cleanup(self):
 		self.OpenHandle = None
@@ -1611,6 +4488,16 @@ class Log(TitleValueFormatter,Taggable,ItemID):
 			self.OpenHandle.close()
 			self.Cleanup()
 
+	# Check Stream For Encodings That Raw Byte Matching Can Not Handle
+	def NeedsDecoding(self,f_in):
+		"""True If Stream Starts With A UTF-16 Byte Order Mark"""
+
+		peek = getattr(f_in,"peek",None)
+
+		head = peek(2)[:2] if peek else b""
+
+		return head in [ b"\xff\xfe", b"\xfe\xff" ]
+
 	# Decode Raw Line
 	def Decode(self,rawline):
 		decoded = False
@@ -1628,18 +4515,485 @@ class Log(TitleValueFormatter,Taggable,ItemID):
 
 		return decoded, used, line
 
+# Keyed List : List Of Logs With A Dict Index For O(1) Membership
+class KeyedList(list):
+	"""List Of Logs (Or Items Holding A Log), Indexed By Real Path And File Identity"""
+
+	# Init Instance
+	def __init__(self,items=None,logof=None):
+		list.__init__(self)
+
+		# Function to get the Log from an item (RemoteAssignment.Log for instance)
+		self.LogOf = logof if logof else (lambda item: item)
+		# { key : [ items ] } (more than one item only if a file was added twice)
+		self.Index = dict()
+
+		if items:
+			self.extend(items)
+
+	# Get Keys For An Item Or Filename
+	def KeysOf(self,item):
+		if type(item) is str:
+			return Log.FileKeys(item)
+
+		return self.LogOf(item).Keys()
+
+	# Add Item To Index
+	def IndexItem(self,item):
+		for key in self.KeysOf(item):
+			self.Index.setdefault(key,[]).append(item)
+
+	# Remove Item From Index
+	def UnindexItem(self,item):
+		for key in self.KeysOf(item):
+			items = self.Index.get(key,[])
+
+			if item in items:
+				items.remove(item)
+
+			if len(items) == 0:
+				self.Index.pop(key,None)
+
+	# Find Item By Log, Filename Or Item
+	def Find(self,item):
+		for key in self.KeysOf(item):
+			found = self.Index.get(key)
+
+			if found:
+				return found[0]
+
+		return None
+
+	# Membership By File Identity
+	def __contains__(self,item):
+		return self.Find(item) is not None
+
+	# Append Item
+	def append(self,item):
+		list.append(self,item)
+		self.IndexItem(item)
+
+	# Extend With Items
+	def extend(self,items):
+		for item in items:
+			self.append(item)
+
+	# Insert Item
+	def insert(self,index,item):
+		list.insert(self,index,item)
+		self.IndexItem(item)
+
+	# Remove Item
+	def remove(self,item):
+		list.remove(self,item)
+		self.UnindexItem(item)
+
+	# Pop Item
+	def pop(self,index=-1):
+		item = list.pop(self,index)
+		self.UnindexItem(item)
+
+		return item
+
+	# Clear List And Index
+	def clear(self):
+		list.clear(self)
+		self.Index.clear()
+
+# Line Timestamp : Sort Key From The Leading Timestamp Of A Result Line
+class LineTimestamp:
+	"""Callable Key, Leading Timestamp Of A Raw Line As A datetime, Lines Without One Sort With The Line Before Them"""
+
+	# Leading timestamp, syslog (Mmm dd hh:mm:ss) or ISO 8601 style, also as the first field of a JSON Lines record
+	Expression = re.compile(rb"^\s*(?:\{\"\w+\":\")?(?:([A-Z][a-z]{2})\s+(\d{1,2})\s+|(\d{4})-(\d{2})-(\d{2})[T ])(\d{2}):(\d{2}):(\d{2})")
+	# Syslog month abbreviations
+	Months = { name.encode() : index + 1 for index, name in enumerate([ "Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec" ]) }
+	# Converted tokens kept (a token repeats for every line in the same second)
+	CacheSize = 65536
+
+	# Init Instance
+	def __init__(self,logdate=None):
+		# Syslog timestamps have no year, the log's date supplies it
+		self.LogDate = logdate
+		self.Converter = TimestampConverter()
+		self.Cache = dict()
+		self.Last = datetime.min
+
+	# Get Key For Line
+	def __call__(self,line):
+		match = self.Expression.match(line)
+
+		if match is None:
+			return self.Last
+
+		token = match.group(0)
+
+		stamp = self.Cache.get(token,None)
+
+		if stamp is None:
+			if len(self.Cache) >= self.CacheSize:
+				self.Cache.clear()
+
+			stamp = self.Convert(match)
+			self.Cache[token] = stamp
+
+		self.Last = stamp
+
+		return stamp
+
+	# Convert Timestamp Match
+	def Convert(self,match):
+		month, day, year, isomonth, isoday, hour, minute, second = match.groups()
+
+		try:
+			if year:
+				return datetime(int(year),int(isomonth),int(isoday),int(hour),int(minute),int(second))
+
+			logdate = self.LogDate or date.today()
+
+			stamp = datetime(logdate.year,self.Months[month],int(day),int(hour),int(minute),int(second))
+
+			# A January log can start with December's lines
+			if stamp.date() > logdate + timedelta(days=1):
+				stamp = stamp.replace(year=logdate.year - 1)
+
+			return stamp
+		except (KeyError, ValueError):
+			pass
+
+		# Not a month name (or a bad date), let TimestampConverter have a go
+		try:
+			stamp = self.Converter.ConvertTimestamp(" ".join(match.group(0).decode("ascii","replace").split()))
+
+			if isinstance(stamp,datetime):
+				return stamp.replace(tzinfo=None)
+		except Exception:
+			pass
+
+		return self.Last
+
+# Output Order : Releases Completed Logs In (EncodedDate, Filename) Order
+class OutputOrder(TitleValueFormatter,Taggable):
+	"""Heap Of Log Keys, A Completed Log Is Released Once Every Log Before It Is Released (Or Withdrawn)"""
+
+	# Keys not yet released, a heap
+	Heap = None
+	# { key : log } of logs in the order
+	Logs = None
+	# { key : log } of completed logs (None for withdrawn ones) waiting for release
+	Completed = None
+	# { date : logs of that date not yet released }
+	Days = None
+	# { date : completed (or withdrawn) logs of that date not yet released }
+	DaysDone = None
+	# Descending order
+	Reverse = False
+	# Logs released so far
+	Released = 0
+	# Completed logs (not withdrawn ones) waiting for release
+	Ready = 0
+
+	# Init Instance
+	def __init__(self,logs=None,reverse=False):
+		self.Heap = []
+		self.Logs = dict()
+		self.Completed = dict()
+		self.Days = dict()
+		self.DaysDone = dict()
+		self.Reverse = reverse
+		self.Released = 0
+		self.Ready = 0
+
+		if logs:
+			for log in logs:
+				self.Add(log)
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Pending",len(self.Heap))
+		self.Pfmt("Completed",len(self.Completed))
+		self.Pfmt("Ready",self.Ready)
+		self.Pfmt("Released",self.Released)
+		self.Pfmt("Reverse",self.Reverse)
+		self.Pfmt("Tag",self.Tag)
+
+	# Ordering Key, Logs Are Matched By Key So Remote Copies Of A Log Complete It Too
+	def Key(self,log):
+		logdate = log.EncodedDate or date.min
+
+		if self.Reverse:
+			# Negated ordinals, plus a sentinel so a name sorts after its longer extensions
+			return ( -logdate.toordinal(), tuple([ -ord(char) for char in log.Filename ]) + (1,) )
+
+		return ( logdate.toordinal(), log.Filename )
+
+	# Add Log To The Order
+	def Add(self,log):
+		key = self.Key(log)
+
+		if not key in self.Logs:
+			self.Logs[key] = log
+			self.Days[key[0]] = self.Days.get(key[0],0) + 1
+			heapq.heappush(self.Heap,key)
+
+	# Log Completed
+	def Complete(self,log):
+		key = self.Key(log)
+
+		if key in self.Logs:
+			self.Finish(key,log)
+
+		return key in self.Logs
+
+	# Log Won't Produce Output, Don't Hold Up Later Logs For It
+	def Withdraw(self,log):
+		key = self.Key(log)
+
+		if key in self.Logs:
+			self.Finish(key,None)
+
+	# Record Completion Of Key
+	def Finish(self,key,log):
+		if not key in self.Completed:
+			self.DaysDone[key[0]] = self.DaysDone.get(key[0],0) + 1
+
+		if log is not None and self.Completed.get(key,None) is None:
+			self.Ready += 1
+
+		self.Completed[key] = log
+
+	# Release Top Key
+	def Pop(self):
+		key = heapq.heappop(self.Heap)
+
+		self.Days[key[0]] -= 1
+		self.DaysDone[key[0]] -= 1
+
+		if self.Days[key[0]] == 0:
+			del self.Days[key[0]]
+			del self.DaysDone[key[0]]
+
+		del self.Logs[key]
+
+		self.Released += 1
+
+		log = self.Completed.pop(key)
+
+		if log is not None:
+			self.Ready -= 1
+
+		return log
+
+	# Log At The Top Of The Order (Completed Or Not)
+	def Top(self):
+		# Withdrawn logs hold nothing up
+		while len(self.Heap) > 0 and self.Heap[0] in self.Completed and self.Completed[self.Heap[0]] is None:
+			self.Pop()
+
+		return self.Logs[self.Heap[0]] if len(self.Heap) > 0 else None
+
+	# Next Completed Log In Order, None When The Top Hasn't Completed
+	def Next(self):
+		while len(self.Heap) > 0 and self.Heap[0] in self.Completed:
+			log = self.Pop()
+
+			if log is not None:
+				return log
+
+		return None
+
+	# All Logs Of The Top Date, Once Every One Of Them Has Completed
+	def NextDay(self):
+		logs = []
+
+		while len(self.Heap) > 0 and len(logs) == 0:
+			day = self.Heap[0][0]
+
+			if self.DaysDone.get(day,0) < self.Days[day]:
+				break
+
+			while len(self.Heap) > 0 and self.Heap[0][0] == day:
+				log = self.Pop()
+
+				if log is not None:
+					logs.append(log)
+
+		return logs
+
+	# Completed Logs Waiting For Release
+	def Waiting(self):
+		return self.Ready
+
+	# Logs Not Yet Released
+	def __len__(self):
+		return len(self.Heap)
+
+	# Logs Not Yet Released, In Order
+	def __iter__(self):
+		return iter([ self.Logs[key] for key in sorted(self.Heap) ])
+
+	# Clear The Order
+	def clear(self):
+		self.Heap.clear()
+		self.Logs.clear()
+		self.Completed.clear()
+		self.Days.clear()
+		self.DaysDone.clear()
+		self.Released = 0
+		self.Ready = 0
+
+# Result Merge : Timestamp Ordered k-way Merge Of The Results Of Many Logs
+class ResultMerge(TitleValueFormatter,Taggable):
+	"""Results Of Completed Logs Are Merged By Leading Timestamp, Up To A Watermark Set By Logs Still Running"""
+
+	# Logs may hold lines this far before their date (logs straddle midnight)
+	Straddle = timedelta(days=1)
+
+	# Heap of (timestamp, log key, line number, line)
+	Heap = None
+	# { log key : ( log, iterator of (timestamp, line) ) } of logs being merged
+	Streams = None
+	# { log key : log } of logs expected, but not yet added
+	Expected = None
+	# Heap of expected dates (ordinals), entries of added logs are dropped lazily
+	ExpectedDates = None
+	# Logs whose results have all been merged, for the manager to clean up
+	Exhausted = None
+	# Lines merged so far
+	Merged = 0
+
+	# Init Instance
+	def __init__(self,logs=None):
+		self.Heap = []
+		self.Streams = dict()
+		self.Expected = dict()
+		self.ExpectedDates = []
+		self.Exhausted = []
+		self.Merged = 0
+
+		if logs:
+			for log in logs:
+				self.Expect(log)
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Streams",len(self.Streams))
+		self.Pfmt("Expected",len(self.Expected))
+		self.Pfmt("Heap",len(self.Heap))
+		self.Pfmt("Merged",self.Merged,postfix="lines")
+		self.Pfmt("Watermark",self.Watermark())
+		self.Pfmt("Tag",self.Tag)
+
+	# Log Key, Logs Are Matched By Key So Remote Copies Of A Log Complete It Too
+	def Key(self,log):
+		return ( (log.EncodedDate or date.min).toordinal(), log.Filename )
+
+	# Expect Results From Log
+	def Expect(self,log):
+		key = self.Key(log)
+
+		if not key in self.Expected:
+			self.Expected[key] = log
+			heapq.heappush(self.ExpectedDates,key)
+
+	# Log Won't Produce Results
+	def Withdraw(self,log):
+		self.Expected.pop(self.Key(log),None)
+
+	# Earliest Timestamp A Log Still Expected Could Hold, None When Nothing Is Expected
+	def Watermark(self):
+		while len(self.ExpectedDates) > 0 and not self.ExpectedDates[0] in self.Expected:
+			heapq.heappop(self.ExpectedDates)
+
+		if len(self.ExpectedDates) == 0:
+			return None
+
+		ordinal = self.ExpectedDates[0][0]
+
+		if ordinal <= date.min.toordinal() + self.Straddle.days:
+			return datetime.min
+
+		return datetime.combine(date.fromordinal(ordinal),time.min) - self.Straddle
+
+	# Add The Results Of A Completed Log, lines Yields (timestamp, line)
+	def Add(self,log,lines):
+		key = self.Key(log)
+
+		self.Expected.pop(key,None)
+
+		self.Streams[key] = ( log, iter(lines) )
+
+		self.Advance(key,0)
+
+	# Push The Next Line Of A Stream, Or Retire The Stream
+	def Advance(self,key,number):
+		log, stream = self.Streams[key]
+
+		item = next(stream,None)
+
+		if item is None:
+			del self.Streams[key]
+			self.Exhausted.append(log)
+		else:
+			heapq.heappush(self.Heap,( item[0], key, number, item[1] ))
+
+	# Merged Lines Below The Watermark
+	def Lines(self):
+		while len(self.Heap) > 0:
+			watermark = self.Watermark()
+
+			if watermark is not None and not self.Heap[0][0] < watermark:
+				break
+
+			stamp, key, number, line = heapq.heappop(self.Heap)
+
+			self.Merged += 1
+
+			yield line
+
+			self.Advance(key,number + 1)
+
+	# Anything Left To Merge Or Wait For
+	def Active(self):
+		return len(self.Heap) > 0 or len(self.Expected) > 0
+
 # Tokenized Message Packet (Verb\nData....
 class MsgPacket:
 	Verb = None
 	Data = None
 	Encoding = "utf-8"
 	Succeeded = False
+	# Protocol to send with (received packets record the protocol they came in)
+	Protocol = 1
+	# Flags of the last frame sent or received
+	Flags = 0
+
+	# v2 header : magic, version, v1 guard (0xFF, a v1 length can't reach 4 GiB), verb id, flags, payload length
+	Header = struct.Struct("<2sBBBBI")
+	Magic = b"PS"
+	Guard = 0xFF
+	# Newest protocol spoken
+	LatestProtocol = 2
+	# v2 verb ids, id 0 carries the verb in the payload (as v1 does)
+	Verbs = [ "", "ACK", "NACK", "FIN", "retry", "noreply", "hello", "assignments", "patterns", "namedqueries", "rejected", "completed", "file", "inform", "ping", "term", "EOF", "close", "assignbatch", "aggregate" ]
+	VerbIDs = { verb : index for index, verb in enumerate(Verbs) if verb }
+	# v2 flags
+	COMPRESSED = 0x01
+	# v2 payloads larger than this are compressed (when it helps), 0 disables
+	CompressAbove = 4096
+	# Largest payload accepted from a peer
+	MaxPayload = 1 << 30
+	# Seconds a non blocking socket is waited on, part way through a frame
+	RecvWait = 30
 
 	# Init Instance
-	def __init__(self,verb=None,data=None,encoding=None):
+	def __init__(self,verb=None,data=None,encoding=None,protocol=None):
 		if encoding:
 			self.Encoding = encoding
 
+		if protocol:
+			self.Protocol = protocol
+
 		self.SetPacket(verb,data)
 
 	# Fill Packet
@@ -1647,89 +5001,197 @@ class MsgPacket:
 		if encoding:
 			self.Encoding = encoding
 
-		if verb:
-			self.Verb = verb
+		if verb:
+			self.Verb = verb
+
+		if data:
+			if type(data) is list:
+				self.Data = "\n".join(data)
+			else:
+				self.Data = data
+
+	# Encode Packet As A Frame, Returns ( header, payload ), Both Empty If No Packet
+	def Encode(self,protocol=None):
+		protocol = protocol or self.Protocol
+
+		verbID = self.VerbIDs.get(self.Verb,0) if protocol >= 2 else 0
+
+		encoded_pkt = ""
+
+		if verbID > 0:
+			encoded_pkt = (self.Data if self.Data else "")
+		elif self.Verb and not self.Data:
+			encoded_pkt = self.Verb
+		elif self.Data and self.Verb:
+			encoded_pkt += f"{self.Verb}\n{self.Data}"
+		elif self.Data and not self.Verb:
+			encoded_pkt = self.Data
+
+		# Length is in bytes, not characters
+		payload = bytes(encoded_pkt,self.Encoding)
+
+		if protocol < 2:
+			if len(payload) == 0:
+				return b"", b""
+
+			return len(payload).to_bytes(4,'little',signed=False), payload
+
+		self.Flags = 0
+
+		if self.CompressAbove > 0 and len(payload) > self.CompressAbove:
+			compressed = zlib.compress(payload,1)
+
+			if len(compressed) < len(payload):
+				payload = compressed
+				self.Flags |= self.COMPRESSED
+
+		return self.Header.pack(self.Magic,protocol,self.Guard,verbID,self.Flags,len(payload)), payload
+
+	# Encode Packet As One Frame (bytes), Empty If No Packet
+	def Frame(self,protocol=None):
+		header, payload = self.Encode(protocol)
+
+		return header + payload
+
+	# Size Of The Frame At The Start Of buffer, Returns (header size, payload size) Or None If Incomplete
+	@classmethod
+	def FrameSize(cls,buffer):
+		if len(buffer) < 4:
+			return None
+
+		if buffer[0:2] == cls.Magic and buffer[3] == cls.Guard:
+			if len(buffer) < cls.Header.size:
+				return None
+
+			return cls.Header.size, cls.Header.unpack_from(buffer)[5]
+
+		return 4, int.from_bytes(buffer[0:4],'little',signed=False)
+
+	# Fill Packet From A Received Frame (header, then payload)
+	def Unpack(self,payload,header=None):
+		verbID = 0
+
+		self.Protocol = 1
+		self.Flags = 0
+		self.Data = None
+
+		if header is not None and len(header) == self.Header.size:
+			magic, self.Protocol, guard, verbID, self.Flags, size = self.Header.unpack(header)
+
+			if self.Flags & self.COMPRESSED:
+				payload = zlib.decompress(payload)
+
+		if verbID > 0:
+			decoded = payload.decode(self.Encoding)
+
+			self.Verb = self.Verbs[verbID] if verbID < len(self.Verbs) else "none"
+
+			if len(decoded) > 0:
+				self.Data = decoded.split("\n")
+		else:
+			decoded_pkt = payload.decode(self.Encoding).split("\n")
 
-		if data:
-			if type(data) is list:
-				self.Data = "\n".join(data)
-			else:
-				self.Data = data
+			self.Verb = decoded_pkt[0]
+
+			if len(decoded_pkt) > 1:
+				self.Data = decoded_pkt[1:]
+
+		self.Succeeded = True
 
 	# Send Message Packet
+	@Traced("MsgPacket::SendMsg")
 	def SendMsg(self,socket,verb=None,data=None,encoding=None):
-		tracer.Entering("MsgPacket::SendMsg")
-
 		self.SetPacket(verb,data,encoding=encoding)
 
 		self.Succeeded = False
 
-		encoded_pkt = ""
+		header, payload = self.Encode()
 
-		if self.Verb and not self.Data:
-			encoded_pkt = self.Verb
-		elif self.Data and self.Verb:
-			encoded_pkt += f"{self.Verb}\n{self.Data}"
-		elif self.Data and not self.Verb:
-			encoded_pkt = self.Data
+		if len(header) > 0:
+			try:
+				if tracer.Enabled:
+					tracer.Inside("MsgPacket::SendMsg",postfix=f"Msg {self.Verb} {self.Data}")
 
-		sze = len(encoded_pkt)
+				# Header and payload go out together without being joined first
+				sent = socket.sendmsg([ header, payload ])
 
-		if sze > 0:
-			try:
-				tracer.Inside("MsgPacket::SendMsg",postfix=f"Msg {self.Verb} {self.Data}")
-				socket.send(sze.to_bytes(4,'little',signed=False))
+				if sent < len(header) + len(payload):
+					socket.sendall((header + payload)[sent:])
 
-				socket.send(bytes(encoded_pkt,self.Encoding))
 				self.Succeeded = True
 			except Exception as err:
 				print(f"An error occurred sending packet : {err}")
 
-		tracer.Exitting("MsgPacket::SendMsg")
-
 		return self.Succeeded
 
+	# Fill view Completely From socket
+	def RecvInto(self,socket,view):
+		received = 0
+
+		while received < len(view):
+			try:
+				count = socket.recv_into(view[received:])
+			except ( BlockingIOError, InterruptedError ):
+				# Non blocking socket, wait for the rest rather than poll
+				readable, writable, exceptional = select.select([ socket ],[],[],self.RecvWait)
+
+				if len(readable) == 0:
+					raise TimeoutError(f"no data for {self.RecvWait}s part way through a packet")
+
+				continue
+
+			if count == 0:
+				raise ConnectionError("connection closed part way through a packet")
+
+			received += count
+
 	# Receive A Msg Packet
+	@Traced("MsgPacket::RecvMsg")
 	def RecvMsg(self,socket):
-		tracer.Entering("MsgPacket::RecvMsg")
-
-		verb = "none"
-		data = []
 		self.Succeeded = False
 
-		count = 0
-		try_again = True
+		try:
+			# v1 frames start with a 4 byte length, v2 frames with a longer header
+			header = bytearray(self.Header.size)
+			view = memoryview(header)
 
-		while try_again and count < 4:
-			try_again = False
+			# A v2 peer only sends v2 frames, so the whole header is taken in one read, otherwise the length comes first
+			received = self.Header.size if self.Protocol >= 2 else 4
 
-			try:
-				sze = socket.recv(4)
+			self.RecvInto(socket,view[:received])
 
-				packetSize = int.from_bytes(sze,'little',signed=False)
+			headerSize = 4
 
-				raw_pkt = socket.recv(packetSize)
+			if header[0:2] == self.Magic and header[3] == self.Guard:
+				headerSize = self.Header.size
 
-				decoded_pkt = raw_pkt.decode(self.Encoding).split("\n")
+				if received < headerSize:
+					self.RecvInto(socket,view[received:])
 
-				self.Verb = decoded_pkt[0]
+			headerSize, payloadSize = self.FrameSize(header[:headerSize])
 
-				if len(decoded_pkt) > 1:
-					self.Data = decoded_pkt[1:]
+			if payloadSize > self.MaxPayload:
+				raise ValueError(f"packet of {payloadSize} bytes is too large")
 
-				tracer.Inside("MsgPacket::RecvMsg",postfix=f"Msg {self.Verb} {self.Data}")
+			# What was read past a v1 length is the start of the payload, it can't hold part of the next frame
+			early = max(0,received - headerSize)
 
-				self.Succeeded = True
+			if early > payloadSize:
+				raise ValueError(f"v1 frame of {payloadSize} bytes is shorter than the v2 header expected")
 
-			except BlockingIOError:
-				try_again = True
-				count += 1
-				tm.sleep(0.25)
-			except Exception as err:
-				print(f"An error occurred receiving packet : {err}")
+			# Preallocated to the frame's size, received in place
+			payload = bytearray(payloadSize)
+			payload[:early] = header[headerSize:received]
+
+			self.RecvInto(socket,memoryview(payload)[early:])
+
+			self.Unpack(bytes(payload),(bytes(header) if headerSize > 4 else None))
 
+			if tracer.Enabled:
+				tracer.Inside("MsgPacket::RecvMsg",postfix=f"Msg {self.Verb} {self.Data}")
 
-		tracer.Exitting("MsgPacket::RecvMsg")
+		except Exception as err:
+			print(f"An error occurred receiving packet : {err}")
 
 		return self.Succeeded
 
@@ -1741,6 +5203,8 @@ class NetworkingBase(TitleValueFormatter,Taggable,ItemID):
 	SocketFamily = None
 	SocketType = None
 	Encoding = "utf-8"
+	# Wire protocol spoken to the peer (raised once the peer shows it speaks a newer one)
+	Protocol = 1
 
 	Debug = False		# Internal Debug Flag
 
@@ -1752,8 +5216,10 @@ class NetworkingBase(TitleValueFormatter,Taggable,ItemID):
 
 	HELLO = "hello"		# Hello (ask for assignments) Verb
 	ASSIGN = "assignments"	# Assignment Verb
+	ASSIGNBATCH = "assignbatch"	# Many Assignments (plus patterns/queries) In One Packet, One ACK
 	PATTERN = "patterns"	# Pattern Exchange
 	NAMEDQUERY ="namedqueries"	# Named Query Exchange
+	AGGREGATE = "aggregate"	# Aggregation Spec (see Aggregate), Sent With The Patterns
 	REJECTED = "rejected"	# Rejected verb
 	COMPLETED = "completed"	# Completed Verb (assignment completed)
 
@@ -1773,6 +5239,7 @@ class NetworkingBase(TitleValueFormatter,Taggable,ItemID):
 		self.SocketFamily = socket.AF_INET
 		self.SocketType = socket.SOCK_STREAM
 		self.Encoding = "utf-8"
+		self.Protocol = 1
 
 		ItemID.RandomID(self)
 
@@ -1785,12 +5252,27 @@ class NetworkingBase(TitleValueFormatter,Taggable,ItemID):
 		self.Pfmt("Socket Family",self.SocketFamily)
 		self.Pfmt("Socket Type",self.SocketType)
 		self.Pfmt("Encoding",self.Encoding)
+		self.Pfmt("Protocol",self.Protocol)
 
 		self.Pfmt("Tag",self.Tag)
 
 	# Create New Socket
 	def NewSocket(self):
 		self.Socket = socket.socket(self.SocketFamily,self.SocketType)
+		self.Protocol = 1
+
+	# New Packet In The Negotiated Protocol
+	def Packet(self,verb=None,data=None):
+		return MsgPacket(verb,data,encoding=self.Encoding,protocol=self.Protocol)
+
+	# Receive A Packet, Switching Up To The Peer's Protocol When It Sends A Newer One
+	def RecvPacket(self,sock):
+		msgpkt = self.Packet()
+
+		if msgpkt.RecvMsg(sock) and self.Protocol < msgpkt.Protocol <= MsgPacket.LatestProtocol:
+			self.Protocol = msgpkt.Protocol
+
+		return msgpkt
 
 	# Convert Bytes To String
 	def ToString(self,data):
@@ -1833,20 +5315,19 @@ class NetworkingBase(TitleValueFormatter,Taggable,ItemID):
 		return sock.gettimeout()
 
 	# Set Blocking Behavior on Socket
+	@Traced("NetworkingBase::SetBlocking")
 	def SetBlocking(self,blocking,sock=None):
-		tracer.Entering("NetworkingBase::SetBlocking",postfix=f"{blocking}")
+		if tracer.Enabled:
+			tracer.Inside("NetworkingBase::SetBlocking",postfix=f"{blocking}")
 
 		if sock is None:
 			sock = self.Socket
 
 		sock.setblocking(blocking)
 
-		tracer.Exitting("NetworkingBase::SetBlocking")
-
 	# Get Current Blockign Mode On Socket
+	@Traced("NetworkingBase::GetBlocking")
 	def GetBlocking(self,sock=None):
-		tracer.Entering("NetworkingBase::GetBlocking")
-
 		flag = False
 
 		if sock is None:
@@ -1854,8 +5335,6 @@ class NetworkingBase(TitleValueFormatter,Taggable,ItemID):
 
 		flag = sock.gettimeout() == 0
 
-		tracer.Exitting("NetworkingBase::GetBlocking")
-
 		return flag
 
 	# Bind To Server Port (for listening Servers)
@@ -1874,135 +5353,173 @@ class NetworkingBase(TitleValueFormatter,Taggable,ItemID):
 		self.Socket.listen(backlog)
 
 	# Send Using Current Connection
+	@Traced("NetworkingBase::Send")
 	def Send(self,msgpkt,connection=None):
-		tracer.Entering("NetworkingBase::Send")
-
 		if connection is None:
 			DbgMsg("Networking::Send connection supplied was None")
 			connection = self.Socket
 
 		succeeded = msgpkt.SendMsg(connection)
 
-		tracer.Exitting("NetworkingBase::Send")
-
 		return succeeded
 
 	# Receive Data
+	@Traced("NetworkingBase::Receive")
 	def Receive(self,connection=None):
-		tracer.Entering("NetworkingBase::Receive")
-
 		if connection is None:
 			connection = self.Socket
 
-		msgpkt = MsgPacket()
-
-		succeeded = msgpkt.RecvMsg(connection)
+		msgpkt = self.RecvPacket(connection)
 
 		return msgpkt
 
-	# Send File
-	def SendFile(self,filename,connection=None):
-		tracer.Entering("NetworkingBase::SendFile")
+	# Send File, From offset Onward, As A FILE Packet, The Bytes, Then An EOF Packet With The Whole File's Checksum
+	@Traced("NetworkingBase::SendFile")
+	def SendFile(self,filename,connection=None,offset=0,name=None,compress=False):
+		"""Raw Bytes Go Out With sendfile (Zero Copy), Compressed Ones In Length Prefixed zlib Chunks Ended By An Empty One"""
+
+		if tracer.Enabled:
+			tracer.Inside("NetworkingBase::SendFile",postfix=f"{filename} from {offset}")
 
 		if not connection:
 			connection = self.Socket
 
 		completed = False
 
-		fsize = os.path.getsize(filename)
+		try:
+			fsize = os.path.getsize(filename)
+			offset = min(offset,fsize)
+
+			compression = FileTransfer.ZLIB if compress else FileTransfer.NOCOMPRESSION
 
-		self.PackMsg(self.FILE,str(fsize),sock=connection)
+			self.Packet(self.FILE,[ (name if name else filename), str(fsize), compression ]).SendMsg(connection)
 
-		verb, data = self.WaitReply(sock=connection,unpack=True)
+			checksum = 0
 
-		if verb == self.ACK:
 			with open(filename,"rb") as f_in:
-				buff = f_in.read(4096)
+				if compress:
+					compressor = zlib.compressobj(1)
+
+					position = 0
+
+					while True:
+						chunk = f_in.read(FileTransfer.ChunkSize)
+
+						if len(chunk) == 0:
+							break
+
+						checksum = zlib.crc32(chunk,checksum)
+
+						# Bytes the receiver already has only count toward the checksum
+						if position + len(chunk) > offset:
+							data = compressor.compress(chunk[max(0,offset - position):]) + compressor.flush(zlib.Z_SYNC_FLUSH)
+							connection.sendall(len(data).to_bytes(4,'little',signed=False) + data)
+
+						position += len(chunk)
+
+					data = compressor.flush()
+
+					if len(data) > 0:
+						connection.sendall(len(data).to_bytes(4,'little',signed=False) + data)
 
-				self.Send(buffer)
+					connection.sendall(bytes(4))
+				else:
+					if fsize > offset:
+						connection.sendfile(f_in,offset,fsize - offset)
+
+					f_in.seek(0)
+
+					while True:
+						chunk = f_in.read(FileTransfer.ChunkSize)
+
+						if len(chunk) == 0:
+							break
+
+						checksum = zlib.crc32(chunk,checksum)
 
-		verb, data = self.WaitReply(sock=connection,unpack=True)
+			self.Packet(self.EOF,str(checksum)).SendMsg(connection)
 
-		if verb == self.ACK:
-			completed = True
+			msgpkt = self.WaitReply(sock=connection)
 
-		tracer.Exitting("NetworkingBase::SendFile")
+			completed = msgpkt.Verb == self.ACK
+		except OSError as err:
+			DbgMsg(f"Sending {filename} failed : {err}")
 
 		return completed
 
-	# Receive File
-	def ReceiveFile(self,filename,connection=None):
-		tracer.Entering("NetworkingBase::ReceiveFile",postfix=f"{filename}")
+	# Receive File Sent With SendFile (Blocking), offset Resumes A Previous Attempt Kept In filename + ".part"
+	@Traced("NetworkingBase::ReceiveFile")
+	def ReceiveFile(self,filename,connection=None,offset=0):
+		if tracer.Enabled:
+			tracer.Inside("NetworkingBase::ReceiveFile",postfix=f"{filename}")
 
 		if not connection:
 			connection = self.Socket
 
 		completed = False
 
-		verb, data = self.UnpackMsg(sock=connection)
+		msgpkt = self.WaitReply(sock=connection)
 
-		if verb == self.FILE:
-			size = int(data)
+		if msgpkt.Verb == self.FILE:
+			transfer = FileTransfer(msgpkt.Data[0],filename)
+			transfer.Received = offset
 
-			self.PackMsg(self.ACK,"",sock=connection)
+			if offset > 0 and os.path.exists(transfer.Partial):
+				with open(transfer.Partial,"rb") as f_in:
+					while f_in.tell() < offset:
+						chunk = f_in.read(min(FileTransfer.ChunkSize,offset - f_in.tell()))
 
-			tally = 0
+						if len(chunk) == 0:
+							break
 
-			with open(filename,"wb") as f_out:
-				while tally < size:
-					buffer = self.Receive(connection=connection,buffsize=4096,decode=False)
+						transfer.Checksum = zlib.crc32(chunk,transfer.Checksum)
 
-					tally += len(buffer)
+			transfer.Start(int(msgpkt.Data[1]),msgpkt.Data[2])
 
-					if len(buffer) == 0:
-						tally = size
+			while transfer.Streaming and transfer.Receive(connection):
+				pass
 
-				self.PackMsg(self.ACK,"",sock=connection)
+			msgpkt = self.WaitReply(sock=connection)
 
+			if msgpkt.Verb == self.EOF and transfer.Finish(int(msgpkt.Data[0])):
+				self.SendACK(sock=connection)
 				completed = True
-
-		tracer.Exitting("NetworkingBase::ReceiveFile")
+			else:
+				transfer.Pause()
+				self.SendNACK(sock=connection)
 
 		return completed
 
 	# Wait For Reply From Server
+	@Traced("NetworkingBase::WaitReply")
 	def WaitReply(self,sock=None):
-		tracer.Entering("NetworkingBase::WaitReply")
-
 		if sock is None:
 			sock = self.Socket
 
-		msgpkt = MsgPacket()
-
-		succeeded = msgpkt.RecvMsg(sock)
-
-		tracer.Exitting("NetworkingBase:WaitReply")
+		msgpkt = self.RecvPacket(sock)
 
 		return msgpkt
 
 	# HELLO Helper
+	@Traced("NetworkingBase::SendHELLO")
 	def SendHELLO(self,maxthreads,metacount=0,sendPatterns=0,sock=None):
-		tracer.Entering("NetworkingBase::SendHELLO")
-
 		if sock is None:
 			sock = self.Socket
 
-		msgpkt = MsgPacket(self.HELLO,[ str(os.getpid()), str(maxthreads), str(metacount), str(sendPatterns) ])
+		# The trailing field advertises the newest wire protocol spoken, older servers ignore it
+		msgpkt = self.Packet(self.HELLO,[ str(os.getpid()), str(maxthreads), str(metacount), str(sendPatterns), str(MsgPacket.LatestProtocol) ])
 
 		succeeded = msgpkt.SendMsg(sock)
 
-		tracer.Exitting("NetworkingBase::SendHELLO")
-
 		return succeeded
 
 	# ACK Helper Function
+	@Traced("NetworkingBase::SendACK")
 	def SendACK(self,sock=None,data=None):
-		tracer.Entering("NetworkingBase::SendACK")
-
 		if sock is None:
 			sock = self.Socket
 
-		msgpkt = MsgPacket()
+		msgpkt = self.Packet()
 
 		if data is None:
 			msgpkt.SetPacket(self.ACK, str(os.getpid()))
@@ -2011,72 +5528,57 @@ class NetworkingBase(TitleValueFormatter,Taggable,ItemID):
 
 		succeeded = msgpkt.SendMsg(sock)
 
-		tracer.Exitting("NetworkingBase::SendACK")
-
 		return succeeded
 
 	# NACK Helper Function
+	@Traced("NetworkingBase::SendNACK")
 	def SendNACK(self,sock=None):
-		tracer.Entering("NetworkingBase::SendNACK")
-
 		if sock is None:
 			sock = self.Socket
 
-		msgpkt = MsgPacket(self.NACK, str(os.getpid()))
+		msgpkt = self.Packet(self.NACK, str(os.getpid()))
 
-		succeeded = msgplt.SendMsg(sock)
-
-		tracer.Exitting("NetworkingBase::SandNACK")
+		succeeded = msgpkt.SendMsg(sock)
 
 		return succeeded
 
 	# FIN (Operation finished) Helper Function
+	@Traced("NetworkingBase::SendFIN")
 	def SendFIN(self,sock=None):
-		tracer.Entering("NetworkingBase::SendFIN")
-
 		if sock is None:
 			sock = self.Socket
 
-		msgpkt = MsgPacket(self.FIN,str(os.getpid()))
+		msgpkt = self.Packet(self.FIN,str(os.getpid()))
 
 		msgpkt.SendMsg(sock)
 
-		tracer.Exitting("NetworkingBase::SendFIN")
-
 	# Send Terminate Flag
+	@Traced("NetworkingBase::SendTERM")
 	def SendTERM(self,sock=None):
-		tracer.Entering("NetworkingBase::SendTERM")
-
 		if sock is None:
 			sock = self.Socket
 
-		msgpkt = MsgPacket(self.TERM, str(os.getpid()))
+		msgpkt = self.Packet(self.TERM, str(os.getpid()))
 
 		succeeded = msgpkt.SendMsg(sock)
 
-		tracer.Exitting("NetworkingBase::SendTERM")
-
 		return succeeded
 
 	# Send Inform
+	@Traced("NetworkingBase::SendINFORM")
 	def SendINFORM(self,payload,sock=None):
-		tracer.Entering("NetworkingBase::SendINFORM")
-
 		if sock is None:
 			sock = self.Socket
 
-		msgpkt = MgPacket(self.INFORM,payload)
+		msgpkt = self.Packet(self.INFORM,payload)
 
 		succeeded = msgpkt.SendMsg(sock)
 
-		tracer.Exitting("NetworkingBase::SendINFORM")
-
 		return succeeded
 
 	# Send Ping
+	@Traced("NetworkingBase::SendPING")
 	def SendPING(self,sock=None,payload=None):
-		tracer.Entering("NetworkingBase::SendPING")
-
 		if sock is None:
 			sock = self.Socket
 
@@ -2085,7 +5587,7 @@ class NetworkingBase(TitleValueFormatter,Taggable,ItemID):
 		if payload is None:
 			payload = str(os.getpid())
 
-		msgpkt = MsgPacket(self.PING, payload)
+		msgpkt = self.Packet(self.PING, payload)
 
 		succeeded = msgpkt.SendMsg(sock)
 
@@ -2097,14 +5599,11 @@ class NetworkingBase(TitleValueFormatter,Taggable,ItemID):
 		if not block_status:
 			self.SetBlocking(block_status,sock=sock)
 
-		tracer.Exitting("NetworkingBase::SendPING")
-
 		return msgpkt
 
 	# Accept Incoming Connection
+	@Traced("NetworkingBase::Accept")
 	def Accept(self):
-		tracer.Entering("NetworkingBase::Accept")
-
 		data = None
 
 		connection, remoteAddress = self.Socket.accept()
@@ -2113,16 +5612,14 @@ class NetworkingBase(TitleValueFormatter,Taggable,ItemID):
 
 		succeeded = msgpkt.RecvMsg(connection)
 
-		tracer.Inside("NetworkingBase:Accept",postfix=f"Accept Succeeded {succeeded} {msgpkt.Verb}")
-
-		tracer.Exitting("NetworkingBase::Accept")
+		if tracer.Enabled:
+			tracer.Inside("NetworkingBase::Accept",postfix=f"Accept Succeeded {succeeded} {msgpkt.Verb}")
 
 		return connection, remoteAddress, msgpkt
 
 	# Close Open Socket
+	@Traced("NetworkingBase::Close")
 	def Close(self,sock=None):
-		tracer.Entering("NetworkingBase::Close")
-
 		if sock is None:
 			sock = self.Socket
 
@@ -2133,38 +5630,417 @@ class NetworkingBase(TitleValueFormatter,Taggable,ItemID):
 			if sock is self.Socket:
 				self.Socket = None
 
-		tracer.Exitting("NetworkingBase::Close")
-
 # Remove Assignment Class
 class RemoteAssignment(TitleValueFormatter,Taggable,ItemID):
 	Log = None
 	Address = None
-	ProcessId = None
+	ProcessID = None
+	# When the assignment was handed out
+	Assigned = None
+	# When the lease runs out, renewed while the holder is heard from (None never expires)
+	Lease = None
 
 	# Init Instance
-	def __init__(self,log=None,address=None,pid=None):
+	def __init__(self,log=None,address=None,pid=None,lease=None):
 		self.Log = log
 		self.Address = address
 		self.ProcessID = pid
+		self.Assigned = datetime.now()
+		self.Lease = self.Assigned + timedelta(seconds=lease) if lease else None
 
 		ItemID.RandomID(self)
 
 	# Print Status
 	def Print(self):
-		self.Pfmt("ID",seld.ID)
-		self.Pfmt("Address",self.Addres)
-		self.Pfmt("Process ID",self.ProcessId)
+		self.Pfmt("ID",self.ID)
+		self.Pfmt("Address",self.Address)
+		self.Pfmt("Process ID",self.ProcessID)
+		self.Pfmt("Lease",self.Lease)
 		self.Pfmt("Tag",self.Tag)
 		self.Log.Print()
 
+	# Host And Process Holding The Assignment (Survives A Reconnect)
+	def Holder(self):
+		host = self.Address[0] if type(self.Address) is tuple else self.Address
+
+		return ( host, str(self.ProcessID) )
+
+	# Extend The Lease To until
+	def Renew(self,until):
+		if self.Lease and until > self.Lease:
+			self.Lease = until
+
+	# Lease Has Run Out
+	def Expired(self,now=None):
+		return self.Lease is not None and (now or datetime.now()) > self.Lease
+
+# Client Connection : Server Side State Of One Remote Client
+class ClientConnection(TitleValueFormatter,Taggable):
+	"""Non Blocking Socket With Inbound/Outbound Buffers, Frames Are Parsed As They Complete"""
+
+	# Client socket (non blocking)
+	Socket = None
+	# Peer address
+	Address = None
+	# Remote process ID (from HELLO)
+	ProcessID = None
+	# Received bytes not yet parsed into packets
+	Inbound = None
+	# Framed packets not yet sent
+	Outbound = None
+	# Sent packets waiting on the client's ACK, as (verb, logs)
+	Unacked = None
+	# Events registered with the selector
+	Events = 0
+	# Time of last packet from the client
+	LastHeard = None
+	# Close once outbound is flushed
+	Closing = False
+	# Wire protocol the client advertised in its HELLO
+	Protocol = 1
+	# File being received from the client (FileTransfer)
+	Transfer = None
+
+	# Init Instance
+	def __init__(self,sock,address):
+		self.Socket = sock
+		self.Address = address
+		self.ProcessID = None
+		self.Protocol = 1
+		self.Transfer = None
+		self.Inbound = bytearray()
+		self.Outbound = bytearray()
+		self.Unacked = deque()
+		self.Events = 0
+		self.LastHeard = datetime.now()
+		self.Closing = False
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Address",self.Address)
+		self.Pfmt("Process ID",self.ProcessID)
+		self.Pfmt("Protocol",self.Protocol)
+		self.Pfmt("Inbound",len(self.Inbound),postfix="bytes")
+		self.Pfmt("Outbound",len(self.Outbound),postfix="bytes")
+		self.Pfmt("Unacked",len(self.Unacked))
+		self.Pfmt("Last Heard",self.LastHeard)
+		self.Pfmt("Tag",self.Tag)
+
+	# Selector Support
+	def fileno(self):
+		return self.Socket.fileno()
+
+	# Peer Address (Kept After The Socket Closes)
+	def getpeername(self):
+		return self.Address
+
+	# Host And Process On The Other End, Matches RemoteAssignment.Holder
+	def Holder(self):
+		return ( self.Address[0] if type(self.Address) is tuple else self.Address, str(self.ProcessID) )
+
+	# Read What The Socket Has, False When The Peer Has Gone
+	def Fill(self,size=65536):
+		try:
+			data = self.Socket.recv(size)
+		except ( BlockingIOError, InterruptedError ):
+			return True
+		except OSError as err:
+			DbgMsg(f"Receive from {self.Address} failed : {err}")
+			return False
+
+		if len(data) == 0:
+			return False
+
+		self.Inbound += data
+		self.LastHeard = datetime.now()
+
+		return True
+
+	# Complete Packets Received So Far
+	def Packets(self):
+		while True:
+			frame = MsgPacket.FrameSize(self.Inbound)
+
+			if frame is None:
+				break
+
+			headerSize, size = frame
+
+			# Checked before waiting on the payload, a bogus length would otherwise buffer forever
+			if size > MsgPacket.MaxPayload:
+				raise ValueError(f"packet of {size} bytes is too large")
+
+			if len(self.Inbound) < headerSize + size:
+				break
+
+			header = bytes(self.Inbound[:headerSize]) if headerSize > 4 else None
+			payload = bytes(self.Inbound[headerSize:headerSize + size])
+
+			del self.Inbound[:headerSize + size]
+
+			msgpkt = MsgPacket()
+			msgpkt.Unpack(payload,header)
+
+			yield msgpkt
+
+	# Queue Packet For Sending
+	def Queue(self,msgpkt,logs=None,acked=False):
+		self.Outbound += msgpkt.Frame(self.Protocol)
+
+		# The client ACKs patterns, named queries and assignments (one ACK for a whole batch)
+		if acked:
+			self.Unacked.append(( msgpkt.Verb, logs ))
+
+	# Send What The Socket Will Take, False When The Peer Has Gone
+	def Flush(self):
+		while len(self.Outbound) > 0:
+			try:
+				sent = self.Socket.send(self.Outbound)
+			except ( BlockingIOError, InterruptedError ):
+				break
+			except OSError as err:
+				DbgMsg(f"Send to {self.Address} failed : {err}")
+				return False
+
+			del self.Outbound[:sent]
+
+		return True
+
+	# Close Socket
+	def Close(self):
+		try:
+			self.Socket.shutdown(socket.SHUT_RDWR)
+		except OSError:
+			pass
+
+		self.Socket.close()
+
+# File Transfer : Receiving Side Of One File Sent Over A Connection
+class FileTransfer(TitleValueFormatter,Taggable):
+	"""Bytes Written As They Arrive, What Was Written Survives A Dropped Connection So The Sender Can Resume"""
+
+	# Receive buffer size
+	BufferSize = 1048576
+	# Uncompressed bytes per compressed chunk (sending side)
+	ChunkSize = 1048576
+	# Compression names on the wire
+	NOCOMPRESSION = "none"
+	ZLIB = "zlib"
+
+	# Source log the results belong to
+	Filename = None
+	# Final destination
+	Output = None
+	# Destination while the transfer is incomplete
+	Partial = None
+	# Full (uncompressed) size
+	Size = 0
+	# Bytes written so far (the resume offset)
+	Received = 0
+	# crc32 of the bytes written so far
+	Checksum = 0
+	# Compression used by the sender (None for raw bytes)
+	Compression = None
+	# Stream in progress (bytes on the connection belong to the file, not to packets)
+	Streaming = False
+	# Open partial file
+	Handle = None
+	# Receive buffer (and its view)
+	Buffer = None
+	View = None
+	# Compressed stream state, length of the current chunk (None while reading its length) and the bytes so far
+	Chunk = None
+	Pending = None
+	Decompressor = None
+
+	# Init Instance
+	def __init__(self,filename,output):
+		self.Filename = filename
+		self.Output = output
+		self.Partial = output + ".part"
+		self.Size = 0
+		self.Received = 0
+		self.Checksum = 0
+		self.Compression = None
+		self.Streaming = False
+		self.Handle = None
+		self.Buffer = None
+		self.View = None
+		self.Chunk = None
+		self.Pending = bytearray()
+		self.Decompressor = None
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Filename",self.Filename)
+		self.Pfmt("Output",self.Output)
+		self.Pfmt("Size",self.Size,postfix="bytes")
+		self.Pfmt("Received",self.Received,postfix="bytes")
+		self.Pfmt("Compression",self.Compression)
+		self.Pfmt("Streaming",self.Streaming)
+		self.Pfmt("Tag",self.Tag)
+
+	# Start (Or Resume) Receiving, From Received Onward
+	def Start(self,size,compression=None):
+		self.Size = size
+		self.Compression = compression if compression and compression != self.NOCOMPRESSION else None
+
+		if self.Received > size or not os.path.exists(self.Partial):
+			self.Received = 0
+			self.Checksum = 0
+
+		if self.Received > 0:
+			self.Handle = open(self.Partial,"r+b")
+			self.Handle.seek(self.Received)
+			self.Handle.truncate()
+		else:
+			self.Handle = open(self.Partial,"wb")
+
+		self.Chunk = None
+		self.Pending = bytearray()
+		self.Decompressor = zlib.decompressobj() if self.Compression else None
+
+		# A compressed stream always ends with an empty chunk
+		self.Streaming = self.Compression is not None or self.Received < self.Size
+
+	# Write Bytes Of The File
+	def Write(self,data):
+		self.Handle.write(data)
+		self.Checksum = zlib.crc32(data,self.Checksum)
+		self.Received += len(data)
+
+	# Bytes To Read Next, Never Past The End Of The Stream
+	def Wanted(self):
+		if not self.Compression:
+			return min(self.BufferSize,self.Size - self.Received)
+
+		if self.Chunk is None:
+			return 4 - len(self.Pending)
+
+		return min(self.BufferSize,self.Chunk - len(self.Pending))
+
+	# Consume Stream Bytes, Returns Any Bytes Past The End Of The Stream (Or None)
+	def Feed(self,data):
+		position = 0
+
+		while self.Streaming and position < len(data):
+			if not self.Compression:
+				count = min(len(data) - position,self.Size - self.Received)
+
+				self.Write(data[position:position + count])
+				position += count
+
+				self.Streaming = self.Received < self.Size
+				continue
+
+			count = min(len(data) - position,self.Wanted())
+
+			self.Pending += data[position:position + count]
+			position += count
+
+			if self.Chunk is None:
+				if len(self.Pending) == 4:
+					self.Chunk = int.from_bytes(self.Pending,'little',signed=False)
+					self.Pending.clear()
+
+					if self.Chunk == 0:
+						# End of stream
+						self.Write(self.Decompressor.flush())
+						self.Chunk = None
+						self.Streaming = False
+			elif len(self.Pending) == self.Chunk:
+				self.Write(self.Decompressor.decompress(self.Pending))
+				self.Pending.clear()
+				self.Chunk = None
+
+		if position < len(data):
+			return bytes(data[position:])
+
+		return None
+
+	# Receive What The Socket Has Into The File, False When The Peer Has Gone
+	def Receive(self,sock):
+		if self.Buffer is None:
+			self.Buffer = bytearray(self.BufferSize)
+			self.View = memoryview(self.Buffer)
+
+		while self.Streaming:
+			try:
+				count = sock.recv_into(self.View,self.Wanted())
+			except ( BlockingIOError, InterruptedError ):
+				return True
+			except OSError as err:
+				DbgMsg(f"Receiving {self.Filename} failed : {err}")
+				return False
+
+			if count == 0:
+				return False
+
+			self.Feed(self.View[:count])
+
+		return True
+
+	# Connection Dropped, Keep What Was Written For A Resume
+	def Pause(self):
+		if self.Handle:
+			self.Handle.close()
+			self.Handle = None
+
+		self.Streaming = False
+		self.Chunk = None
+		self.Pending = bytearray()
+		self.Decompressor = None
+
+	# Sender Is Done, Check The Whole File's Checksum, True When It Is In Place
+	def Finish(self,checksum):
+		self.Pause()
+
+		if self.Received == self.Size and self.Checksum == checksum:
+			os.replace(self.Partial,self.Output)
+			return True
+
+		DbgMsg(f"Transfer of {self.Filename} failed, {self.Received} of {self.Size} bytes, checksum {self.Checksum:08x} expected {checksum:08x}")
+
+		self.Discard()
+
+		return False
+
+	# Throw Away What Was Received
+	def Discard(self):
+		self.Pause()
+
+		if os.path.exists(self.Partial):
+			os.remove(self.Partial)
+
+		self.Received = 0
+		self.Checksum = 0
+
 # Server Class
 class SearchServer(NetworkingBase,App):
-	# Client Connections
+	"""Event Driven Search Controller, One Selector Serves The Listening Socket And Every Client"""
+
+	# Client Connections (ClientConnection)
 	Connections = None
+	# Socket Selector (epoll where available)
+	Selector = None
 	# Terminate Flag
 	TerminateRemoteWorkers = False
 	# Patterns Sent Flag
 	PatternsSent = False
+	# Aggregation spec sent with the patterns (see Aggregate.Pack), None for plain results
+	Aggregation = None
+	# Result transfers from clients, by source log filename (kept across connections for resuming)
+	Transfers = None
+	# Seconds a client can go unheard before its assignments are re-queued (it pings every 5)
+	LeaseTime = 30
+	# Seconds between lease sweeps
+	LeaseCheck = 1.0
+	# Last sweep (monotonic)
+	LeaseChecked = None
+	# When each holder ( host, pid ) was last heard from
+	Heard = None
+	# Source filenames completed remotely, later completions of them are duplicates
+	Finished = None
 
 	# Init Server
 	def __init__(self,host=None,port=None,socketFamily=socket.AF_INET,socketType=socket.SOCK_STREAM,encoding=None):
@@ -2178,18 +6054,34 @@ class SearchServer(NetworkingBase,App):
 			self.Encoding = encoding
 
 		self.Connections = []
+		self.Transfers = {}
+		self.Heard = {}
+		self.Finished = set()
+		self.LeaseChecked = None
 		self.SocketFamily = socketFamily
 		self.SocketType = socketType
 
-		self.Socket = self.Bind()
-		self.Listen(backlog=5)
+		self.NewSocket()
+		self.Socket.setsockopt(socket.SOL_SOCKET,socket.SO_REUSEADDR,1)
+		self.Socket.bind((self.Host,self.Port))
 
+		self.Listen(backlog=socket.SOMAXCONN)
 		self.SetBlocking(False)
 
+		# Port 0 binds to any free port
+		self.Port = self.Socket.getsockname()[1]
+
+		self.Selector = selectors.DefaultSelector()
+		self.Selector.register(self.Socket,selectors.EVENT_READ,None)
+
 	# Print Basic  Info About Search Manager
 	def Print(self):
 		self.Pfmt("Connections",len(self.Connections))
+		self.Pfmt("Transfers",len(self.Transfers))
+		self.Pfmt("Lease Time",self.LeaseTime,postfix="seconds")
+		self.Pfmt("Finished",len(self.Finished))
 		self.Pfmt("Term Flag",self.TerminateRemoteWorkers)
+		self.Pfmt("Selector",type(self.Selector).__name__)
 		NetworkingBase.Print(self)
 		App.Print(self)
 
@@ -2222,428 +6114,493 @@ class SearchServer(NetworkingBase,App):
 		else:
 			value = f"{field} not in this object"
 
-		return value
+		return value
+
+	# Add A Connection To Live Connections List
+	@Traced("SearchServer::AddConnection")
+	def AddConnection(self,connection):
+		if tracer.Enabled:
+			tracer.Inside("SearchServer::AddConnection",postfix=f"Last Caller : {tracer.LastCalled}")
+
+		self.Connections.append(connection)
+
+		connection.Events = selectors.EVENT_READ
+		self.Selector.register(connection.Socket,connection.Events,connection)
+
+	# Remove A Connection From List
+	@Traced("SearchServer::RemoveConnection")
+	def RemoveConnection(self,connection):
+		if connection in self.Connections:
+			self.Connections.remove(connection)
+
+			# A transfer cut short keeps what arrived, the client can resume it
+			if connection.Transfer:
+				connection.Transfer.Pause()
+				connection.Transfer = None
+
+			self.Selector.unregister(connection.Socket)
+			connection.Close()
+		else:
+			DbgMsg(f"Asked to remove {connection}, did not find it")
+
+	# Accept Every Waiting Connection
+	def AcceptConnections(self):
+		while True:
+			try:
+				sock, remoteAddress = self.Socket.accept()
+			except ( BlockingIOError, InterruptedError ):
+				break
+
+			sock.setblocking(False)
+			sock.setsockopt(socket.IPPROTO_TCP,socket.TCP_NODELAY,1)
+
+			self.AddConnection(ClientConnection(sock,remoteAddress))
+
+			DbgMsg(f"Remote client connected {remoteAddress}")
+
+	# Pack Metas for Transfer
+	@Traced("SearchServer::PackMetas")
+	def PackMetas(self,metas):
+		lines = []
+
+		for meta in metas:
+			lines.extend(meta.Pack())
+
+		return lines
+
+	# Send Patterns
+	def SendPatterns(self,patterns,connection):
+		connection.Queue(MsgPacket(self.PATTERN,list(patterns)),acked=True)
+
+	# Send Named Queries
+	def SendNamedQueries(self,namedQueries,connection):
+		connection.Queue(MsgPacket(self.NAMEDQUERY,[ f"{query}" for query in namedQueries ]),acked=True)
+
+	# Assignment Payload : Meta Name, Filename, Output, One Per Line
+	def AssignmentLines(self,log):
+		return [ log.Meta.Name, log.Filename, (log.Output if log.Output else "") ]
+
+	# Send Assignment Helper Function
+	def SendAssignment(self,log,connection):
+		payload = self.AssignmentLines(log)
+
+		log.Track("Sent to remote thread as assignment")
+
+		connection.Queue(MsgPacket(self.ASSIGN,payload),logs=[ log ],acked=True)
+
+	# Send Assignments
+	@Traced("SearchServer::SendAssignments")
+	def SendAssignments(self,assignments,patterns=None,namedQueries=None,connection=None,aggregation=None):
+		"""Queue Patterns, Queries, Assignments And FIN In One Go, The Client's ACKs Are Taken As They Arrive"""
+
+		if tracer.Enabled:
+			tracer.Inside("SearchServer::SendAssignments",postfix=str(connection.Address))
+
+		if patterns:
+			self.SendPatterns(patterns,connection)
+		if namedQueries:
+			self.SendNamedQueries(namedQueries,connection)
+		if aggregation:
+			connection.Queue(MsgPacket(self.AGGREGATE,[ aggregation ]),acked=True)
+
+		for log in assignments:
+			self.SendAssignment(log,connection)
+
+		# Tell Client we are done
+		connection.Queue(MsgPacket(self.FIN,str(os.getpid())))
+
+	# Send Assignments As One Batch (Wire Protocol 2)
+	@Traced("SearchServer::SendAssignmentBatch")
+	def SendAssignmentBatch(self,assignments,patterns=None,namedQueries=None,connection=None,aggregation=None):
+		"""One Packet, One ACK : A Count Line (patterns queries assignments [aggregations]), The Patterns, The Queries, The Aggregation, Then Three Lines Per Assignment"""
+
+		if tracer.Enabled:
+			tracer.Inside("SearchServer::SendAssignmentBatch",postfix=str(connection.Address))
+
+		patterns = list(patterns) if patterns else []
+		namedQueries = [ f"{query}" for query in namedQueries ] if namedQueries else []
+
+		payload = [ f"{len(patterns)} {len(namedQueries)} {len(assignments)}" + (" 1" if aggregation else "") ]
+		payload.extend(patterns)
+		payload.extend(namedQueries)
+
+		if aggregation:
+			payload.append(aggregation)
 
-	# Add A Connection To Live Connections List
-	def AddConnection(self,connection):
-		tracer.Entering("SearchServer::AddConnection",postfix=f"Last Caller : {tracer.LastCalled}")
+		for log in assignments:
+			payload.extend(self.AssignmentLines(log))
 
-		self.Connections.append(connection)
+			log.Track("Sent to remote thread in an assignment batch")
 
-		tracer.Exitting("SearchServer::AddConnection")
+		connection.Queue(MsgPacket(self.ASSIGNBATCH,payload),logs=list(assignments),acked=True)
 
-	# Remove A Connection From List
-	def RemoveConnection(self,connection):
-		tracer.Entering("SearchServer::RemoveConnection")
+	# Clear Dead Sockets
+	@Traced("SearchServer::ClearDeadConnections")
+	def ClearDeadConnections(self):
+		deadsockets = [ connection for connection in self.Connections if connection.Socket.fileno() < 0 ]
 
-		if connection in self.Connections:
+		for connection in deadsockets:
 			self.Connections.remove(connection)
-		else:
-			DbgMsg(f"Asked to remove {connection}, did not find it")
 
-		tracer.Exitting("SearchServer::RemoveConnection")
+	# Select On Sockets
+	def Select(self,timeout=0):
+		"""Ready (key, events) Pairs, Waits At Most timeout Seconds (0 Polls)"""
 
-	# Accept Waiting Data And Crack Message
-	def AcceptMsg(self,sock=None):
-		connection, remoteAddress, msgpkt = self.Accept()
+		return self.Selector.select(timeout)
 
-		self.SetBlocking(False,sock=connection)
+	# Return Assignments To The Log List
+	def Requeue(self,assignments,logList,remoteAssignments,reason):
+		for item in assignments:
+			if item in remoteAssignments:
+				remoteAssignments.remove(item)
 
-		self.AddConnection(connection)
+			transfer = self.Transfers.pop(item.Log.Filename,None)
 
-		# connection, remAddr, verb, data
-		return (connection, remoteAddress, msgpkt )
+			if transfer:
+				transfer.Discard()
 
-	# Pack Metas for Transfer
-	def PackMetas(self,metas):
-		tracer.Entering("SearchServer::PackMetas")
+			item.Log.Track(reason)
+			logList.append(item.Log)
 
-		lines = []
+	# Client Was Heard From, Its Leases Are Renewed At The Next Sweep
+	def Hear(self,connection):
+		connection.LastHeard = datetime.now()
 
-		for meta in metas:
-			lines.extend(meta.Pack())
+		if connection.ProcessID is not None:
+			self.Heard[connection.Holder()] = connection.LastHeard
 
-		tracer.Exitting("SearchServer::PackMetas")
+	# Renew Leases Of Holders Heard From, Re-Queue The Ones That Ran Out
+	def ExpireLeases(self,logList,remoteAssignments):
+		"""Returns The Expired Assignments, Their Logs Are Back In logList For Anyone To Take"""
 
-		return lines
+		now = tm.monotonic()
 
-	# Send Patterns
-	def SendPatterns(self,patterns,sock):
-		tracer.Entering("SearchServer::SendPatterns")
+		if self.LeaseChecked is not None and now - self.LeaseChecked < self.LeaseCheck:
+			return []
 
-		payload = []
+		self.LeaseChecked = now
 
-		for pattern in patterns:
-			payload.append(pattern)
+		now = datetime.now()
+		lease = timedelta(seconds=self.LeaseTime)
 
-		msgpkt = MsgPacket(self.PATTERN,payload)
+		expired = []
 
-		succeeded = msgpkt.SendMsg(sock)
+		for item in remoteAssignments:
+			heard = self.Heard.get(item.Holder())
 
-		msgpkt = self.WaitReply(sock=sock)
+			if heard:
+				item.Renew(heard + lease)
 
-		tracer.Exitting("SearchServer::SendPatterns")
+			if item.Expired(now):
+				expired.append(item)
 
-		return msgpkt
+		if len(expired) > 0:
+			DbgMsg(f"{len(expired)} remote assignment lease(s) expired, requeued")
 
-	# Send Named Queries
-	def SendNamedQueries(self,namedQueries,sock):
-		tracer.Entering("SearchServer::SendNamedQueries")
+			self.Requeue(expired,logList,remoteAssignments,f"lease expired, remote thread not heard from in {self.LeaseTime}s, requeued")
 
-		payload = []
+		return expired
 
-		for query in namedQueries:
-			payload.append(f"{query}")
+	# Log Still Waiting On A Search, As ( assignment, log )
+	def Outstanding(self,filename,logList,remoteAssignments):
+		"""Assignment Is None When The Lease Expired And The Log Is Back In logList, Both None If It Is Done (Or Unknown)"""
 
-		msgpkt = MsgPacket(self.NAMEDQUERY,payload)
+		if filename in self.Finished:
+			return None, None
 
-		succeeded = msgpkt.SendMsg(sock)
+		item = remoteAssignments.Find(filename)
 
-		msgpkt = self.WaitReply(sock=sock)
+		if item:
+			return item, item.Log
 
-		tracer.Exitting("SearchServer::SendNamedQueries")
+		return None, logList.Find(filename)
 
-		return msgpkt
+	# Take A Completion, The First One Reported Wins And Later Ones Are Duplicates
+	def Claim(self,filename,item,log,logList,remoteAssignments):
+		if item:
+			remoteAssignments.remove(item)
+		else:
+			logList.remove(log)
 
-	# Send Assignment Helper Function
-	def SendAssignment(self,log,sock):
-		tracer.Entering("SearchServer::SendAssignment")
+		self.Finished.add(filename)
 
-		payload = [ ]
+	# Server Processing Loop
+	@Traced("SearchServer::Process")
+	def Process(self,metas,logList,patterns,namedQueries,streamers,remoteAssignments,timeout=0):
+		"""Service Every Ready Socket Once, Returns Logs Remote Clients Completed"""
 
-		# Payload Construction : Format (per line) Meta Name, Filename, Output, patterns, one per line
-		payload.append(log.Meta.Name)
-		payload.append(log.Filename)
-		payload.append(log.Output if log.Output else "")
+		completed = []
 
-		log.Track("Sent to remote thread as assignment")
+		for key, events in self.Select(timeout):
+			connection = key.data
 
-		msgpkt = MsgPacket(self.ASSIGN,payload)
+			# If there is a new connection on the server socket, handle it.
+			if connection is None:
+				self.AcceptConnections()
+				continue
 
-		succeeded = msgpkt.SendMsg(sock)
+			if events & selectors.EVENT_READ:
+				# While a file is streaming in, its bytes go straight to the file
+				if connection.Transfer and connection.Transfer.Streaming:
+					alive = connection.Transfer.Receive(connection.Socket)
+				else:
+					alive = connection.Fill()
 
-		tracer.Exitting("SearchServer::SendAssignment")
+				if not alive:
+					# Its assignments stay out until their leases run out, it may reconnect
+					DbgMsg(f"Client {connection.Address} went away")
+					self.RemoveConnection(connection)
+					continue
 
-		return succeeded
+				packets = connection.Packets()
+				dropped = False
+
+				while True:
+					# Only decoding and field parsing are guarded, errors in handling a good packet are ours and propagate
+					try:
+						msgpkt = next(packets,None)
+						data = self.Fields(msgpkt) if msgpkt else None
+					except ( ValueError, IndexError, UnicodeDecodeError, zlib.error, struct.error ) as err:
+						# A malformed packet drops that client only, its assignments stay out until their leases run out
+						Msg(f"*** Dropping client {connection.Address}, bad packet - {err}",ignoreModuleMode=True)
+						self.RemoveConnection(connection)
+						dropped = True
+						break
 
-	# Send Assignments
-	def SendAssignments(self,assignments,patterns=None,namedQueries=None,sock=None):
-		postfix = str(self.WhoAmITalkingTo(sock or self.Socket))
+					if msgpkt is None:
+						break
 
-		tracer.Entering("SearchServer::SendAssignments",postfix=postfix)
+					self.Dispatch(connection,msgpkt,data,metas,logList,patterns,namedQueries,remoteAssignments,completed)
 
-		DbgMsg(f"Sending Assignments {postfix}")
+				if dropped:
+					continue
 
-		client_cancelled = False
+				self.Hear(connection)
 
-		# While we are sending the assignments, we want blocking
-		#self.SetBlocking(True,sock=sock)
+			if not connection.Flush():
+				self.RemoveConnection(connection)
+			elif connection.Closing and len(connection.Outbound) == 0:
+				self.RemoveConnection(connection)
+			else:
+				# Only ask for writability while there is something to write
+				wanted = selectors.EVENT_READ | (selectors.EVENT_WRITE if len(connection.Outbound) > 0 else 0)
 
-		try:
-			# Send Patterns and named queries
-			if patterns:
-				msgpkt = self.SendPatterns(patterns,sock)
-			if namedQueries:
-				msgpkt = self.SendNamedQueries(namedQueries,sock)
+				if wanted != connection.Events:
+					connection.Events = wanted
+					self.Selector.modify(connection.Socket,wanted,connection)
 
-			for log in assignments:
-				DbgMsg(f"Sending An Assignment {log.Filename}")
+		self.ExpireLeases(logList,remoteAssignments)
 
-				self.Tag = ( log, "SearchServer::SendAssignments" )
+		return completed
 
-				verb = self.ACK
+	# Parse A Client Packet's Fields
+	def Fields(self,msgpkt):
+		"""Field List With Numeric Fields Converted, A Malformed Packet Raises ValueError Or IndexError"""
 
-				self.SendAssignment(log,sock)
+		data = list(msgpkt.Data or [])
 
-				msgpkt = self.WaitReply(sock=sock)
+		# Verb : ( required fields, numeric fields )
+		layouts = {
+			self.HELLO : ( 4, [ 1, 2, 3, 4 ] ),
+			self.COMPLETED : ( 2, [] ),
+			self.FILE : ( 3, [ 1 ] ),
+			self.EOF : ( 1, [ 0 ] ),
+		}
 
-				if msgpkt.Verb == self.NACK:
-					client_cancelled = True
-					break
+		required, numeric = layouts.get(msgpkt.Verb,( 0, [] ))
 
-			# Tell Client we are done
-			if not client_cancelled:
-				succeeded = self.SendFIN(sock=sock)
-		finally:
-			# Restore Non Blocking
-			#self.SetBlocking(False,sock=sock)
-			pass
+		if len(data) < required:
+			raise IndexError(f"{msgpkt.Verb} packet has {len(data)} of {required} fields")
 
-		tracer.Exitting("SearchServer::SendAssignments")
+		for index in numeric:
+			if index < len(data):
+				data[index] = int(data[index])
 
-	# Clear Dead Sockets
-	def ClearDeadConnections(self):
-		tracer.Entering("SearchServer::ClearDeadConnections")
+		return data
 
-		deadsockets = []
+	# Handle One Packet From A Client, data Is Its Parsed Fields
+	def Dispatch(self,connection,msgpkt,data,metas,logList,patterns,namedQueries,remoteAssignments,completed):
+		if msgpkt.Verb == self.HELLO:
+			# Hello is a default request for assignments, the thread count tells you how many
+			# The remote client wants. It does not necessarily reflect the total number of
+			# running threads or CPUs.... just what the remote worker wants.
+			connection.ProcessID = data[0]
+			threads = data[1]
+			rmMetas = data[2]
+			sendPatterns = data[3]
 
-		for sock in self.Connections:
-			if sock.fileno() < 0:
-				deadsockets.append(sock)
+			# Newer clients advertise their wire protocol, replies (and the rest of the session) use it
+			if len(data) > 4:
+				connection.Protocol = max(1,min(data[4],MsgPacket.LatestProtocol))
 
-		for sock in deadsockets:
-			self.Connections.remove(sock)
+			# Determine the lesser of, how many assignments the remote work wants
+			# and how many are available
+			threads = min(threads,len(logList))
 
-		tracer.Exitting("SearchServer::ClearDeadConnections")
+			if threads > 0 and not self.TerminateRemoteWorkers:
+				# If rmMetas (Remote Metas) is zero, the metas are packed into the ACK
+				connection.Queue(MsgPacket(self.ACK,(self.PackMetas(metas) if rmMetas == 0 else str(os.getpid()))))
 
-	# Select On Sockets
-	def Select(self):
-		tracer.Entering("SearchServer::Select")
+				# Remote threads get logs from the tail of the log list
+				items = [ logList.pop() for count in range(threads) ]
+				items.reverse()
 
-		sockList = []
+				for item in items:
+					remoteAssignments.append(RemoteAssignment(item,connection.Address,connection.ProcessID,lease=self.LeaseTime))
 
-		# Always Listen to Server Socket
-		if self.Socket:
-			sockList.append(self.Socket)
+				if connection.Protocol >= 2:
+					self.SendAssignmentBatch(items,(patterns if sendPatterns > 0 else None),(namedQueries if sendPatterns > 0 else None),connection,(self.Aggregation if sendPatterns > 0 else None))
+				else:
+					self.SendAssignments(items,(patterns if sendPatterns > 0 else None),(namedQueries if sendPatterns > 0 else None),connection,(self.Aggregation if sendPatterns > 0 else None))
+			else:
+				# If there are no assignments, a NACK means the remote worker can terminate
+				connection.Queue(MsgPacket(self.NACK,str(os.getpid())))
 
-		deadSockets = []
+		elif msgpkt.Verb == self.ACK:
+			if len(connection.Unacked) > 0:
+				connection.Unacked.popleft()
 
-		# Listen to Live Sockets
-		for sock in self.Connections:
-			if sock:
-				# Try to sort out some problematic sockets.... these should not be here.... but nobodies perfect
-				if sock.fileno() > -1:
-					sockList.append(sock)
-				else:
-					# TODO : Debug
-					# This should not be needed, server should remove sockets
-					# that disconnect
-					deadSockets.append(sock)
+		elif msgpkt.Verb == self.NACK:
+			# Client cancelled, assignments it hasn't acknowledged go back in the log list
+			cancelled = [ remoteAssignments.Find(log.Filename) for verb, logs in connection.Unacked if logs for log in logs ]
+			connection.Unacked.clear()
 
-		if len(deadSockets) > 0:
-			DbgMsg("****** Removing Dead Socket in Select, WHY?")
-			for deadSocket in deadSockets:
-				self.RemoveConnection(deadSocket)
+			self.Requeue([ item for item in cancelled if item ],logList,remoteAssignments,"cancelled by remote thread")
 
-		readable = []
-		writable = []
-		exceptional = []
+		elif msgpkt.Verb == self.REJECTED:
+			filename = data[0] if len(data) > 0 else ""
 
-		if len(sockList) > 0:
-			readable, writable, exceptional = select.select(sockList, sockList, sockList, 1 )
+			DbgMsg(f"Rejected {filename}")
 
-		tracer.Exitting("SearchServer::Select")
+			item = remoteAssignments.Find(filename)
 
-		return readable, writable, exceptional
+			if item:
+				self.Requeue([ item ],logList,remoteAssignments,"rejected by remote thread")
 
-	# Possibly deprecated
-	# Remove Assignment From Assignments List
-	def RemoveAssignment(self,connection,item,remoteAssignments):
-		tracer.Entering("SearchServer::RemoveAssignment")
+			connection.Queue(MsgPacket(self.ACK,str(os.getpid())))
 
-		for assignment in remoteAssignments:
-			if connection in assignment:
-				if item in assignment[1]:
-					assignment.remove(item)
-				if len(assignment[1]) == 0:
-					remoteAssignments.remove(assignment)
+		elif msgpkt.Verb == self.COMPLETED:
+			filename = data[0]
+			output = data[1]
+			# Newer clients wait for a reply, and can send the results over if asked
+			canSend = len(data) > 3 and data[3] == "1"
 
-				break
+			DbgMsg(f"Item completed : {filename} - {output}")
 
-		tracer.Exitting("SearchServer::RemoveAssignment")
+			# A late completion of an expired lease still counts if nobody else has finished it
+			item, log = self.Outstanding(filename,logList,remoteAssignments)
 
-	# Server Processing Loop
-	def Process(self,metas,logList,patterns,namedQueries,streamers,remoteAssignments):
-		tracer.Entering("SearchServer::Process")
+			if log is None:
+				if filename in self.Finished:
+					DbgMsg(f"***** Duplicate completion of {filename} from {connection.Address}, ignored")
+				else:
+					DbgMsg("***** Item completed but not found in remoteAssignments")
 
-		completed = []
+				if canSend:
+					connection.Queue(MsgPacket(self.NACK,str(os.getpid())))
+			elif (output == "" or not os.path.exists(output)) and canSend:
+				# Results can't be reached from here, ask for them from where a previous attempt left off
+				transfer = self.Transfers.get(filename)
 
-		callerids_tl = [ "MsgPacket::RecvMsg", \
-		"MsgPacket::SendMsg", \
-		"NetworkingBase::Accept", \
-		"NetworkingBase::WaitReply", \
-		"NetworkingBase::Receive", \
-		"NetworkingBase::SendACK", \
-		"NetworkingBase::SendFIN", \
-		"NetworkingBase::SendPING", \
-		"NetworkingBase::SetBlocking" ]
+				if transfer is None:
+					transfer = FileTransfer(filename,TmpFilename(folder=TempSpace,prefix="logsearch_",postfix="_"+log.EncodedDateStr()))
+					self.Transfers[filename] = transfer
 
-		tracer.SetTraceState(callerids_tl,"none")
+				log.Track(f"requesting results from remote thread, from byte {transfer.Received}")
 
-		# Get sockets with waiting data, we ignore the writable ones and the exceptional ones.... for now.
-		readable, writeable, exceptional = self.Select()
+				connection.Queue(MsgPacket(self.FILE,[ filename, str(transfer.Received) ]))
+			elif output == "" or not os.path.exists(output):
+				# Results can't be reached from here, search it again rather than lose it
+				if item:
+					self.Requeue([ item ],logList,remoteAssignments,"remote output not reachable, requeued")
+			else:
+				self.Claim(filename,item,log,logList,remoteAssignments)
 
-		# If we have some readables, time to start servicing them.
-		if len(readable) > 0:
-			for ready in readable:
-				logLen = len(logList)
+				log.SetOutput(output)
+				log.Track("search completed by remote thread")
 
-				verb = None
-				data = None
+				completed.append(log)
 
-				msgpkt = MsgPacket()
+				if canSend:
+					connection.Queue(MsgPacket(self.ACK,str(os.getpid())))
 
-				# If there is a new connection on the server socket, handle it.
-				if ready is self.Socket:
-					# Server class handles adding connection to list here
-					connection,remoteAddress,msgpkt = self.AcceptMsg()
+		elif msgpkt.Verb == self.FILE:
+			# Client is sending results, the stream follows this packet : filename, size, compression
+			transfer = self.Transfers.get(data[0])
 
-					ready = connection
-					self.SetBlocking(True,ready)
+			if transfer is None:
+				# Not asked for, take it anyway and throw it away at EOF
+				transfer = FileTransfer(data[0],TmpFilename(folder=TempSpace,prefix="logsearch_unexpected_"))
+				self.Transfers[data[0]] = transfer
 
-					self.AddConnection(connection)
+			transfer.Start(data[1],data[2])
 
-					DbgMsg(f"Remote client connected {ready.getpeername()} with {msgpkt.Verb}")
-				else:
-					self.SetBlocking(True,ready)
-					msgpkt.RecvMsg(ready)
-					DbgMsg(f"Remote client has something to say : {msgpkt.Verb}")
-
-
-				if msgpkt.Verb == self.HELLO:
-					# Hello is a default request for assignments, the thread count tells you how many
-					# The remote client wants. It does not necessarily reflect the total number of
-					# running threads or CPUs.... just what the remote worker wants.
-
-					IPAddress = ready.getpeername()
-					PIDOf = msgpkt.Data[0]
-					threads = int(msgpkt.Data[1])
-					rmMetas = int(msgpkt.Data[2])
-					sendPatterns = int(msgpkt.Data[3])
-
-					# If rmMetas (Remote Metas) is zero, it means we have to pack the
-					# Metas collection for transfer over the network connection
-					if rmMetas == 0:
-						data = self.PackMetas(metas)
-					else:
-						data = ""
-
-					# Determine the lesser of, how many assignments the remote work wants
-					# and how many are available
-					threads = min(threads,logLen)
-
-					# If the number of requested assignments and available assignments is non-zero,
-					# Then assign something
-					if threads > 0 and logLen > 0:
-						# If rmMetas is 0, we packed in the metas to the ACK Response
-						self.SendACK(sock=ready,data=data)
-
-						# Extract "threads" count logs from log list
-						items = logList[-threads:]
-
-						for item in items:
-							remoteAssignment = RemoteAssignment(item,IPAddress,PIDOf)
-							remoteAssignments.append(remoteAssignment)
-							logList.remove(item)
-
-						assignments = []
-						assignments.extend(items)
-
-						ptns = (patterns if sendPatterns > 0 else None)
-						nqry = (namedQueries if sendPatterns > 0 else None)
-
-						callerids = [ "SearchServer::SendAssignments", \
-							"SearchServer::SendAssignment", \
-							"NetworkingBase::WaitReply", \
-							"NetworkingBase::Receive", \
-							"NetworkingBase::SendACK", \
-							"NetworkingBase::SendFIN", \
-							"NetworkingBase::SetBlocking", \
-							"MsgPacket::SendMsg", \
-							"MsgPacket::RecvMsg" ]
-						tracer.SetTraceState(callerids,"none")
-
-						self.SendAssignments(assignments,ptns,nqry,sock=ready)
-
-						tracer.SetTraceState(callerids,"all")
-					else:
-						# If there are no assignments, an empty assignment list means the remote
-						# worker can terminate
-						self.SendNACK(sock=ready)
-
-				elif msgpkt.Verb == self.REJECTED:
-					# add assignments back into logList
-					# remove from remoteAssignments
-					DbgMsg(f"Rejected {data}")
-
-					while msgpkt.Verb != self.FIN:
-						for item in remoteAssignments:
-							if item.Log.Filename == data:
-								item.Track("rejected by remote thread")
-								remoteAssignments.remove(item)
-								logList.append(item.Log)
-								break
-
-						self.SendACK(ready)
-						msgpkt = self.WaitReply(ready)
-
-				elif msgpkt.Verb == self.COMPLETED:
-					# if fname add to list, if network, dump to file, add to list
-					# Data,output == log fname
-
-					filename = msgpkt.Data[0]
-					output = msgpkt.Data[1]
-					PIDOf = int(msgpkt.Data[2])
-
-					DbgMsg(f"Item completed : {filename} - {output}")
-
-					log = None
-
-					# Remove From Remote Assignments since it's done
-					for item in remoteAssignments:
-						if item.Log.Filename == filename:
-							log=item.Log
-							remoteAssignments.remove(item)
-							break
+			connection.Transfer = transfer
 
-					if log:
-						if output == "" or not os.path.exists(output):
-							log.Track("remote thread changed output filename or will transfer over network")
-							# output will be passed back over the connection
-							# place in tmp file, return in completed list
-							output = TmpFilename(prefix="logsearch_",postfix=f"_{log.EncodedDateStr()}")
+			# What was read past this packet is the start of the stream
+			leftover = transfer.Feed(bytes(connection.Inbound))
+			connection.Inbound.clear()
 
-							log.SetOutput(output)
+			if leftover:
+				connection.Inbound += leftover
 
-							self.ReceiveFile(log.Output,connection=ready)
+		elif msgpkt.Verb == self.EOF:
+			# End of a sent file : checksum
+			transfer = connection.Transfer
+			connection.Transfer = None
 
-						completed.append(log)
-						log.Track("search completed by remote thread")
-					else:
-						DbgMsg("***** Item completed but not found in remoteAssignments")
+			item, log = self.Outstanding(transfer.Filename,logList,remoteAssignments) if transfer else ( None, None )
 
-				elif msgpkt.Verb == self.INFORM:
-					# Client sent a generic message
-					Msg("Client is Informing us :\n{}".format(msgpkt.Data.join(",")))
+			if transfer:
+				self.Transfers.pop(transfer.Filename,None)
 
-				elif msgpkt.Verb == self.PING:
-					if self.TerminateRemoteWorkers:
-						DbgMsg(f"Telling {ready.getpeername()} to terminate")
+			if transfer and transfer.Finish(data[0]) and log:
+				self.Claim(transfer.Filename,item,log,logList,remoteAssignments)
 
-						IPAddress = ready.getpeername()
-						PIDOf = int(msgpkt.Data)
+				log.SetOutput(transfer.Output)
+				log.Track(f"search completed by remote thread, {transfer.Size} bytes of results received")
 
-						removables = []
-						# Remove ALL assignments for this Process and Address
-						for item in remoteAssignments:
-							if item.Address == IPAddress and item.ProcessID == PIDOf:
-								removables.append(item)
+				completed.append(log)
 
-						for item in removables:
-							remoteAssignments.remove(item)
+				connection.Queue(MsgPacket(self.ACK,str(os.getpid())))
+			else:
+				if transfer and os.path.exists(transfer.Output):
+					os.remove(transfer.Output)
 
-						self.SendTERM(sock=ready)
-					else:
-						self.SendACK(sock=ready)
+				if item:
+					self.Requeue([ item ],logList,remoteAssignments,"results from remote thread failed their checksum, requeued")
 
-				elif msgpkt.Verb == self.CLOSE and ready != self.Socket:
-					# Client is done with this conversation
-					DbgMsg(f"Client {ready.getpeername()} is closing the connection")
+				connection.Queue(MsgPacket(self.NACK,str(os.getpid())))
 
-					self.Close(ready)
-					self.RemoveConnection(ready)
+		elif msgpkt.Verb == self.INFORM:
+			# Client sent a generic message
+			Msg("Client is Informing us :\n{}".format(",".join(data)))
 
-				elif msgpkt.Verb != self.ACK:
-					# Ignore this, but it probably indicates a failure someplace
-					DbgMsg(f"When receiving from a live connection an unexpected verb was returned : {str(msgpkt.Verb)} {str(msgpkt.Data)}")
+		elif msgpkt.Verb == self.PING:
+			if self.TerminateRemoteWorkers:
+				DbgMsg(f"Telling {connection.Address} to terminate")
 
-				self.SetBlocking(False,ready)
+				pid = data[0] if len(data) > 0 else connection.ProcessID
 
-		tracer.SetTraceState(callerids_tl,"all")
+				# Remove ALL assignments for this Process and Address
+				removables = [ item for item in remoteAssignments if item.Address == connection.Address and str(item.ProcessID) == str(pid) ]
 
-		tracer.Exitting("SearchServer::Process")
+				for item in removables:
+					remoteAssignments.remove(item)
 
-		return completed
+				connection.Queue(MsgPacket(self.TERM,str(os.getpid())))
+			else:
+				connection.Queue(MsgPacket(self.ACK,str(os.getpid())))
+
+		elif msgpkt.Verb == self.CLOSE:
+			# Client is done with this conversation
+			DbgMsg(f"Client {connection.Address} is closing the connection")
+
+			connection.Closing = True
+
+		elif msgpkt.Verb != self.FIN:
+			# Ignore this, but it probably indicates a failure someplace
+			DbgMsg(f"When receiving from a live connection an unexpected verb was returned : {str(msgpkt.Verb)} {str(msgpkt.Data)}")
 
 # Client Class
 class RemoteSearcher(NetworkingBase,App):
@@ -2651,6 +6608,10 @@ class RemoteSearcher(NetworkingBase,App):
 	Connected = None
 	# Patterns Received Flag
 	PatternsReceived = False
+	# Aggregation spec received with the patterns (see Aggregate.Unpack), None for plain results
+	Aggregation = None
+	# Compress results sent back to the server
+	Compress = False
 
 	# Init Client
 	def __init__(self,host=None,port=DefaultPort,socketFamily=socket.AF_INET,socketType=socket.SOCK_STREAM,encoding=None):
@@ -2673,14 +6634,14 @@ class RemoteSearcher(NetworkingBase,App):
 	def Print(self):
 		self.Pfmt("Connected",self.Connected)
 		self.Pfmt("PatternsReceived",self.PatternsReceived)
+		self.Pfmt("Aggregation",self.Aggregation)
 
 		NetworkingBase.Print(self)
 		App.Print(self)
 
 	# Connect To Remote Server
+	@Traced("RemoteSearcher::Connect")
 	def Connect(self,waitfor=None,retry=True):
-		tracer.Entering("RemoteSearcher::Connect")
-
 		if waitfor is None:
 			waitfor = DefaultConnectionWait
 
@@ -2716,36 +6677,26 @@ class RemoteSearcher(NetworkingBase,App):
 			except Exception as err:
 				Msg("RemoteSearcher::Connect - {} {}".format(type(err),err))
 
-		tracer.Exitting("RemoteSearcher::Connect")
-
 		return self.Connected
 
 	# Complete Ping Solution
+	@Traced("RemoteSearcher::Ping")
 	def Ping(self,payload=None):
-		tracer.Entering("RemoteSearcher::Ping")
-
 		msgpkt = MsgPacket(self.NACK,"")
 
 		if self.Connected:
 			msgpkt = self.SendPING(payload=payload)
 
-		tracer.Exitting("RemoteSearcher::Ping")
-
 		return msgpkt
 
 	# Send Inform message
 	def Inform(self,msg):
-		tracer.Entering("RemoteSeacher::Inform")
-
 		if self.Connected:
 			self.SendINFORM(payload)
 
-		tracer.Exitting("RemoteSearcher::Inform")
-
 	# Unpack Requested Metas
+	@Traced("RemoteSearcher::UnpackMetas")
 	def UnpackMetas(self,data):
-		tracer.Entering("RemoteSearcher::UnpackMetas")
-
 		metas = []
 
 		while len(data) > 0:
@@ -2754,15 +6705,12 @@ class RemoteSearcher(NetworkingBase,App):
 
 			metas.append(meta)
 
-		tracer.Exitting("RemoteSearcher::UnpackMetas")
-
 		return metas
 
 	# Disconnect - Alias - Call Close
+	@Traced("RemoteSearcher::Disconnect")
 	def Disconnect(self):
-		tracer.Entering("RemoteSearcher::Disconnect")
-
-		msgpkt = MsgPacket(self.CLOSE,str(os.getpid()))
+		msgpkt = self.Packet(self.CLOSE,str(os.getpid()))
 
 		msgpkt.SendMsg(self.Socket)
 
@@ -2770,16 +6718,13 @@ class RemoteSearcher(NetworkingBase,App):
 
 		self.Connected = False
 
-		tracer.Exitting("RemoteSearcher::Disconnect")
-
 	# Send String To Server (assumes socket already connected)
 	def SendStr(self,msg):
 		self.Socket.sendall(bytes(msg,encoding=self.Encoding))
 
 	# Check for Assignment File Availability
+	@Traced("RemoteSearcher::CheckAvailability")
 	def CheckAvailability(self,assignments,altmount=None):
-		tracer.Entering("RemoteSearcher::CheckAvailability")
-
 		available = []
 		rejected = []
 
@@ -2811,14 +6756,11 @@ class RemoteSearcher(NetworkingBase,App):
 				log.Track("log is not available,rejected")
 				rejected.append(log)
 
-		tracer.Exitting("RemoteSearcher::CheckAvailability")
-
 		return available, rejected
 
 	# Connect to server, ask for assignments
+	@Traced("RemoteSearcher::GetAssignments")
 	def GetAssignments(self,metas,threadCount=1):
-		tracer.Entering("RemoteSearcher::GetAssignments")
-
 		callerids = [ "NetworkingBase::SendHELLO", \
 			"NetworkingBase::WaitReply", \
 			"RemoteSearcher::UnpackMetas", \
@@ -2864,30 +6806,31 @@ class RemoteSearcher(NetworkingBase,App):
 			# If we sent "0" in the metas field to the server, we can expect
 			# that metas were packed into the ACK reply.
 			if len(metas) == 0:
-				metas.extend(self.UnpackMetas(data))
+				metas.extend(self.UnpackMetas(msgpkt.Data))
 
 			msgpkt.Verb = self.ASSIGN
 
-			validVerbs = [ self.ASSIGN, self.PATTERN, self.NAMEDQUERY ]
+			validVerbs = [ self.ASSIGN, self.PATTERN, self.NAMEDQUERY, self.AGGREGATE ]
 			termVerbs = [ self.FIN, self.TERM ]
 
 			# For Patterns and NamedQueries, the server will only send them once.
 			while msgpkt.Verb in validVerbs:
-				patterns = [ ]
-
-				msgpkt.RecvMsg(self.Socket)
+				msgpkt = self.RecvPacket(self.Socket)
 
 				verb = msgpkt.Verb
 				lines = msgpkt.Data
 
-				if verb == self.ASSIGN:
-					DbgMsg("Received assignment")
+				if verb == self.ASSIGNBATCH:
+					# Everything in one packet, one ACK and nothing follows
+					DbgMsg("Received assignment batch")
 
-					meta = app.FindMeta(lines[0],metas)
-					log = Log(lines[1],meta)
-					log.Output = lines[2]
+					self.UnpackBatch(lines,metas,assignments,patterns,namedQueries)
+					self.SendACK()
+					break
+				elif verb == self.ASSIGN:
+					DbgMsg("Received assignment")
 
-					assignments.append(log)
+					assignments.append(self.UnpackAssignment(lines,metas))
 				elif verb == self.PATTERN:
 					for pattern in lines:
 						patterns.append(pattern)
@@ -2896,6 +6839,9 @@ class RemoteSearcher(NetworkingBase,App):
 					for namedQuery in lines:
 						namedQueries.append(namedQuery)
 
+				elif verb == self.AGGREGATE:
+					self.Aggregation = lines[0]
+
 				elif not verb in validVerbs and not verb in termVerbs:
 					DbgMsg(f"Unexpected verb received = {verb}")
 
@@ -2913,20 +6859,56 @@ class RemoteSearcher(NetworkingBase,App):
 
 		tracer.SetTraceState(callerids,"all")
 
-		tracer.Exitting("RemoteSearcher::GetAssignments")
-
 		return assignments, patterns, namedQueries
 
+	# Assignment From Its Lines (Meta Name, Filename, Output)
+	def UnpackAssignment(self,lines,metas):
+		meta = None
+
+		for candidate in metas:
+			if candidate.Name == lines[0]:
+				meta = candidate
+				break
+		else:
+			meta = self.FindMeta(lines[0],metas)
+
+		# The file may not be visible here, CheckAvailability sorts that out
+		log = Log(lines[1],meta,size=(os.path.getsize(lines[1]) if os.path.exists(lines[1]) else 0))
+		log.Output = lines[2]
+
+		return log
+
+	# Unpack An Assignment Batch Into assignments, patterns And namedQueries (And The Aggregation)
+	def UnpackBatch(self,lines,metas,assignments,patterns,namedQueries):
+		counts = [ int(count) for count in lines[0].split() ]
+		patternCount, queryCount, assignmentCount = counts[:3]
+		aggregationCount = counts[3] if len(counts) > 3 else 0
+
+		position = 1
+
+		patterns.extend(lines[position:position + patternCount])
+		position += patternCount
+
+		namedQueries.extend(lines[position:position + queryCount])
+		position += queryCount
+
+		if aggregationCount > 0:
+			self.Aggregation = lines[position]
+			position += aggregationCount
+
+		for index in range(assignmentCount):
+			assignments.append(self.UnpackAssignment(lines[position:position + 3],metas))
+			position += 3
+
 	# Send Back Rejected Assignments
+	@Traced("RemoteSearcher::Reject")
 	def Reject(self,assignments):
-		tracer.Entering("RemoteSearcher::Reject")
-
 		succeeded = True
 
 		for assignment in assignments:
-			msgpkt = MsgPacket(self.REJECTED,assignment.Filename)
+			msgpkt = self.Packet(self.REJECTED,assignment.Filename)
 
-			msgpkt.Send(self.Socket)
+			msgpkt.SendMsg(self.Socket)
 
 			msgpkt = self.WaitReply()
 
@@ -2936,45 +6918,261 @@ class RemoteSearcher(NetworkingBase,App):
 
 		self.SendFIN()
 
-		tracer.Exitting("RemoteSearcher::Reject")
-
 		return succeeded
 
 	# Send Informational Packet Back To Server
 	def Inform(self,msg):
-		msgpkt = MsgPacket(self.INFORM,msg)
+		msgpkt = self.Packet(self.INFORM,msg)
 
 		msgpkt.Send(self.Socket)
 
-	# Tell Server An Assignment Has Been Completed
-	def Completed(self,log):
-		tracer.Entering("RemoteSearcher::Completed")
+	# Tell Server Assignments Have Been Completed, Pipelined, All Packets First And Then All Replies
+	@Traced("RemoteSearcher::Completed")
+	def Completed(self,logs):
+		"""Returns A List Of Succeeded Flags, One Per Log, A Single Log May Be Given"""
 
-		# Log.Output original or other, if other gets blank output then file transfer
-		# if Tag is not None, then path was changed, Tag is the original
-		filename = log.Filename
-		output = log.Output
+		if not type(logs) is list:
+			logs = [ logs ]
 
-		if log.Tag:
-			DbgMsg("Using Tag in RS:Completed...why")
-			filename = log.Tag[0]
-			output = log.Tag[1]
+		# Servers that speak the newer protocol reply, asking for the results when they can't reach them
+		canSend = self.Protocol >= 2
 
-		msgpkt = MsgPacket(self.COMPLETED,[ filename, output, str(os.getpid()) ])
+		results = []
 
-		msgpkt.SendMsg(self.Socket)
+		for log in logs:
+			# Log.Output original or other, if other gets blank output then file transfer
+			# if Tag is not None, then path was changed, Tag is the original
+			filename = log.Filename
+			output = log.Output
+
+			if log.Tag:
+				DbgMsg("Using Tag in RS:Completed...why")
+				filename = log.Tag[0]
+				output = log.Tag[1]
+
+			msgpkt = self.Packet(self.COMPLETED,[ filename, output, str(os.getpid()) ] + ([ "1" ] if canSend else []))
+
+			results.append(( log, filename, msgpkt.SendMsg(self.Socket) ))
+
+		# Replies come back in order, transfers wait until all of them are in so a
+		# transfer's own ACK can't be mistaken for the reply to a later completion
+		replies = [ (self.WaitReply() if canSend and sent else None) for log,filename,sent in results ]
+
+		succeeded = []
+
+		for ( log, filename, sent ), msgpkt in zip(results,replies):
+			if msgpkt is None:
+				succeeded.append(sent)
+			elif msgpkt.Verb == self.FILE:
+				offset = int(msgpkt.Data[1])
+
+				DbgMsg(f"Server asked for {log.Output} from byte {offset}")
+
+				sent = self.SendFile(log.Output,offset=offset,name=filename,compress=self.Compress)
+
+				# The server has its own copy now
+				if sent and os.path.exists(log.Output):
+					os.remove(log.Output)
+
+				succeeded.append(sent)
+			else:
+				succeeded.append(msgpkt.Verb == self.ACK)
+
+				# Turned down (a duplicate, the lease ran out and someone else finished it), nobody will read it
+				if msgpkt.Verb == self.NACK and log.Output and os.path.exists(log.Output):
+					os.remove(log.Output)
+
+		return succeeded
+
+# Client Link : Talks To The Server On Its Own Thread, So Local Workers Never Wait On A Round Trip
+class ClientLink(TitleValueFormatter,Taggable):
+	"""Reports Completions And Keeps Window Assignments Held (Running Or Queued), Only This Thread Uses The Socket"""
+
+	# Seconds between pings while there is nothing else to say
+	PingInterval = 5
+	# Failed pings in a row before the server is taken as gone
+	PingLimit = 5
+
+	# Search Manager (its RemoteSearcher and FetchAssignments)
+	Manager = None
+	# Assignments to hold, running plus queued
+	Window = 0
+	# Assignments received and not yet completed locally (running or queued)
+	Held = 0
+	# Completed locally, not yet reported to the server
+	Unreported = 0
+	# Server had nothing to give the last time it was asked
+	Exhausted = False
+	# When the server was last asked and had nothing
+	ExhaustedAt = None
+	# Server told us to terminate
+	Terminated = False
+	# Server stopped answering
+	Failed = False
+	# Completed logs waiting to be reported
+	Completions = None
+	# Received ( logs, patterns, namedQueries ) waiting for the search manager
+	Arrivals = None
+	# Guards Held, Unreported and Exhausted
+	Lock = None
+	# Set when there is something to report
+	Wake = None
+	# Set to stop the link
+	Stopping = None
+	# Link thread
+	Thread = None
+
+	# Init Instance
+	def __init__(self,manager,window,held=0):
+		self.Manager = manager
+		self.Window = window
+		self.Held = held
+		self.Unreported = 0
+		self.Exhausted = False
+		self.ExhaustedAt = None
+		self.Terminated = False
+		self.Failed = False
+		self.Completions = queue.Queue()
+		self.Arrivals = queue.Queue()
+		self.Lock = threading.Lock()
+		self.Wake = threading.Event()
+		self.Stopping = threading.Event()
+		self.Thread = None
+
+	# Print State
+	def Print(self):
+		self.Pfmt("Window",self.Window)
+		self.Pfmt("Held",self.Held)
+		self.Pfmt("Unreported",self.Unreported)
+		self.Pfmt("Exhausted",self.Exhausted)
+		self.Pfmt("Terminated",self.Terminated)
+		self.Pfmt("Failed",self.Failed)
+		self.Pfmt("Completions",self.Completions.qsize())
+		self.Pfmt("Arrivals",self.Arrivals.qsize())
+		self.Pfmt("Tag",self.Tag)
 
-		# If output == "" then we have to transfer over net
-		# This code here is does not work, output will never be ""
-		# We have to know *IF* the provided path and altmount failed
-		# Then output will be the local path to the output file
-		# Then IT can be sent back
-		# TODO: Fix
-		if output == "":
-			DbgMsg("Sending file???")
-			self.SendFile(output)
+	# Start Link Thread
+	def Start(self):
+		self.Thread = threading.Thread(target=self.Run,name="ClientLink",daemon=True)
+		self.Thread.start()
+
+	# Stop Link Thread (Completions Not Yet Reported Are Dropped)
+	def Stop(self):
+		self.Stopping.set()
+		self.Wake.set()
+
+		if self.Thread:
+			self.Thread.join()
+
+	# Queue A Completed Log For Reporting, Its Slot In The Window Is Free Right Away
+	def Report(self,log):
+		with self.Lock:
+			self.Held -= 1
+			self.Unreported += 1
+
+		self.Completions.put(log)
+		self.Wake.set()
+
+	# New Assignments Received So Far, As ( logs, patterns, namedQueries )
+	def Take(self):
+		logs = []
+		patterns = []
+		namedQueries = []
+
+		while True:
+			try:
+				received, receivedPatterns, receivedQueries = self.Arrivals.get_nowait()
+			except queue.Empty:
+				break
+
+			logs.extend(received)
+			patterns.extend(receivedPatterns)
+			namedQueries.extend(receivedQueries)
+
+		return logs, patterns, namedQueries
+
+	# Everything Held Was Reported And The Server Has Nothing More
+	def Done(self):
+		with self.Lock:
+			return self.Held == 0 and self.Unreported == 0 and self.Exhausted
+
+	# Link Loop
+	def Run(self):
+		client = self.Manager.Client
+
+		lastHeard = datetime.now()
+		pingFailed = 0
+
+		while not self.Stopping.is_set():
+			self.Wake.clear()
+
+			busy = False
+
+			# Top the window up first, a worker may be waiting on it, then report completions.
+			# Once the server runs dry it is only asked again every PingInterval, requeues are rare
+			with self.Lock:
+				wanted = self.Window - self.Held
+
+				if self.Exhausted and (datetime.now() - self.ExhaustedAt).seconds < self.PingInterval:
+					wanted = 0
+
+			if wanted > 0:
+				try:
+					available, patterns, namedQueries = self.Manager.FetchAssignments(wanted)
+				except Exception as err:
+					Msg(f"*** An error occurred asking for assignments - {err}",ignoreModuleMode=True)
+					self.Failed = True
+					break
+
+				with self.Lock:
+					if len(available) > 0:
+						self.Held += len(available)
+						self.Exhausted = False
+						self.Arrivals.put(( available, patterns, namedQueries ))
+					else:
+						self.Exhausted = True
+						self.ExhaustedAt = datetime.now()
+
+				busy = True
+
+			logs = []
+
+			while True:
+				try:
+					logs.append(self.Completions.get_nowait())
+				except queue.Empty:
+					break
+
+			if len(logs) > 0 and not self.Stopping.is_set():
+				# Everything waiting goes in one round trip
+				client.Completed(logs)
 
-		tracer.Exitting("RemoteSearcher::Completed")
+				with self.Lock:
+					self.Unreported -= len(logs)
+
+				busy = True
+
+			if busy:
+				lastHeard = datetime.now()
+			elif (datetime.now() - lastHeard).seconds >= self.PingInterval:
+				lastHeard = datetime.now()
+
+				msgpkt = client.Ping()
+
+				if msgpkt.Verb == client.TERM:
+					self.Terminated = True
+					break
+				elif msgpkt.Verb in [ None, "none" ]:
+					pingFailed += 1
+
+					# If ping failed too many times, parent remote thread probably died
+					if pingFailed > self.PingLimit:
+						self.Failed = True
+						break
+				else:
+					pingFailed = 0
+			else:
+				self.Wake.wait(0.25)
 
 # Search and Search Server/Client Management
 class SearchManager(App):
@@ -2983,7 +7181,7 @@ class SearchManager(App):
 	# Log Metas
 	LogMetas = []
 	# In Scope Logs
-	Logs = []
+	Logs = KeyedList()
 	# Patterns pulled in from Cmd Line
 	Patterns = []
 	# Named Queries pulled in from Cmd Line
@@ -2992,14 +7190,26 @@ class SearchManager(App):
 	Streamers = []
 	# Max Threads for this host
 	MaxThreads = 1
+	# Logs at least this many MiB are split across threads (0 disables)
+	DefaultSplitSize = 1024
+	# Assignments a client holds queued beyond its running threads
+	DefaultPrefetch = 2
+	# Index builder : seconds a log must go unmodified to count as rotated, seconds between daemon passes,
+	# load average per CPU above which new builds wait, and the niceness of the build workers
+	DefaultSettle = 300
+	DefaultIndexInterval = 300
+	DefaultMaxLoad = 0.75
+	DefaultNice = 19
 	# Potential limit on lines pulled from each file
 	LineLimit = -1
 	# Active Thread List
 	Threads = []
 	# List of completed log searches with output
 	OutputQueue = []
-	# Output Ordering Map
-	OutputOrdering = []
+	# Output Ordering (see OutputOrder), completed logs wait here for release with --inorder
+	OutputOrdering = OutputOrder()
+	# Result Merge (see ResultMerge), completed logs are merged by timestamp with --merge
+	Merger = None
 	# Thread Executor
 	Executor = None
 	# Search Server
@@ -3007,10 +7217,44 @@ class SearchManager(App):
 	# Client Searcher
 	Client = None
 	# Remote Assignments List
-	RemoteAssignments = []
+	RemoteAssignments = KeyedList(logof=lambda assignment: assignment.Log)
 	# List of Completed Logs (local and remote)
-	CompletedLogs = []
-	# Index Flag (deprecated, never going to use)
+	CompletedLogs = KeyedList()
+	# Shards of split logs waiting for a local thread (never handed to remote clients)
+	PendingShards = []
+	# Completed shards of split logs, by parent log ID, in shard order
+	Shards = {}
+	# Result spools of streamed logs, by log ID (see ResultStream)
+	Spools = {}
+	# Log whose results are written as they arrive, instead of spooled
+	LiveLog = None
+	# Bytes of streamed results held in memory
+	Backlog = 0
+	# In memory result budget in MiB, spools are spilled to disk beyond it
+	DefaultMemBudget = 256
+	# Result cache size in MiB, least recently used entries are evicted beyond it
+	DefaultCacheBudget = 1024
+	# Queue workers stream results on
+	ResultQueue = None
+	# Where results go (stdout or --out)
+	OutputFile = None
+	# Record format of named group matches (see ResultFormat), None writes text
+	Format = None
+	# Counts by named groups instead of the matches (see Aggregate), None writes the matches
+	Aggregate = None
+	# Output of earlier searches over unchanged logs (see ResultCache), None when off
+	Cache = None
+	# Cost Model (see CostModel), orders the log list and predicts the makespan
+	Costs = None
+	# Predicted makespan of the local threads in seconds
+	PredictedMakespan = None
+	# Last time a local worker finished
+	LastCompletion = None
+	# A remote assignment this many times overdue (against its predicted cost) is searched locally too
+	StealAfter = 2.0
+	# ... once it has been out at least this many seconds
+	StealMinimum = 10
+	# Use token index sidecars where they exist (see TokenIndex), --noindex turns it off
 	IndexOn = None
 	# Cmd Line Args (ArgParser)
 	Arguments = None
@@ -3058,6 +7302,10 @@ class SearchManager(App):
 		self.Pfmt("Client",("Is a client" if self.Client else "not a client"))
 		self.Pfmt("RemoteAssignments",len(self.RemoteAssignments))
 		self.Pfmt("CompletedLogs",len(self.CompletedLogs))
+		self.Pfmt("PendingShards",len(self.PendingShards))
+		self.Pfmt("Split Logs",len(self.Shards))
+		self.Pfmt("Spools",len(self.Spools))
+		self.Pfmt("Backlog",self.Backlog,postfix="bytes")
 		self.Pfmt("IndexOn",(self.IndexOn if self.IndexOn else "No Index"))
 		self.Pfmt("Arguments",self.Arguments)
 
@@ -3097,7 +7345,10 @@ class SearchManager(App):
 	# Init Executor Convenience Function
 	def InitExecutor(self,maxthreads):
 		self.MaxThreads = maxthreads
-		self.Executor = ProcessPoolExecutor(maxthreads)
+		self.TerminateEvent = multiprocessing.Event()
+		# Bounded, a manager that falls behind slows the workers instead of growing without limit
+		self.ResultQueue = multiprocessing.Queue(maxsize=64 * maxthreads)
+		self.Executor = ProcessPoolExecutor(maxthreads,initializer=InitWorker,initargs=(self.TerminateEvent,self.ResultQueue))
 
 	# Set Max Worker Threads
 	def SetMaxThreads(self,maxthreads=None,reserve=True):
@@ -3114,6 +7365,36 @@ class SearchManager(App):
 		else:
 			self.MaxThreads = maxthreads if maxthreads > 0 else 1
 
+	# Helper Function for Getting Block Engine Read Size (cmdline is in MiB)
+	def BlockSize(self):
+		return int(float(self.Arguments.blocksize) * 1024 * 1024) if self.Arguments.blocksize else BlockScanner.DefaultBlockSize
+
+	# Helper Function for Getting Minimum Size (cmdline is in MiB) Of Logs To Split Across Threads
+	def SplitSize(self):
+		return int(float(self.Arguments.splitsize or self.DefaultSplitSize) * 1024 * 1024)
+
+	# Helper Function for Getting The Client Prefetch Window
+	def Prefetch(self):
+		return int(self.Arguments.prefetch if self.Arguments.prefetch is not None else self.DefaultPrefetch)
+
+	# Helper Function for Getting In Memory Result Budget (cmdline is in MiB)
+	def MemBudget(self):
+		return int(float(self.Arguments.membudget or self.DefaultMemBudget) * 1024 * 1024)
+
+	# Helper Function for Getting The Result Cache Budget (cmdline is in MiB)
+	def CacheBudget(self):
+		return int(float(self.Arguments.cachebudget or self.DefaultCacheBudget) * 1024 * 1024)
+
+	# Everything Besides The Patterns That Shapes A Log's Output, Part Of The Result Cache Key
+	def CacheSettings(self):
+		return [
+			self.Format.Records,
+			(self.Format.Columns if self.Format.Structured() else None),
+			(self.Aggregate.Pack() if self.Aggregate else None),
+			self.LineLimit,
+			self.Arguments.decodefirst
+		]
+
 	# Helper Funtion for Getting Waittime on client.Connect()
 	def WaitTime(self,defaultTimeout=DefaultConnectionWait):
 		return int(self.Arguments.clientwait or str(defaultTimeout))
@@ -3130,38 +7411,29 @@ class SearchManager(App):
 			Msg(f"Supplied expression file {filename} does not exist")
 
 	# Parse comma seperated patterns
+	@Traced("SearchManager::ParsePatterns")
 	def ParsePatterns(self,pattern_str):
-		tracer.Entering("SearchManager::ParsePatterns")
-
 		prog = re.compile(r"(?<!\\),")
 		patterns = prog.split(pattern_str)
 
 		for pattern in patterns:
 			self.Patterns.append(pattern)
 
-		tracer.Exitting("SearchManager::ParePatterns")
-
 	# Parser comma Seperated Stream Filters
+	@Traced("SearchManager::ParseStreamFilters")
 	def ParseStreamFilters(self,filters):
-		tracer.Entering("SearchManager::ParseStreamFilters")
-
 		names = filters.split(",")
 
 		self.Streamers.extend(names)
 
-		tracer.Exitting("SearchManager::ParseStreamFilters")
-
 	# Parse comma seperated Named Queries
+	@Traced("SearchManager::ParseNamedQueries")
 	def ParseNamedQueries(self,queries):
-		tracer.Entering("SearchManager::ParseNamedQueries")
-
 		patterns = re.split(",",queries)
 
 		for pattern in patterns:
 			self.NamedQueries.append(pattern)
 
-		tracer.Exitting("SearchManager::ParseNamedQueries")
-
 	# Deprecated 3/3/2022
 	# Show Log Info
 	# Params:
@@ -3266,7 +7538,7 @@ class SearchManager(App):
 		# Logs, Logs Processed, Logs to Go
 
 		msg = ("=" * 10) + f"\nTotal Logs {len(self.Logs) + len(self.OutputQueue)}"
-		msg += f" / Completed {len(self.CompletedLogs)} / Processed {len(self.OutputQueue)}"
+		msg += f" / Completed {len(self.CompletedLogs)} / Processed {len(self.OutputQueue)} / Waiting On Order {self.OutputOrdering.Waiting()}"
 		Msg(msg,ignoreModuleMode=True)
 
 		msg = f"Threads {len(self.Threads)}"
@@ -3283,7 +7555,7 @@ class SearchManager(App):
 		Msg("=" * 10,ignoreModuleMode=True)
 		if len(self.Server.Connections):
 			for conn in self.Server.Connections:
-				Msg("Connected {}".format(str(conn.getpeername()),ignoreModuleMode=True))
+				Msg("Connected {}".format(str(conn.Address)),ignoreModuleMode=True)
 		else:
 			Msg("No current connections",ignoreModuleMode=True)
 
@@ -3395,49 +7667,45 @@ class SearchManager(App):
 		return proceed
 
 	# Get Log Metas (Deprecated 3/3/2022)
+	@Traced("SearchManager::GetLogMetas")
 	def GetLogMetas(self,filename):
-		tracer.Entering("SearchManager::GetLogMetas")
-
 		if os.path.exists(filename):
 			self.LogMetas.extend(self.LoadLogMeta(filename))
 
-		tracer.Exitting("SearchManager::GetLogMetas")
-
 		return self.LogMetas
 
 	# Determine if item (Filename or Log instance) Exists In self.Logs List
+	@Traced("SearchManager::AlreadyInLogs")
 	def AlreadyInLogs(self,item):
-		tracer.Entering("SearchManager::AlreadyInLogs")
-
-		flag = False
-
-		filename = ""
-
-		if type(item) is str:
-			filename = item
-		else:
-			filename = item.Filename
-
-		for log in self.Logs:
-			if log.Filename == filename:
-				flag = True
-				break
-
-		tracer.Exitting("SearchManager::AlreadyInLogs")
+		# Logs is a KeyedList, membership is by real path or inode
+		flag = item in self.Logs
 
 		return flag
 
 	# Create Output Ordering Map based on dates
 	def CreateOrderMap(self,reverse=False):
-		self.OutputOrdering.clear()
-		self.OutputOrdering.extend(self.Logs)
+		self.OutputOrdering = OutputOrder(self.Logs,reverse=reverse)
+
+	# Select Metas By Name, Nickname Or Log Group (All Of Them Without Nicks)
+	def SelectMetas(self,logNicks,includeAll=False):
+		selected_metas = []
+
+		for meta in self.LogMetas:
+			if meta.Status == "good" or includeAll:
+				if len(logNicks) > 0:
+					for nick in logNicks:
+						DbgMsg(f"Checking {nick} against {meta.Name}")
+						if nick in meta.LogGroups or nick == meta.LogGroup or nick == meta.Nickname or nick == meta.Name:
+							selected_metas.append(meta)
+							break
+				else:
+					selected_metas.append(meta)
 
-		self.OutputOrdering.sort(key=lambda log: log.EncodedDate,reverse=reverse)
+		return selected_metas
 
 	# Get List of In Scope Logs by Date Criteria
+	@Traced("SearchManager::GetLogList")
 	def GetLogList(self):
-		tracer.Entering("SearchManager::GetLogList")
-
 		lm = self.LogMetas[0]
 
 		searchThru = []
@@ -3502,54 +7770,117 @@ class SearchManager(App):
 
 		DbgMsg(f"Nicks = {logNicks}")
 
-		selected_metas = []
-		for meta in self.LogMetas:
-			if meta.Status == "good" or args.all:
-				if len(logNicks) > 0:
-					for nick in logNicks:
-						DbgMsg(f"Checking {nick} against {meta.Name}")
-						if nick in meta.LogGroups or nick == meta.LogGroup or nick == meta.Nickname or nick == meta.Name:
-							selected_metas.append(meta)
-							break
-				else:
-					selected_metas.append(meta)
+		selected_metas = self.SelectMetas(logNicks,args.all)
 
-		# Look Through storage locations for matching files
-		for logFolder in self.StorageLocations:
-			for meta in selected_metas:
-				matching_logs = meta.GetLogFiles(folder=logFolder,startDate=startDate,endDate=endDate)
+		# Each storage location is scanned once (or refreshed from the stored catalog), for all selected metas
+		with LogCatalog.Default(selected_metas) as catalog:
+			# Look Through storage locations for matching files
+			for logFolder in self.StorageLocations:
+				for meta in selected_metas:
+					matching_logs = meta.GetLogFiles(folder=logFolder,startDate=startDate,endDate=endDate,catalog=catalog)
 
-				for logObj in matching_logs:
-					if not self.AlreadyInLogs(logObj):
-						logObj.Output = TmpFilename(file=logObj.Filename)
-						self.Logs.append(logObj)
+					for logObj in matching_logs:
+						if not self.AlreadyInLogs(logObj):
+							logObj.Output = TmpFilename(file=logObj.Filename)
+							self.Logs.append(logObj)
 
-		# Create an Ordering Map for the file (for later output ordering)
-		self.CreateOrderMap()
+		# Create an Ordering Map for the file (for later output ordering), merged output is ordered by line
+		if args.inorder and not args.merge:
+			self.CreateOrderMap()
+		else:
+			self.OutputOrdering.clear()
 
-		# If in server mode, sort the logs by size
-		# The purpose of which is local threads will be allocated larger files
-		# and remote threads will be allocated smaller ones.
-		# The list is sorted from largest to smallest. Accordingly, allocate
-		# local threads from the top of the list, remote threads from
-		# the tail of the list.
-		if args.server:
-			sortedLogList = sorted(self.Logs,key=lambda log : log.Size,reverse=True)
+		self.Merger = (ResultMerge(self.Logs) if args.merge else None)
 
-			self.Logs = sortedLogList
+		# Longest processing time first : sorted by predicted cost, smallest to largest. Local threads
+		# and remote clients both take from the tail, so the most expensive logs start first and
+		# the small ones fill in at the end, instead of one late big log dominating the tail.
+		self.Costs = CostModel.Default(args.engine,len(self.Patterns) + len(self.NamedQueries))
 
-		tracer.Exitting("SearchManager::GetLogList")
+		# Sorted in place, keeps the KeyedList index
+		self.Logs.sort(key=self.Costs.Cost)
 
 		return self.Logs
 
+	# Split Log Into Shards When It Is Large And Splittable
+	@Traced("SearchManager::SplitLog")
+	def SplitLog(self,log):
+		"""Split A Large Log Into Shards For Local Threads, None If It Can't Be Split"""
+
+		shards = None
+
+		splitsize = self.SplitSize()
+
+		# --limit counts per search, shards would each return up to the limit
+		if splitsize <= 0 or log.Size < splitsize or self.MaxThreads < 2 or log.Range or self.LineLimit > 0:
+			pass
+		elif not ".gz" in log.Filename:
+			ranges = log.LineRanges(self.MaxThreads)
+
+			if len(ranges) > 1:
+				shards = [ log.Shard(start,end,count) for count, (start, end) in enumerate(ranges) ]
+		else:
+			index = GzipIndex(log.Filename)
+
+			if index.Load():
+				ranges = index.Ranges(self.MaxThreads)
+
+				if len(ranges) > 1:
+					shards = [ log.Shard(start,end,count) for count, (start, end) in enumerate(ranges) ]
+				else:
+					log.Track("single member gzip, can't be split")
+			elif self.Arguments.gzindex:
+				# Searched whole this time, the index lets later searches split it
+				log.IndexFile = index.IndexFile
+				log.Track("no gzip index, recording one during search")
+
+		if shards:
+			log.Track(f"split into {len(shards)} shards")
+			self.Shards[log.ID] = [ None ] * len(shards)
+
+		return shards
+
+	# Shard Completed, When All Shards Of The Parent Are Done, Join Output And Queue Parent
+	@Traced("SearchManager::ShardCompleted")
+	def ShardCompleted(self,shard):
+		parent = shard.Parent
+		completed = self.Shards[parent.ID]
+
+		completed[shard.ShardIndex] = shard
+
+		if all(completed) and parent.Streamed:
+			# Streamed shards stay spooled, the parent's spool writes them in file order
+			self.Spools[parent.ID] = ResultSpool(parent,parts=[ self.Spools[item.ID] for item in completed ])
+
+			del self.Shards[parent.ID]
+
+			parent.Track(f"search completed in {len(completed)} shards")
+			self.QueueOutput(parent)
+		elif all(completed):
+			# Shards are joined in file order so output matches an unsplit search
+			with open(parent.Output,"wb") as f_out:
+				for item in completed:
+					if item.Output and os.path.exists(item.Output):
+						with open(item.Output,"rb") as f_in:
+							shutil.copyfileobj(f_in,f_out)
+
+						os.remove(item.Output)
+
+			del self.Shards[parent.ID]
+
+			parent.Track(f"search completed in {len(completed)} shards")
+			self.QueueOutput(parent)
+
 	# Create Search Workers
+	@Traced("SearchManager::CreateWorkers")
 	def CreateWorkers(self,clientmode=False):
 		global TempSpace
 
-		tracer.Entering("SearchManager::CreateWorkers")
-
-		while len(self.Threads) < self.MaxThreads and len(self.Logs) > 0:
-			log = self.Logs.pop()
+		while len(self.Threads) < self.MaxThreads and (len(self.PendingShards) > 0 or len(self.Logs) > 0):
+			if len(self.PendingShards) > 0:
+				log = self.PendingShards.pop(0)
+			else:
+				log = self.Logs.pop()
 
 			self.Tag = ( log, "CreateWorkers::Popped" )
 
@@ -3565,9 +7896,13 @@ class SearchManager(App):
 			# full dump will occur and with named queries that is undesirable
 			if len(self.NamedQueries) > 0 and len(thread_patterns) == 0:
 				DbgMsg(f"No expressions and no named queries, skipping {log.Name}")
+				self.WithdrawOutput(log)
 				continue
 
-			Msg(f"Searching {log.Filename}...")
+			if log.Parent:
+				DbgMsg(f"Searching shard {log.ShardIndex} of {log.Filename}...")
+			else:
+				Msg(f"Searching {log.Filename}...")
 
 			# Output Scenarios
 			# Clients default, dump into (default or alternate) NFS share
@@ -3591,19 +7926,63 @@ class SearchManager(App):
 					# Default to source folder of file
 					log.SetOutput(TmpFilename(file=log.Filename,prefix=prefix,postfix=postfix))
 
-			log.Track("processing by local thread")
+			# Local searches stream results back, clients keep files for the server to collect
+			if not log.Parent:
+				log.Streamed = not clientmode
+
+				# Shards are copies, they inherit the sidecar
+				if self.IndexOn:
+					index = TokenIndex(log.Filename)
+
+					if os.path.exists(index.IndexFile):
+						log.TokenIndexFile = index.IndexFile
+
+				if log.Streamed:
+					log.SetOutput(None)
+
+				log.Decompressor = self.Arguments.decompressor
+
+				shards = self.SplitLog(log)
+
+				if shards:
+					self.PendingShards.extend(shards)
+					continue
+			elif log.Streamed:
+				log.SetOutput(None)
+
+			if log.Streamed:
+				self.Spools[log.ID] = ResultSpool(log)
+
+			search = ( log,thread_patterns,self.Streamers,self.LineLimit,None,not self.Arguments.decodefirst,self.Arguments.engine,self.BlockSize(),self.Format,self.Aggregate )
+
+			# Unchanged logs searched the same way before are replayed from the result cache
+			key = self.Cache.Key(log,thread_patterns,self.CacheSettings()) if self.Cache and not clientmode else None
+			cached = self.Cache.Lookup(key,log) if key else None
+
+			log.CacheFile = self.Cache.Path(key) if key and not cached else None
+
+			if cached:
+				# A replay would teach the cost model nothing
+				log.Started = None
+
+				log.Track("replayed from the result cache")
+
+				thread = self.Executor.submit(ReplayLog,cached,*search)
+			else:
+				# A token index can rule the log out or narrow the read, that time says nothing of the whole log's cost
+				log.Started = tm.perf_counter() if not log.TokenIndexFile else None
+
+				log.Track("processing by local thread")
 
-			thread = self.Executor.submit(SearchLog,log,thread_patterns,self.Streamers,self.LineLimit,self.TerminateFlag)
+				# Workers stop on TerminateEvent, the flag file is only polled here
+				thread = self.Executor.submit(SearchLog,*search)
 
 			tuple = ( thread, log )
 			self.Threads.append(tuple)
 
-		tracer.Exitting("SearchManager::CreateWorkers")
-
 	# Check on Worker Threads
+	@Traced("SearchManager::CheckWorkers")
 	def CheckWorkers(self):
-		tracer.Entering("SearchManager::CheckWorkers")
-
 		terminated = []
 
 		for threadTuple in self.Threads:
@@ -3615,12 +7994,28 @@ class SearchManager(App):
 				if err:
 					Msg(f"Error {err}")
 
+					# A worker that died never ends its stream
+					if log.ID in self.Spools:
+						self.Spools[log.ID].Finished = True
+				else:
+					if self.Costs and log.Started:
+						self.Costs.Learn(log,tm.perf_counter() - log.Started)
+
+					if self.Cache and log.CacheFile:
+						self.Cache.Add(log.CacheFile)
+
+				self.LastCompletion = datetime.now()
+
 				terminated.append(threadTuple)
 
 				self.Tag = ( log, "SearchManager::CheckWorkers")
 
 				log.Track("search completed")
-				self.QueueOutput(log)
+
+				if log.Parent:
+					self.ShardCompleted(log)
+				else:
+					self.QueueOutput(log)
 
 			if self.IfTerminate():
 				break
@@ -3630,54 +8025,351 @@ class SearchManager(App):
 			DbgMsg("Removing completed thread of {} - maxthreads = {} len-logList = {}".format(len(self.Threads),self.MaxThreads,len(self.Logs)))
 			self.Threads.remove(deadThread)
 
-		tracer.Exitting("SearchManager::CheckWorkers")
+	# Idle Local Threads Steal Overdue Remote Assignments
+	@Traced("SearchManager::StealRemote")
+	def StealRemote(self):
+		"""The Most Overdue Remote Assignment Goes Back To The Local List, A Late Remote Completion Only Counts If It Beats The Local Thread To It"""
+
+		stolen = None
+		overdue = 0
+
+		now = datetime.now()
+
+		for item in self.RemoteAssignments:
+			# Measured from the hand out, a holder that is stuck or slow still PINGs and renews its lease
+			elapsed = (now - item.Assigned).total_seconds()
+			predicted = self.Costs.Cost(item.Log)
+
+			if elapsed >= self.StealMinimum and elapsed > predicted * self.StealAfter and elapsed - predicted > overdue:
+				stolen = item
+				overdue = elapsed - predicted
+
+		if stolen:
+			self.RemoteAssignments.remove(stolen)
+
+			stolen.Log.Track(f"stolen from remote thread {stolen.Address}, {overdue:.0f}s past its predicted cost")
+			self.Logs.append(stolen.Log)
+
+		return stolen
 
 	# Queue Output Files
+	@Traced("SearchManager::QueueOutput")
 	def QueueOutput(self,completed):
-		tracer.Entering("SearchManager::QueueOutput")
-
+		# Logs in the output order wait there for release, the rest go straight to the queue
 		if completed:
 			if not type(completed) is list:
 				self.CompletedLogs.append(completed)
-				self.OutputQueue.append(completed)
 				self.CompletedThreadCount += 1
+
+				if not self.OutputOrdering.Complete(completed):
+					self.OutputQueue.append(completed)
 			else:
 				for log in completed:
 					self.CompletedThreadCount += 1
 					if os.path.exists(log.Output):
-						self.OutputQueue.append(log)
 						self.CompletedLogs.append(log)
 
-		tracer.Exitting("SearchManager::QueueOutput")
+						if not self.OutputOrdering.Complete(log):
+							self.OutputQueue.append(log)
+					else:
+						self.WithdrawOutput(log)
+
+	# Log Won't Produce Output, Don't Let It Hold Up Ordered Or Merged Output
+	def WithdrawOutput(self,log):
+		self.OutputOrdering.Withdraw(log)
+
+		if self.Merger:
+			self.Merger.Withdraw(log)
 
 	# Get Output Logs that are from the top of the ordering list
 	def TopOfOrder(self):
-		topItem = None
-
-		# Look Through OutputQueue for items that meet the top of the output ordering queue
-		for log in self.OutputQueue:
-			if log is self.OutputOrdering[0]:
-				# If we have a match, we return the log and...
-				topItem = log
-				# Remove both the log from the output queue AND the ordering queue
-				self.OutputQueue.pop(0)
-				self.OutputOrdering.pop(0)
+		"""Next Released Log(s), A Whole Day With --interleave, Logs Outside The Order Go As They Come"""
+
+		if self.Arguments.interleave:
+			logs = self.OutputOrdering.NextDay()
+		else:
+			log = self.OutputOrdering.Next()
+			logs = ([ log ] if log else [])
+
+		if len(logs) == 0 and len(self.OutputQueue) > 0:
+			logs = [ self.OutputQueue.pop(0) ]
+
+		return logs
+
+	# Result Lines Of A Completed Log (Spooled Or In Its Output File)
+	def ResultLines(self,log,consume=False):
+		if log.ID in self.Spools:
+			spool = self.Spools[log.ID]
+
+			yield from (spool.Consume() if consume else spool.Lines())
+		elif log.Output and type(log.Output) is str and os.path.exists(log.Output):
+			with open(log.Output,"rb") as f_in:
+				yield from f_in
+
+	# Result Lines Of A Log, Keyed By Leading Timestamp
+	def TimestampedLines(self,log,consume=False):
+		key = LineTimestamp(log.EncodedDate)
+
+		for line in self.ResultLines(log,consume):
+			if not line.endswith(b"\n"):
+				line += b"\n"
+
+			yield key(line), line
+
+	# Done With A Log's Results, Remove Its Spool Or Output File
+	def ReleaseOutput(self,log):
+		if log.ID in self.Spools:
+			self.Backlog -= self.Spools[log.ID].Discard()
+			self.RemoveSpool(log)
+		elif log.Output and type(log.Output) is str and os.path.exists(log.Output):
+			os.remove(log.Output)
+			log.SetOutput(None)
+
+	# Results Held In Memory, Recounted (Merges Release Memory As They Read)
+	def CountBacklog(self):
+		self.Backlog = sum([ spool.Size for spool in self.Spools.values() ])
+
+		return self.Backlog
+
+	# Add Completed Logs To The Merge, Write Merged Lines The Watermark Allows
+	@Traced("SearchManager::MergeResults")
+	def MergeResults(self):
+		"""Global Timestamp Merge (--merge), Lines Go Out Once No Running Log Could Hold An Earlier One"""
+
+		while len(self.OutputQueue) > 0:
+			log = self.OutputQueue.pop(0)
+
+			spool = self.Spools.get(log.ID,None)
+
+			if spool:
+				while not spool.Done() and not self.IfTerminate():
+					self.DrainResults(wait=0.1)
+
+				spool.Hold()
+
+			self.Merger.Add(log,self.TimestampedLines(log,consume=True))
+
+		buffer = bytearray()
+
+		for line in self.Merger.Lines():
+			buffer += line
+
+			if len(buffer) >= ResultStream.BatchSize:
+				self.WriteResults(bytes(buffer))
+				buffer.clear()
+
+				if self.IfTerminate():
+					break
+
+				# Keep taking results in while a long merge runs
+				self.CountBacklog()
+				self.DrainResults()
+
+		if len(buffer) > 0:
+			self.WriteResults(bytes(buffer))
+
+		for log in self.Merger.Exhausted:
+			self.ReleaseOutput(log)
+			log.Track("results merged")
+
+		self.Merger.Exhausted.clear()
+
+		self.CountBacklog()
+
+	# Merge Results Of Several Logs By Leading Timestamp
+	@Traced("SearchManager::MergeOutput")
+	def MergeOutput(self,logs):
+		"""Line Level Merge (--interleave), Lines Without A Timestamp Stay With The Line Before Them"""
+
+		for log in logs:
+			spool = self.Spools.get(log.ID,None)
+
+			while spool and not spool.Done() and not self.IfTerminate():
+				self.DrainResults(wait=0.1)
+
+		buffer = bytearray()
+
+		streams = [ self.TimestampedLines(log) for log in logs ]
+
+		for stamp, line in heapq.merge(*streams,key=lambda item: item[0]):
+			buffer += line
+
+			if len(buffer) >= ResultStream.BatchSize:
+				self.WriteResults(bytes(buffer))
+				buffer.clear()
+
+				if self.IfTerminate():
+					break
+
+		if len(buffer) > 0:
+			self.WriteResults(bytes(buffer))
+
+		for log in logs:
+			self.ReleaseOutput(log)
+			log.Track(f"results merged with {len(logs) - 1} other log(s)")
+
+	# Write Raw Result Bytes To The Output
+	def WriteResults(self,data):
+		out = self.OutputFile or sys.stdout
+
+		if out is sys.stdout:
+			# Keep ordering with anything Msg() has written
+			sys.stdout.flush()
+
+		getattr(out,"buffer",out).write(data)
+
+		self.MatchCount += data.count(b"\n")
+
+	# Pull Streamed Result Batches Off The Result Queue
+	def DrainResults(self,wait=0,discard=False):
+		"""Spool (Or Write, For The Live Log) Batches Workers Have Sent, Waits Up To wait Seconds For The First"""
+
+		drained = 0
+
+		while True:
+			try:
+				if wait > 0:
+					logID, batch = self.ResultQueue.get(timeout=wait)
+				else:
+					logID, batch = self.ResultQueue.get_nowait()
+			except queue.Empty:
+				break
+
+			wait = 0
+			drained += 1
+
+			spool = self.Spools.get(logID,None)
+
+			if spool is None or discard:
+				continue
+
+			if batch is None:
+				spool.Finished = True
+			elif spool.Log is self.LiveLog:
+				self.WriteResults(batch)
+			else:
+				self.Backlog += spool.Append(batch)
+
+		# Over budget, largest spools go to disk first
+		budget = self.MemBudget()
+
+		while self.Backlog > budget:
+			candidates = [ spool for spool in self.Spools.values() if spool.Size > 0 and not spool.Log is self.LiveLog and not spool.Merging ]
+
+			if len(candidates) == 0:
 				break
 
-		return topItem
+			spool = max(candidates,key=lambda spool: spool.Size)
+
+			self.Backlog -= spool.SpillTo(self.Arguments.tmp or TempSpace)
+
+		return drained
+
+	# Pick The Log Whose Results Are Written As They Arrive
+	def SelectLiveLog(self):
+		"""Only A Log That Is Next To Be Written Anyway Can Be Live, Everything Else Stays Spooled"""
+
+		if self.LiveLog:
+			return
+
+		candidate = None
+
+		if self.Arguments.interleave or self.Merger:
+			# Results are merged, no log is written on its own
+			pass
+		elif self.Arguments.inorder:
+			candidate = self.OutputOrdering.Top()
+		elif len(self.OutputQueue) == 0:
+			running = [ spool.Log for spool in self.Spools.values() if not spool.Finished and not spool.Log.Parent ]
+
+			if len(running) > 0:
+				candidate = running[0]
+
+		spool = self.Spools.get(candidate.ID,None) if candidate else None
+
+		if spool and not spool.Finished and not spool.Parts:
+			self.LiveLog = candidate
+
+			# Catch up on what was spooled before it went live
+			self.WriteSpool(spool)
+
+			candidate.Track("results written as they arrive")
+
+	# Write Everything Spooled For A Log
+	def WriteSpool(self,spool):
+		out = self.OutputFile or sys.stdout
+
+		if out is sys.stdout:
+			sys.stdout.flush()
+
+		written, lines, freed = spool.WriteTo(getattr(out,"buffer",out))
+
+		self.Backlog -= freed
+		self.MatchCount += lines
+
+		return written, lines, freed
+
+	# Remove A Written Spool (And Those Of Its Parts)
+	def RemoveSpool(self,log):
+		spool = self.Spools.pop(log.ID,None)
+
+		if spool:
+			for part in (spool.Parts or []):
+				self.Spools.pop(part.Log.ID,None)
+
+		if log is self.LiveLog:
+			self.LiveLog = None
+
+	# Throw Away All Streamed Results (Early Termination)
+	def DiscardResults(self):
+		self.DrainResults(discard=True)
+
+		for spool in self.Spools.values():
+			spool.Discard()
+
+		self.Spools.clear()
+		self.LiveLog = None
+		self.Backlog = 0
 
 	# Process Output Files Waiting In Queue
+	@Traced("SearchManager::ProcessOutput")
 	def ProcessOutput(self,outputFile=None):
-		tracer.Entering("SearchManager::ProcessOutput")
+		if outputFile:
+			self.OutputFile = outputFile
+
+		# Results streamed since the last pass
+		self.DrainResults()
+		self.SelectLiveLog()
+
+		# Merged output takes every completed log, the loop below is for per log output
+		if self.Merger:
+			self.MergeResults()
 
 		# We have Items in Queue
 		# If any item is at the top of the ordering list, output, remove from queue, pop ordering from top of ordering list, recheck
 		# when no item in the queue matches the top of the list, output is complete (for now)
 
-		while len(self.OutputQueue) > 0:
+		while not self.Merger and (len(self.OutputQueue) > 0 or self.OutputOrdering.Waiting() > 0):
 			if self.Arguments.inorder:
-				# Grab log at top of list
-				log = self.TopOfOrder()
+				# Grab log(s) at top of the order, a day's logs are merged
+				logs = self.TopOfOrder()
+
+				if len(logs) > 1:
+					self.MergeOutput(logs)
+
+					if self.IfTerminate():
+						break
+
+					continue
+
+				log = (logs[0] if len(logs) > 0 else None)
+			elif self.LiveLog:
+				# Nothing can be written while the live log is part way out, except the live log itself
+				if not self.LiveLog in self.OutputQueue:
+					break
+
+				log = self.LiveLog
+				self.OutputQueue.remove(log)
 			else:
 				log = self.OutputQueue.pop(0)
 
@@ -3687,6 +8379,24 @@ class SearchManager(App):
 
 			self.Tag = ( log, "SearchManager::ProcessOutput" )
 
+			if log.ID in self.Spools:
+				spool = self.Spools[log.ID]
+
+				# The worker is done, its end of stream may still be in the queue
+				while not spool.Done() and not self.IfTerminate():
+					self.DrainResults(wait=0.1)
+
+				self.WriteSpool(spool)
+				self.RemoveSpool(log)
+
+				log.Track("results written")
+
+				if self.IfTerminate():
+					break
+
+				self.SelectLiveLog()
+				continue
+
 			if not log.Output or not type(log.Output) is str:
 				DbgMsg(f"Output for {log.Filename} is not a string - {type(log.Output)}")
 				log.Print()
@@ -3713,14 +8423,11 @@ class SearchManager(App):
 
 						# If there are outstanding logs or assignments, check for new network traffic
 						if (self.MatchCount % 500) == 0 and (len(self.Logs) > 0 or len(self.RemoteAssignments) > 0) and self.Server:
-							# If select has readables, process the readables, queue any completion output
-							readable, writable, exceptional = self.Server.Select()
+							# Service ready sockets (without waiting), queue any completion output
+							completed = self.Server.Process(self.LogMetas,self.Logs,self.Patterns,self.NamedQueries,self.Streamers,self.RemoteAssignments)
 
-							if len(readable) > 0:
-								completed = self.Server.Process(self.LogMetas,self.Logs,self.Patterns,self.NamedQueries,self.Streamers,self.RemoteAssignments)
-
-								if len(completed) > 0:
-									self.QueueOutput(completed)
+							if len(completed) > 0:
+								self.QueueOutput(completed)
 
 				os.remove(log.Output)
 
@@ -3731,12 +8438,23 @@ class SearchManager(App):
 			if self.IfTerminate():	# If termination in progress, skip the rest of the output queue
 				break
 
-		tracer.Exitting("SearchManager::ProcessOutput")
+	# Fetch Assignments From The Server, Rejecting The Ones That Can't Be Reached From Here
+	@Traced("SearchManager::FetchAssignments")
+	def FetchAssignments(self,threads):
+		"""Returns ( available, patterns, namedQueries )"""
+
+		assignments,patterns,namedQueries = self.Client.GetAssignments(self.LogMetas,threads)
+		available, rejected = self.Client.CheckAvailability(assignments,self.Arguments.mount)
+
+		if len(rejected) > 0:
+			DbgMsg(f"Rejecting {len(rejected)} item(s)")
+			rejectFailed = self.Client.Reject(rejected)
+
+		return available, patterns, namedQueries
 
 	# Get Assignments (Also checks for rejects)
+	@Traced("SearchManager::GetAssignments")
 	def GetAssignments(self,threads):
-		tracer.Entering("SearchManager::GetAssignments")
-
 		available = []
 		patterns = []
 		namedQueries = []
@@ -3744,12 +8462,7 @@ class SearchManager(App):
 		newAssignments = 0
 
 		try:
-			assignments,patterns,namedQueries = self.Client.GetAssignments(self.LogMetas,threads)
-			available, rejected = self.Client.CheckAvailability(assignments,self.Arguments.mount)
-
-			if len(rejected) > 0:
-				DbgMsg("Rejecting {len(rejected)} item(s)")
-				rejectFailed = self.Client.Reject(rejected)
+			available, patterns, namedQueries = self.FetchAssignments(threads)
 
 			if len(available) > 0:
 				newAssignments = len(available)
@@ -3761,60 +8474,32 @@ class SearchManager(App):
 			Msg(f"*** An error occurred inside SearchManager::GetAssignments - {err}",ignoreModuleMode=True)
 			newAssignments = -1
 
-		tracer.Exitting("SearchManager::GetAssignments")
-
 		return newAssignments,patterns,namedQueries
 
-	# Let Server Know Assignment(s) have been Completed
-	def Complete(self):
-		tracer.Entering("SearchManager::Complete")
-
-		queueLength = 0
-
-		try:
-			if len(self.OutputQueue) > 0:
-				DbgMsg(f"Completing {len(self.OutputQueue)} job(s)")
-
-				for log in self.OutputQueue:
-					self.Client.Completed(log)
-
-				# Get number of items just completed, we want that many new assignments
-				queueLength = len(self.OutputQueue)
-
-				# Clear recently completed output from queue
-				self.OutputQueue.clear()
-
-		except Exception as err:
-			Msg(f"*** An error occurred inside SearchManager::Complete - {err}",ignoreModuleMode=True)
-
-		tracer.Exitting("SearchManager::Complete")
-
-		return queueLength
-
 	# Clean Up Early Terminate Request
+	@Traced("SearchManager::CleanUpEarlyTermination")
 	def CleanUpEarlyTermination(self):
-		tracer.Entering("SearchManager::CleanUpEarlyTermination")
-
-		self.Touch(self.TerminateFlag)
+		self.CreateTerminateFlag()
 
 		# Now Manage any remote jobs
 		if self.Server and (len(self.Server.Connections) > 0 or len(self.RemoteAssignments) > 0):
 			self.Server.TerminateRemoteWorkers = True
 
-			start = datetime.now()
-
+			# Connected clients are told on their next ping, the assignments of clients that are
+			# gone come back when their leases run out, so this ends within a lease
 			while len(self.RemoteAssignments) > 0:
-				completed = self.Server.Process(self.LogMetas,self.Logs,self.Patterns,self.NamedQueries,self.Streamers,self.RemoteAssignments)
-				tm.sleep(0.5)
+				completed = self.Server.Process(self.LogMetas,self.Logs,self.Patterns,self.NamedQueries,self.Streamers,self.RemoteAssignments,timeout=0.5)
 
-				elapsedTime = self.ElapsedTime(start)
+				connected = set([ connection.Holder() for connection in self.Server.Connections ])
 
-				# Give time to shutdown, but ultimately quit if no response
-				if elapsedTime.seconds > 5:
+				if not any([ item.Holder() in connected for item in self.RemoteAssignments ]):
 					break
 
 		# Clean up threads
 		while len(self.Threads) > 0:
+			# Workers blocked on a full result queue can't see the terminate event
+			self.DrainResults(discard=True)
+
 			doneList = []
 
 			for threadTuple in self.Threads:
@@ -3835,12 +8520,14 @@ class SearchManager(App):
 
 		self.Executor.shutdown()
 
-		# Clean up output files
+		# Clean up streamed results and output files
+		self.DiscardResults()
+
 		for log in self.Logs:
 			if log.Output and os.path.exists(log.Output):
 				os.remove(log.Output)
 
-		os.remove(self.TerminateFlag)
+		self.RemoveTerminateFlag()
 
 	# Process Clean Items
 	def CleanProcess(self,location,expressions):
@@ -3870,17 +8557,174 @@ class SearchManager(App):
 		for location in locations:
 			self.CleanProcess(location,exprs)
 
+	# Rotated Logs Without A Current Token Index
+	@Traced("SearchManager::IndexCandidates")
+	def IndexCandidates(self,metas,state,settle):
+		"""Logs Matching A Meta's ParseInfo, Unmodified For settle Seconds And Not Done In state, Newest First"""
+
+		candidates = []
+		seen = set()
+
+		now = tm.time()
+
+		# The stored catalog only re-reads folders whose listing changed, so frequent passes stay cheap
+		with LogCatalog.Default(metas) as catalog:
+			for logFolder in self.StorageLocations:
+				for meta in metas:
+					for log in meta.GetLogFiles(folder=logFolder,catalog=catalog):
+						realpath = os.path.realpath(log.Filename)
+
+						if realpath in seen:
+							continue
+
+						seen.add(realpath)
+
+						try:
+							stat = os.stat(log.Filename)
+						except OSError:
+							continue
+
+						# Still being written (the live log, or a rotation being compressed)
+						if now - stat.st_mtime < settle:
+							continue
+
+						if not state.Done(log,stat):
+							candidates.append(( log.EncodedDate or date.min, stat.st_mtime, log ))
+
+		# Newly rotated logs are the ones an investigation is most likely to want
+		candidates.sort(key=lambda item: item[:2],reverse=True)
+
+		return [ log for encodedDate, mtime, log in candidates ]
+
+	# Hold Off New Index Builds While The Host Is Busy
+	def IndexThrottled(self,running,maxload):
+		"""1 Minute Load Average Per CPU, Less The Builders Own Share, Above maxload"""
+
+		try:
+			load = os.getloadavg()[0]
+		except ( AttributeError, OSError ):
+			return False
+
+		return (load - running) / (os.cpu_count() or 1) > maxload
+
+	# Build Token Indexes For Rotated Logs, Once (Cron) Or Every interval Seconds (Daemon)
+	@Traced("SearchManager::IndexLogs")
+	def IndexLogs(self,args):
+		"""Builds Run On The Executor At Low Priority, One At A Time Unless --threads Says Otherwise, Progress Is Saved After Each"""
+
+		# Set Args
+		self.Arguments = args
+
+		settle = float(args.settle or self.DefaultSettle)
+		interval = float(args.interval or self.DefaultIndexInterval)
+		maxload = float(args.maxload or self.DefaultMaxLoad)
+		niceness = int(args.nice if args.nice is not None else self.DefaultNice)
+
+		# Builders are capped by the executor's workers
+		builders = max(1,min(int(args.threads or 1),self.MaxThreads))
+
+		logNicks = args.logs.split(",") if args.logs and args.logs != "none" else []
+		metas = self.SelectMetas(logNicks,args.all)
+
+		state = IndexState.Default(args.state)
+
+		if len(metas) == 0:
+			Msg("No log sources meet the supplied criteria, nothing to index",ignoreModuleMode=True)
+		elif not state.Lock():
+			Msg(f"Another index builder holds {state.Store}.lock, leaving it to finish",ignoreModuleMode=True)
+		else:
+			Msg(f"Indexing {len(metas)} log sources in {len(self.StorageLocations)} folders with {builders} builders")
+
+			running = []
+
+			try:
+				while not self.IfTerminate():
+					pending = self.IndexCandidates(metas,state,settle)
+
+					counts = { "indexed" : 0, "skipped" : 0, "failed" : 0 }
+					passStarted = datetime.now()
+
+					if len(pending) > 0:
+						Msg(f"{len(pending)} logs to index")
+
+					while (len(pending) > 0 or len(running) > 0) and not self.IfTerminate():
+						while len(pending) > 0 and len(running) < builders and not self.IndexThrottled(len(running),maxload):
+							log = pending.pop(0)
+
+							running.append(( self.Executor.submit(IndexLog,log,TokenIndex(log.Filename).IndexFile,niceness), log ))
+
+						if len(running) == 0:
+							# Throttled with nothing running
+							tm.sleep(1.0)
+							continue
+
+						WaitFor([ future for future, log in running ],timeout=1.0,return_when=FIRST_COMPLETED)
+
+						for item in [ item for item in running if item[0].done() ]:
+							future, log = item
+
+							running.remove(item)
+
+							err = future.exception()
+
+							if err:
+								Msg(f"Index build of {log.Filename} failed : {err}")
+								status, seconds = "failed", 0
+							else:
+								built, seconds = future.result()
+
+								# A build cut short by termination isn't an outcome
+								if not built and self.IfTerminate():
+									continue
+
+								# UTF-16 logs can't be tokenized as bytes
+								status = "indexed" if built else "skipped"
+
+							DbgMsg(f"Index of {log.Filename} {status} in {seconds:.1f}s")
+
+							counts[status] += 1
+
+							state.Record(log,status,seconds)
+							state.Save()
+
+					if sum(counts.values()) > 0:
+						Msg(f"Index pass : {counts['indexed']} indexed, {counts['skipped']} skipped, {counts['failed']} failed in {self.ElapsedTime(passStarted)}")
+
+					state.Prune()
+					state.Save()
+
+					if not args.daemon:
+						break
+
+					resume = tm.monotonic() + interval
+
+					while tm.monotonic() < resume and not self.IfTerminate():
+						tm.sleep(1.0)
+			except KeyboardInterrupt:
+				self.CreateTerminateFlag()
+
+			# Builds stop at their next block once terminating, wait for them so no worker is left writing
+			if len(running) > 0:
+				WaitFor([ future for future, log in running ])
+
+			state.Save()
+			state.Unlock()
+
+		if self.IfTerminate():
+			self.RemoveTerminateFlag()
+
 	# Client Search Manager
+	@Traced("SearchManager::ClientSearch")
 	def ClientSearch(self,args):
 		global Version
 
-		tracer.Entering("SearchManager::ClientSearch")
-
 		DbgMsg(f"SearchManager::ClientSearch - Version {Version}")
 
 		# Set Args
 		self.Arguments = args
 
+		self.IndexOn = not self.Arguments.noindex
+
 		# Initialize some things
 		self.LineCount = 0
 		self.MatchCount = 0
@@ -3904,8 +8748,10 @@ class SearchManager(App):
 		if self.Arguments.out:
 			outputFile=open(args.out,"wb")
 
-		# Create Remote Searcher
-		self.Client = RemoteSearcher(self.Arguments.client)
+		# Create Remote Searcher (server may be given as host:port)
+		host, sep, port = str(self.Arguments.client).partition(":")
+		self.Client = RemoteSearcher(host,int(port) if sep else DefaultPort)
+		self.Client.Compress = self.Arguments.compress
 
 		proceed = True
 
@@ -3915,73 +8761,77 @@ class SearchManager(App):
 			Msg("Failed to connect to server")
 			return
 
+		link = None
+
 		try:
-			newAssignments,patterns,namedQueries = self.GetAssignments(self.MaxThreads)
+			# Hold the running threads plus a prefetch window, so the next log is already
+			# here when a thread finishes instead of a round trip away
+			window = self.MaxThreads + self.Prefetch()
+
+			newAssignments,patterns,namedQueries = self.GetAssignments(window)
 
 			if newAssignments > 0:
 				# Fill out pattern and named Query Info
 				self.Patterns.extend(patterns)
 				self.NamedQueries.extend(namedQueries)
 
+				# Aggregated searches send back partial aggregates, the server merges them
+				self.Aggregate = Aggregate.Unpack(self.Client.Aggregation) if self.Client.Aggregation else None
+
 				logCount += newAssignments
 
-				pingFailed = 0
-				lastPingAttempt = None
+				# From here on only the link thread talks to the server
+				link = ClientLink(self,window,held=newAssignments)
+				link.Start()
+
+				while not link.Done() or len(self.Logs) > 0 or len(self.Threads) > 0:
+					# Pick up assignments the link has prefetched
+					logs,patterns,namedQueries = link.Take()
+
+					if len(logs) > 0:
+						self.Logs.extend(logs)
+						self.Patterns.extend(patterns)
+						self.NamedQueries.extend(namedQueries)
+
+						logCount += len(logs)
 
-				while (len(self.Logs) > 0 or len(self.Threads) > 0):
 					# Create Worker Threads
-					self.CreateWorkers()
+					self.CreateWorkers(clientmode=True)
+
+					# Wait for a worker to finish, or briefly for the link when idle
+					futures = [ thread for thread,log in self.Threads ]
 
-					# If there are no locally available logs, then we are only waiting on remoteClients
-					if len(self.Logs) == 0:
-						tm.sleep(0.5)
+					if len(futures) > 0:
+						WaitFor(futures,timeout=0.05,return_when=FIRST_COMPLETED)
+					else:
+						tm.sleep(0.05)
 
 					# Cycle through the threads looking for completions.
-					# When a thread is complete, retrieve the output, dump it, add
-					# the thread record to the terminated list and move on.
 					self.CheckWorkers()
 
 					# Look for any keystrokes for InSearchMenu to pop up
-					result = self.GetChar()
+					if CmdLineMode():
+						result = self.GetChar()
 
-					if result:
-						proceed = self.InSearchMenu(startLogs=logCount,started=clientStarted,keyed_in=result)
+						if result:
+							proceed = self.InSearchMenu(startLogs=logCount,started=clientStarted,keyed_in=result)
 
 					if not proceed:
-						self.Touch(self.TerminateFlag)
+						self.CreateTerminateFlag()
 						break
 
 					# Check for terminate here since the InSearchMenu can request a terminate
 					if self.IfTerminate():
 						break
 
-					# Check for output (completed items), or ping the server
-					if len(self.OutputQueue) > 0:
-						# Complete items
-						itemsCompleted = self.Complete()
-						# Ask for as many new assignments as has just been completed
-						newAssignments,patterns,namedQueries =  self.GetAssignments(itemsCompleted)
-
-						if newAssignments > 0:
-							logCount += newAssignments
-
-					elif lastPingAttempt is None or self.ElapsedTime(lastPingAttempt).seconds > 5:
-						lastPingAttempt = datetime.now()
-
-						msgpkt = self.Client.Ping()
+					# Hand completed items to the link, it reports them and tops the window back up
+					for log in self.OutputQueue:
+						link.Report(log)
 
-						if msgpkt.Verb == self.Client.TERM:
-							# TODO : signal early termination
-							break
-						elif msgpkt.Verb == "none":
-							pingFailed += 1
-						else:
-							DbgMsg(f"Server Replied {msgpkt.Verb}")
-							pingFailed = 0
+					self.OutputQueue.clear()
 
-						# If ping failed 5 times, parent remote thread probably died
-						if pingFailed > 5:
-							break
+					if link.Terminated or link.Failed:
+						break
 
 			else:
 				# ElapsedTime function in App Class now
@@ -4002,6 +8852,10 @@ class SearchManager(App):
 
 			Msg("SearchManager::ClientSearch - An error occurred talking to the server - type({}) on {} - {}".format(type(err),exc_tb.tb_lineno,err))
 
+		# Link must be done with the socket before it is closed
+		if link:
+			link.Stop()
+
 		# ElapsedTime function in App Class now
 		elapsedTime = self.ElapsedTime(clientStarted)
 
@@ -4019,16 +8873,17 @@ class SearchManager(App):
 		Msg(f"Client Search/Dump completed - elapsed run time {elapsedTime}")
 
 	# Local Search
+	@Traced("SearchManager::LocalSearch")
 	def LocalSearch(self,args,clientmode=False,servermode=False):
 		global DefaultAddres,DefaultPort, Version
 
-		tracer.Entering("SearchManager::LocalSearch")
-
 		DbgMsg(f"SearchManager::LocalSearch - Version {Version}")
 
 		# Set Args
 		self.Arguments = args
 
+		self.IndexOn = not self.Arguments.noindex
+
 		# Initialize some things
 		self.LineCount = 0
 		self.MatchCount = 0
@@ -4038,6 +8893,11 @@ class SearchManager(App):
 		self.CompletedLogs.clear()
 		self.OutputQueue.clear()
 		self.Logs.clear()
+		self.PendingShards.clear()
+		self.Shards.clear()
+		self.Spools.clear()
+		self.LiveLog = None
+		self.Backlog = 0
 		self.Server = None
 
 		# Init Pattern Count (informational)
@@ -4055,22 +8915,74 @@ class SearchManager(App):
 			Msg("No logs meet the supplied criteria, log count is zero",ignoreModuleMode=True)
 			return
 
+		# Columns come from every pattern and every named query of the logs in scope
+		queries = [ Query(pattern) for pattern in self.Patterns ]
+
+		for meta in dict.fromkeys([ log.Meta for log in self.Logs ]):
+			queries.extend(meta.GetQueries(self.NamedQueries))
+
+		self.Format = ResultFormat(self.Arguments.format,queries)
+
+		if not self.Format.Usable(self.Arguments):
+			self.Logs.clear()
+			return
+
+		# Workers count, their partials are merged here, the report is written once the search is done
+		self.Aggregate = Aggregate.FromArgs(self.Arguments)
+
+		if self.Aggregate:
+			if not self.Aggregate.Usable(self.Arguments,queries):
+				self.Logs.clear()
+				return
+
+			self.Format = self.Aggregate.ReportFormat(self.Arguments.format)
+
+			# Partials have no order to keep
+			self.Merger = None
+			self.OutputOrdering.clear()
+
+		# Output of unchanged logs searched the same way before is replayed instead (see ResultCache)
+		self.Cache = ResultCache.Default(self.CacheBudget()) if not self.Arguments.nocache else None
+
 		# Start Server if asked for
 		if servermode:
 			Msg("Starting Server")
 			self.Server = SearchServer(host=DefaultAddress,port=DefaultPort)
 
+			if self.Arguments.lease:
+				self.Server.LeaseTime = float(self.Arguments.lease)
+
+			if self.Aggregate:
+				self.Server.Aggregation = self.Aggregate.Pack()
+
 		# Mark start of search for timing purposes
 		searchStarted = datetime.now()
+		self.LastCompletion = None
 
 		Msg(f"Beginning search with {logCount} logs, {patternCount} patterns ({len(self.NamedQueries)} named queries) and {self.MaxThreads} threads")
 
+		# Prediction covers the local threads, remote clients only shorten it
+		self.PredictedMakespan = None
+
+		if not self.Arguments.disablelocal:
+			self.PredictedMakespan = self.Costs.Makespan(self.Logs,self.MaxThreads,self.SplitSize())
+
 		# Setup output option
 		outputFile=sys.stdout
 
-		# See if user has specified an output file
+		# See if user has specified an output file (parquet is converted from records once done)
 		if self.Arguments.out:
-			outputFile=open(args.out,"wb")
+			outputFile=open(self.Format.RecordsFile(args.out),"wb")
+
+		reportFile = outputFile
+
+		# Every output path (spools, merges, remote result files) writes into the aggregate instead
+		if self.Aggregate:
+			outputFile = self.Aggregate
+		else:
+			getattr(outputFile,"buffer",outputFile).write(self.Format.Header())
+
+		self.OutputFile = outputFile
 
 		statusInterval = Periodic(timedelta(seconds=10))
 
@@ -4078,12 +8990,12 @@ class SearchManager(App):
 			statusInterval.Start()
 
 		# While there are logs in the list and there are active threads, keep looping
-		while len(self.Logs) > 0 or len(self.Threads) > 0 or len(self.RemoteAssignments) > 0:
+		while len(self.Logs) > 0 or len(self.PendingShards) > 0 or len(self.Threads) > 0 or len(self.RemoteAssignments) > 0:
 			if DebugMode() and statusInterval.Trigger():
 				self.PrintStatus()
 
 			# Create Threaded Workers if there are logs available
-			if len(self.Logs) > 0 and not self.Arguments.disablelocal:
+			if (len(self.Logs) > 0 or len(self.PendingShards) > 0) and not self.Arguments.disablelocal:
 				self.CreateWorkers(clientmode)
 
 			# If Server defined, process incoming comms
@@ -4095,9 +9007,15 @@ class SearchManager(App):
 					self.CompletedLogs.extend(completed)
 					self.QueueOutput(completed)
 
-			# If there are no locally available logs, then we are only waiting on remoteClients
-			if len(self.Logs) == 0:
-				tm.sleep(0.5)
+			# Idle local threads take over remote work that is running well past its prediction
+			if self.Server and len(self.Logs) == 0 and len(self.PendingShards) == 0 and len(self.Threads) < self.MaxThreads and len(self.RemoteAssignments) > 0 and not self.Arguments.disablelocal:
+				self.StealRemote()
+
+			# If there are no locally available logs, then we are only waiting on workers and remoteClients
+			# (streamed results are taken in while waiting)
+			if len(self.Logs) == 0 and len(self.PendingShards) == 0:
+				# Short waits with a server, clients shouldn't wait on the result queue
+				self.DrainResults(wait=(0.05 if self.Server else 0.5))
 
 			# Cycle through the threads looking for completions.
 			# When a thread is complete, retrieve the output, dump it, add
@@ -4112,7 +9030,7 @@ class SearchManager(App):
 					proceed = self.InSearchMenu(startLogs=logCount,started=searchStarted,keyed_in=result)
 
 					if not proceed:
-						self.Touch(self.TerminateFlag)
+						self.CreateTerminateFlag()
 						break
 
 			# Check for terminate here since the InSearchMenu can request a terminate
@@ -4128,9 +9046,27 @@ class SearchManager(App):
 			#if len(self.OutputQueue) > 0:
 			#	self.OutputQueue.clear()
 
+		# Whatever never arrived can't hold the merge back any longer
+		if self.Merger and not self.IfTerminate():
+			self.Merger.Expected.clear()
+			self.ProcessOutput(outputFile)
+
+		# Anything still spooled was never reached in the output order, don't leave spill files behind
+		if len(self.Spools) > 0:
+			DbgMsg(f"{len(self.Spools)} result spool(s) never written")
+			self.DiscardResults()
+
+		if self.Aggregate:
+			outputFile = self.OutputFile = reportFile
+
+			if not self.IfTerminate():
+				self.Aggregate.Report(outputFile,self.Format)
+
 		if self.Arguments.out:
 			outputFile.close()
 
+			self.Format.Finish(args.out,completed=not self.IfTerminate())
+
 		if self.IfTerminate():
 			self.CleanUpEarlyTermination()
 
@@ -4143,6 +9079,21 @@ class SearchManager(App):
 
 		elapsedTime = self.ElapsedTime(searchStarted)
 
+		# What was learned about search rates improves the next run's ordering and prediction
+		self.Costs.Save()
+
+		if self.Cache:
+			self.Cache.Save()
+
+			if self.Cache.Lookups > 0:
+				Msg(f"Result cache - {self.Cache.Hits} of {self.Cache.Lookups} logs replayed, {self.Cache.Saved / 1048576:.1f} MiB of logs not read, {self.Cache.Added} added ({self.Cache.Size() / 1048576:.1f} of {self.Cache.Budget / 1048576:.1f} MiB used)")
+
+		if self.PredictedMakespan is not None and self.LastCompletion:
+			predicted = timedelta(seconds=round(self.PredictedMakespan,1))
+			actual = self.LastCompletion - searchStarted
+
+			Msg(f"Makespan of {self.MaxThreads} local threads - predicted {predicted}, actual {actual}")
+
 		Msg(f"Search/Dump completed - elapsed run time {elapsedTime}")
 
 # Main Loop
@@ -4227,6 +9178,8 @@ def BuildParser():
 	Parser.add_argument("--threads",help="Set max thread limit")
 	Parser.add_argument("--tmp",help="Set temp space to be used")
 	Parser.add_argument("--silent",action="store_true",help="Suppress output (except debug output)")
+	Parser.add_argument("--rescan",action="store_true",help="Ignore the stored log catalog in temp space and rescan log folders")
+	Parser.add_argument("--noindex",action="store_true",help="Ignore token index sidecars, read every byte of every log")
 
 	showcmds = subparsers.add_parser("show",help="Show logs and sources")
 	showcmds.add_argument("--sample",help="Show 'sample' lines from random log from population")
@@ -4248,16 +9201,44 @@ def BuildParser():
 	searchcmds.add_argument("--live",action="store_true",help="Search live logs")
 	searchcmds.add_argument("--range",help="Date Ranges for search (YYYYMMDD format)")
 	searchcmds.add_argument("--inorder",action="store_true",help="Best effort to display output in date ascending order")
+	searchcmds.add_argument("--interleave",action="store_true",help="With --inorder, merge the results of logs of the same day by their leading timestamp")
+	searchcmds.add_argument("--merge",action="store_true",help="Merge the results of all logs into one stream ordered by leading timestamp (spooled, see --membudget)")
 	searchcmds.add_argument("--local",action="store_true",help="User local temp space for temp files to ease mount congestion")
 	searchcmds.add_argument("--start","-s",help="Start Date, iso format [YYYY][MM]DD")
 	searchcmds.add_argument("--end","-e",help="End Date, iso format [YYYY][MM]DD")
 	searchcmds.add_argument("--server",action="store_true",help="Make this thread a search cluster controller")
 	searchcmds.add_argument("--disablelocal",action="store_true",help="Disable local search threads")
+	searchcmds.add_argument("--lease",help="Seconds a remote client can go unheard before its assignments are re-queued (default 30)")
+	searchcmds.add_argument("--engine",choices=[ "line", "block" ],default="line",help="Scan line by line, or scan large blocks and only split lines around hits")
+	searchcmds.add_argument("--blocksize",help="Block size in MiB for the block engine (default 8)")
+	searchcmds.add_argument("--decompressor",choices=[ "auto", "pigz", "zcat", "python" ],default="auto",help="Gzip decompressor, auto prefers pigz, then zcat, then python")
+	searchcmds.add_argument("--splitsize",help="Split plain logs, and indexed multi-member gzip logs, of at least this many MiB across threads (default 1024, 0 disables)")
+	searchcmds.add_argument("--gzindex",action="store_true",help="Record a member index for gzip logs over --splitsize while searching them, so later searches can split them")
+	searchcmds.add_argument("--membudget",help="MiB of streamed results held in memory before spilling to temp space (default 256)")
+	searchcmds.add_argument("--format",choices=ResultFormat.Formats,default="text",help="Write named query groups as text, csv (with a header), jsonl or parquet (needs pyarrow and --out)")
+	searchcmds.add_argument("--nocache",action="store_true",help="Don't replay or keep results of unchanged logs (see --cachebudget)")
+	searchcmds.add_argument("--cachebudget",help="MiB of results kept in temp space for repeat searches over unchanged logs, least recently used go first (default 1024)")
+	searchcmds.add_argument("--count-by",help="Count matches per combination of these named groups (csv list), workers count and only the counts are merged")
+	searchcmds.add_argument("--distinct",help="List the distinct combinations of these named groups (csv list) instead of the matches")
+	searchcmds.add_argument("--top",help="With --count-by only the N most common, with --distinct the first N")
+	searchcmds.add_argument("--decodefirst",action="store_true",help="Decode every line before matching (legacy path, for non-ASCII compatible encodings like utf-16)")
 	searchcmds.add_argument("logs",nargs="?",default="none",help="Log(s) to search, can be a csv list of name, nickname or log group")
 	searchcmds.add_argument("pattern",nargs="?",default="none",help="Search pattern")
 
+	indexcmds = subparsers.add_parser("index",help="Build token indexes for rotated logs, once (cron) or as a daemon")
+	indexcmds.add_argument("--all",action="store_true",help="Include logs not marked 'good'")
+	indexcmds.add_argument("--daemon",action="store_true",help="Keep running, looking for newly rotated logs every --interval seconds")
+	indexcmds.add_argument("--interval",help="Seconds between passes in daemon mode (default 300)")
+	indexcmds.add_argument("--settle",help="Seconds a log must go unmodified before it counts as rotated (default 300)")
+	indexcmds.add_argument("--maxload",help="Hold new builds while the load average per CPU, less the builders, is above this (default 0.75)")
+	indexcmds.add_argument("--nice",help="Niceness of the build workers (default 19)")
+	indexcmds.add_argument("--state",help="Progress file, lets a stopped run resume (default psearch.indexer.json in temp space)")
+	indexcmds.add_argument("logs",nargs="?",default="none",help="Log(s) to index, can be a csv list of name, nickname or log group (default all)")
+
 	client = subparsers.add_parser("client",help="Become client")
 	client.add_argument("-w","--wait",default=DefaultConnectionWait,help="Time for client to wait for server on first connection (in seconds)")
+	client.add_argument("--compress",action="store_true",help="Compress results sent back to a server that can't reach this client's temp space (slow links)")
+	client.add_argument("--prefetch",help="Extra assignments queued locally beyond the running threads (default 2)")
 	client.add_argument("server",help="Provide server fqdn or IP to become a search cluster client")
 
 	return Parser
@@ -4342,7 +9323,7 @@ def ParseArgs(arguments=None):
 
 	global Parser, Args, AppConfig, ConfigFile, Mounts, TRACERStatefile
 	global TempSpace, LogLocations, LogSources, searchManager, tracer, app
-	global LogMount
+	global LogMount, CatalogRescan
 
 	if arguments != None:
 		Args,unknowns = Parser.parse_known_args(arguments)
@@ -4380,6 +9361,8 @@ def ParseArgs(arguments=None):
 	if args.tmp:
 		TempSpace=args.tmp
 
+	CatalogRescan = args.rescan
+
 	# Change In Log Source Location(s)
 	if args.logsrc != None:
 		LogLocations = args.logsrc.split(",")
@@ -4466,6 +9449,9 @@ def run(**kwargs):
 	elif args.command == "search":
 		DbgMsg("Beginning PSearch")
 		Search(args)
+	elif args.command == "index":
+		DbgMsg("Building Indexes")
+		searchManager.IndexLogs(args)
 
 	for m in Mounts:
 		try: